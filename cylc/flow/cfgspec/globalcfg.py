@@ -890,6 +890,208 @@ with Conf('global.cylc', desc='''
 
                Moved into the ``[scheduler]`` section from the top level.
         ''')
+        Conf('process pool backend', VDR.V_STRING, 'poll',
+             options=['poll', 'asyncio'], desc='''
+            How the scheduler runs commands in the process pool.
+
+            ``poll``
+               Running commands are checked, and queued commands started,
+               once per main loop iteration.
+            ``asyncio``
+               Commands are run by the scheduler's event loop. Queued commands
+               start as soon as there is space in the pool and command output
+               is read as it is written, so job submission, poll and kill
+               commands are not held up waiting for the next main loop
+               iteration. Command callbacks are still called by the main
+               loop, which is woken up as soon as a command exits if
+               :cylc:conf:`[scheduler][main loop]event driven` is ``True``.
+
+            .. seealso::
+
+               :ref:`Managing External Command Execution`.
+
+            .. versionadded:: 8.7.0
+        ''')
+        Conf('job command coalescing window', VDR.V_INTERVAL,
+             DurationFloat(0), desc='''
+            Wait this long before running job poll and kill commands, to
+            merge requests for the same platform into one command.
+
+            Jobs can be polled for several reasons in quick succession (e.g.
+            polling timers, messages which need the job status confirming
+            and ``cylc poll``). By default, each request runs its own
+            ``jobs-poll`` command. With a short window (e.g. ``PT2S``),
+            requests for the same platform made within the window are run
+            as one ``jobs-poll`` (or ``jobs-kill``) command, and jobs requested
+            more than once are only polled (or killed) once. This reduces the
+            load on the scheduler host, the platform hosts and the job
+            runners.
+
+            Set to ``PT0S`` to run each request straight away.
+
+            .. versionadded:: 8.7.0
+        ''')
+        Conf('job file writer threads', VDR.V_INTEGER, 0, desc='''
+            Number of threads used to write job files.
+
+            Writing a job file (and checking its syntax with ``bash -n``)
+            takes a few milliseconds, which adds up when many tasks are
+            released at once (e.g. large ensembles). By default, job files
+            are written by the main loop, which cannot do anything else in
+            the meantime. If set, job files are written in the background
+            by this many threads, and jobs are submitted (in batches, as
+            usual) as their job files become ready.
+
+            Set to ``0`` to write job files in the main loop.
+
+            .. versionadded:: 8.7.0
+        ''')
+        with Conf('process pool lanes', desc='''
+            Share the process pool between types of command and platforms.
+
+            Queued commands are divided into lanes, one for each type of
+            command (e.g. ``jobs-submit``) and platform (or install target for
+            ``remote-init`` and ``file-install`` commands). Commands which are
+            not for a particular platform (e.g. ``xtrigger-func`` and
+            ``event-handler``) are divided by the host they run on.
+
+            When more commands are queued than the
+            :cylc:conf:`[scheduler]process pool size` allows, the pool is
+            shared between lanes by weighted round robin, so a burst of
+            commands in one lane (e.g. job submissions to a slow platform)
+            does not hold up the others (e.g. job polls and kills, event
+            handlers and xtriggers).
+
+            Lane settings are configured by command type, e.g:
+
+            .. code-block:: cylc
+
+               [scheduler]
+                   [[process pool lanes]]
+                       [[[jobs-submit]]]
+                           limit = 2
+                       [[[jobs-kill]]]
+                           weight = 4
+
+            The queue wait times of each lane can be logged with the
+            ``log_proc_pool`` main loop plugin.
+
+            .. versionadded:: 8.7.0
+        '''):
+            with Conf('default', desc='''
+                Default settings for all lanes.
+
+                .. versionadded:: 8.7.0
+            '''):
+                Conf('limit', VDR.V_INTEGER, 0, desc='''
+                    Maximum number of running commands in each lane.
+
+                    Set to ``0`` for no limit (other than the
+                    :cylc:conf:`[scheduler]process pool size`).
+
+                    .. versionadded:: 8.7.0
+                ''')
+                Conf('weight', VDR.V_INTEGER, 1, desc='''
+                    Share of the process pool for each lane when lanes are
+                    competing for it.
+
+                    Lanes with a weight of ``0`` only start commands when no
+                    other lanes are ready to.
+
+                    .. versionadded:: 8.7.0
+                ''')
+            with Conf('<command type>', desc='''
+                Settings for the lanes of a type of command.
+
+                Command types include ``jobs-submit``, ``jobs-poll``,
+                ``jobs-kill``, ``job-logs-retrieve``, ``remote-init``,
+                ``file-install``, ``remote-host-select``, ``xtrigger-func``,
+                ``event-handler``, ``event-mail`` and
+                ``workflow-event-handler``.
+
+                .. versionadded:: 8.7.0
+            '''):
+                Conf('limit', VDR.V_INTEGER, desc='''
+                    Maximum number of running commands in each lane of this
+                    type.
+
+                    Defaults to the ``limit`` in ``[default]``.
+
+                    .. versionadded:: 8.7.0
+                ''')
+                Conf('weight', VDR.V_INTEGER, desc='''
+                    Share of the process pool for each lane of this type.
+
+                    Defaults to the ``weight`` in ``[default]``.
+
+                    .. versionadded:: 8.7.0
+                ''')
+        with Conf('ssh connection pool', desc='''
+            Settings for persistent SSH master connections.
+
+            See :cylc:conf:`global.cylc[platforms][<platform name>]
+            ssh connection pool`.
+
+            .. versionadded:: 8.7.0
+        '''):
+            Conf('health check interval', VDR.V_INTERVAL, DurationFloat(60),
+                 desc='''
+                How often to check master connections are working.
+
+                Connections which fail the check are closed, and replaced
+                when next needed.
+
+                .. versionadded:: 8.7.0
+            ''')
+            Conf('idle timeout', VDR.V_INTERVAL, DurationFloat(600), desc='''
+                Close master connections which have not been used for this
+                long.
+
+                .. versionadded:: 8.7.0
+            ''')
+        with Conf('xtrigger workers', desc='''
+            Run Python xtrigger functions in long-lived worker processes.
+
+            By default, each xtrigger call runs in a new process, which has to
+            start Python and import the xtrigger module. This cost can
+            dominate the scheduler host CPU use for workflows with many
+            xtriggers. Worker processes import each xtrigger module once, then
+            run any number of calls.
+
+            Calls are subject to the
+            :cylc:conf:`[scheduler]process pool timeout`.
+
+            .. note::
+
+               Changes to xtrigger modules are picked up when workers are
+               replaced (after ``max calls``, or on reload), rather than on the
+               next call.
+
+            .. versionadded:: 8.7.0
+        '''):
+            Conf('size', VDR.V_INTEGER, 0, desc='''
+                Maximum number of xtrigger worker processes.
+
+                Workers are started as needed. Set to ``0`` to run each
+                xtrigger call in a new process (in the process pool) instead.
+
+                .. versionadded:: 8.7.0
+            ''')
+            Conf('max calls', VDR.V_INTEGER, 100, desc='''
+                Replace a worker after this many calls.
+
+                Set to ``0`` for no limit.
+
+                .. versionadded:: 8.7.0
+            ''')
+            Conf('max memory', VDR.V_INTEGER, 512, desc='''
+                Replace a worker once its memory use exceeds this many
+                megabytes (MiB).
+
+                Set to ``0`` for no limit.
+
+                .. versionadded:: 8.7.0
+            ''')
         Conf('auto restart delay', VDR.V_INTERVAL, desc=f'''
             Maximum number of seconds the auto-restart mechanism will delay
             before restarting workflows.
@@ -1252,6 +1454,34 @@ with Conf('global.cylc', desc='''
 
                     .. versionadded:: 8.0.0
             ''')
+            Conf('event driven', VDR.V_BOOLEAN, False, desc='''
+                Wake the main loop as soon as there is work to do.
+
+                By default the scheduler main loop runs at a fixed interval
+                (about once a second). This means that task messages,
+                commands and finished subprocesses may wait for up to a full
+                interval before they are acted upon.
+
+                If ``True``, the main loop sleeps until there is work to do
+                (e.g. a task message or command arrives, a subprocess exits
+                or a timer is due) or until the
+                :cylc:conf:`[..]maximum sleep interval` has elapsed. This
+                reduces latency for busy workflows and the CPU used by idle
+                ones.
+
+                .. versionadded:: 8.7.0
+            ''')
+            Conf('maximum sleep interval', VDR.V_INTERVAL, DurationFloat(10),
+                 desc='''
+                The longest time the main loop will sleep for when
+                :cylc:conf:`[..]event driven` is ``True``.
+
+                Time based checks which do not tell the main loop when they
+                are next due (e.g. main loop plugins) may be delayed by up to
+                this interval.
+
+                .. versionadded:: 8.7.0
+            ''')
 
             with Conf('<plugin name>', desc=(
                 default_for(
@@ -2010,6 +2240,31 @@ with Conf('global.cylc', desc='''
 
                 .. versionadded:: 8.3.0
             ''')
+            Conf('ssh connection pool', VDR.V_BOOLEAN, False, desc='''
+                Run SSH commands for this platform over persistent master
+                connections.
+
+                If ``True``, the scheduler keeps an SSH master connection
+                (``ssh -o ControlMaster=yes``) open to each host of this
+                platform that it runs commands on. Commands (e.g. job
+                submission, poll and kill, remote init and file installation)
+                run over this connection, rather than each starting a new
+                connection. This saves the TCP and authentication handshake
+                for each command.
+
+                Commands connect directly until the master connection is up,
+                or if it fails. If the master connection cannot connect, the
+                host is treated as unreachable.
+
+                The ``ssh command`` must support OpenSSH connection
+                multiplexing options.
+
+                .. seealso::
+
+                   :cylc:conf:`global.cylc[scheduler][ssh connection pool]`
+
+                .. versionadded:: 8.7.0
+            ''')
             with Conf('selection', desc='''
                 How to select a host from the list of platform hosts.
 
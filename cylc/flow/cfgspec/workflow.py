@@ -795,6 +795,22 @@ with Conf(
                 Conf('members', VDR.V_SPACELESS_STRING_LIST, desc='''
                     A list of task or family names to assign to this queue.
                 ''')
+                Conf('weight', VDR.V_FLOAT, 1.0, desc='''
+                    The share of the
+                    :cylc:conf:`[scheduling][queue manager]total limit` given
+                    to this queue relative to other queues.
+
+                    E.G. when the total limit is reached, a queue with weight
+                    ``2`` will have twice as many active tasks as a queue
+                    with weight ``1`` (provided both have tasks waiting).
+                    A queue with weight ``0`` only gets a slot when no other
+                    queue has tasks waiting.
+
+                    Only used by the ``priority``
+                    :cylc:conf:`[scheduling][queue manager]type`.
+
+                    .. versionadded:: 8.7.0
+                ''')
             with Conf('default', meta=Queue, desc='''
                 The default queue, for all tasks not assigned to other queues.
             '''):
@@ -802,6 +818,40 @@ with Conf(
                     The job limit for the ``default`` queue. 0 means no limit.
                 ''')
 
+        with Conf('queue manager', desc='''
+            Configuration of how tasks are released from the
+            :cylc:conf:`[..]queues`.
+
+            .. versionadded:: 8.7.0
+        '''):
+            Conf('type', VDR.V_STRING, 'independent',
+                 options=['independent', 'priority'], desc='''
+                How queued tasks are released.
+
+                ``independent``
+                   Each queue releases its tasks in the order they were
+                   queued, up to its own limit.
+                ``priority``
+                   Each queue releases its tasks in order of
+                   :cylc:conf:`[runtime][<namespace>]queue priority`
+                   (then in the order they were queued), up to its own limit.
+
+                   Additionally, the number of active tasks across all queues
+                   can be limited with :cylc:conf:`[..]total limit`, in which
+                   case the available slots are shared between queues in
+                   proportion to their
+                   :cylc:conf:`[scheduling][queues][<queue name>]weight`.
+
+                .. versionadded:: 8.7.0
+            ''')
+            Conf('total limit', VDR.V_INTEGER, 0, desc='''
+                The active job limit across all queues. 0 means no limit.
+
+                Only used by the ``priority`` :cylc:conf:`[..]type`.
+
+                .. versionadded:: 8.7.0
+            ''')
+
         with Conf('special tasks', desc='''
             This section is used to identify tasks with special behaviour.
 
@@ -1217,6 +1267,18 @@ with Conf(
 
                 .. versionadded:: 8.3.0
             ''')
+            Conf('queue priority', VDR.V_INTEGER, 0, desc='''
+                The priority of this task in its internal queue.
+
+                Queued tasks with a higher priority are released before
+                those with a lower priority, regardless of the order they
+                were queued in.
+
+                Only used by the ``priority``
+                :cylc:conf:`[scheduling][queue manager]type`.
+
+                .. versionadded:: 8.7.0
+            ''')
             Conf('platform', VDR.V_STRING, desc='''
                 The platform to submit jobs to.
 
@@ -2481,6 +2481,18 @@ class DataStoreMgr:
 
         self.updates_pending = True
 
+    def delta_main_loop_timings(self):
+        """Collect the main loop phase timing statistics."""
+        w_delta = self.updated[WORKFLOW]
+        w_delta.id = self.workflow_id
+        w_delta.last_updated = time()
+        w_delta.stamp = f'{w_delta.id}@{w_delta.last_updated}'
+
+        w_delta.main_loop_timings = json.dumps(
+            self.schd.main_loop_timer.get_stats()
+        )
+        self.updates_pending = True
+
     def _generate_broadcast_node_deltas(self, node_data, node_type):
         rt_cfg = self.schd.config.cfg['runtime']
         # NOTE: node_data may change during operation so make a copy
@@ -0,0 +1,129 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Track items which need attention at a given time."""
+
+from heapq import heappop, heappush
+from itertools import count
+from typing import (
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+
+T = TypeVar('T', bound=Hashable)
+
+
+class Deadlines(Generic[T]):
+    """Items keyed by the time at which they are next due (a min-heap).
+
+    This allows time based checks (e.g. clock-expiry, late tasks, event
+    handler retries) to look at only the items which are due rather than
+    scanning all items on each main loop iteration.
+
+    Each item has at most one deadline, pushing an item again replaces its
+    deadline. Replaced or removed entries are left in the heap and skipped
+    when they reach the top.
+
+    Examples:
+        >>> deadlines = Deadlines()
+        >>> deadlines.push('a', 3.)
+        >>> deadlines.push('b', 1.)
+        >>> deadlines.push('c', 2.)
+        >>> deadlines.next_deadline()
+        1.0
+        >>> deadlines.push('b', 4.)  # replace the deadline for "b"
+        >>> deadlines.remove('c')
+        >>> deadlines.next_deadline()
+        3.0
+        >>> deadlines.pop_due(3.)
+        ['a']
+        >>> len(deadlines)
+        1
+        >>> deadlines.pop_due(10.)
+        ['b']
+        >>> deadlines.next_deadline() is None
+        True
+
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, T]] = []
+        # The current deadline (and entry sequence number) of each item.
+        self._items: Dict[T, Tuple[float, int]] = {}
+        # Tie-breaker for items with the same deadline (items are not
+        # necessarily comparable).
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._items
+
+    def push(self, item: T, deadline: float) -> None:
+        """Set the time at which an item is next due."""
+        current = self._items.get(item)
+        if current is not None and current[0] == deadline:
+            return
+        seq = next(self._counter)
+        self._items[item] = (deadline, seq)
+        heappush(self._heap, (deadline, seq, item))
+
+    def remove(self, item: T) -> None:
+        """Remove an item (if present)."""
+        self._items.pop(item, None)
+
+    def clear(self) -> None:
+        """Remove all items."""
+        self._heap.clear()
+        self._items.clear()
+
+    def _prune(self) -> None:
+        """Drop replaced or removed entries from the top of the heap."""
+        heap = self._heap
+        while heap:
+            deadline, seq, item = heap[0]
+            if self._items.get(item) == (deadline, seq):
+                return
+            heappop(heap)
+
+    def next_deadline(self) -> Optional[float]:
+        """Return the earliest deadline, or None if there are no items."""
+        self._prune()
+        if self._heap:
+            return self._heap[0][0]
+        return None
+
+    def pop_due(self, now: float) -> List[T]:
+        """Remove and return the items due at or before the given time.
+
+        Items are returned in deadline order.
+        """
+        due: List[T] = []
+        heap = self._heap
+        while True:
+            self._prune()
+            if not heap or heap[0][0] > now:
+                return due
+            _deadline, _seq, item = heappop(heap)
+            del self._items[item]
+            due.append(item)
@@ -0,0 +1,100 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Log the queue wait times of the process pool lanes.
+
+.. note::
+
+   This plugin is for Cylc developers and site administrators tuning the
+   :cylc:conf:`global.cylc[scheduler][process pool lanes]`.
+
+For each lane (type of command and platform) reports the number of commands
+queued, running and started, and the mean and maximum time commands have
+waited in the queue before starting (along with the wait of the oldest
+command still queued).
+
+The results are written to a JSON file in the run directory when the
+workflow is shut down (cleanly).
+
+"""
+
+import json
+from pathlib import Path
+from time import time
+from typing import (
+    Any,
+    Dict,
+)
+
+from cylc.flow import LOG
+from cylc.flow.main_loop import (startup, shutdown, periodic)
+
+
+@startup
+async def init(scheduler, state):
+    """Construct the initial state."""
+    state['data'] = []
+
+
+@periodic
+async def log_proc_pool(scheduler, state):
+    """Log the queue wait times of the process pool lanes."""
+    stats = scheduler.proc_pool.get_lane_stats()
+    state['data'].append((time(), stats))
+    for name, lane_stats in sorted(stats.items()):
+        LOG.info(_format(name, lane_stats))
+
+
+@shutdown
+async def report(scheduler, state):
+    """Take a final measurement and dump the results."""
+    await log_proc_pool(scheduler, state)
+    _dump(state['data'], scheduler.workflow_run_dir)
+
+
+def _format(name: str, stats: Dict[str, Any]) -> str:
+    """Format the metrics of one lane for the log.
+
+    Examples:
+        >>> print(_format('jobs-submit:hpc', {
+        ...     'queued': 20,
+        ...     'running': 4,
+        ...     'started': 100,
+        ...     'wait mean': 1.25,
+        ...     'wait max': 30.0,
+        ...     'wait oldest': 12.5,
+        ... }))  # doctest: +NORMALIZE_WHITESPACE
+        Process pool lane jobs-submit:hpc: 20 queued, 4 running,
+        100 started, wait mean 1.2s, max 30.0s, oldest 12.5s
+
+    """
+    return (
+        f'Process pool lane {name}:'
+        f' {stats["queued"]} queued,'
+        f' {stats["running"]} running,'
+        f' {stats["started"]} started,'
+        f' wait mean {stats["wait mean"]:.1f}s,'
+        f' max {stats["wait max"]:.1f}s,'
+        f' oldest {stats["wait oldest"]:.1f}s'
+    )
+
+
+def _dump(data, path):
+    json.dump(
+        data,
+        Path(path, f'{__name__}.json').open('w+')
+    )
+    return True
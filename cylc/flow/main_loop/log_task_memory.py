@@ -0,0 +1,177 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Log the memory used by the tasks in the task pool.
+
+.. note::
+
+   This plugin is for Cylc developers debugging the per-task memory
+   footprint (e.g. when raising the runahead limit).
+
+Reports the number of bytes attributable to the task proxies in the pool,
+broken down into ``TaskProxy``, ``TaskState``, ``Prerequisite`` and
+``TaskOutputs`` objects, along with the average per task.
+
+Only memory owned by these objects is counted, i.e. the objects themselves
+and the builtin containers, strings and numbers they reference. Other
+objects (e.g. task definitions and cycle points) are not counted. Anything
+referenced from more than one task is counted once.
+
+The results are written to a JSON file in the run directory when the
+workflow is shut down (cleanly).
+
+"""
+
+import json
+from pathlib import Path
+import sys
+from time import time
+from typing import (
+    Dict,
+    Iterable,
+    Set,
+)
+
+from cylc.flow import LOG
+from cylc.flow.main_loop import (startup, shutdown, periodic)
+
+
+# types which are counted as part of the objects which reference them
+BUILTINS = (
+    str, bytes, bytearray, int, float, dict, list, tuple, set, frozenset
+)
+
+CATEGORIES = ('TaskProxy', 'TaskState', 'Prerequisite', 'TaskOutputs')
+
+
+@startup
+async def init(scheduler, state):
+    """Construct the initial state."""
+    state['data'] = []
+
+
+@periodic
+async def log_task_memory(scheduler, state):
+    """Measure and log the memory used by the tasks in the pool."""
+    sizes = _measure(scheduler.pool.get_tasks())
+    state['data'].append((time(), sizes))
+    LOG.info(_format(sizes))
+
+
+@shutdown
+async def report(scheduler, state):
+    """Take a final measurement and dump the results."""
+    await log_task_memory(scheduler, state)
+    _dump(state['data'], scheduler.workflow_run_dir)
+
+
+def _measure(itasks: Iterable) -> Dict[str, int]:
+    """Return the bytes attributable to each type of task object.
+
+    Also returns the number of tasks measured (as "tasks").
+    """
+    seen: Set[int] = set()
+    sizes = dict.fromkeys(CATEGORIES, 0)
+    tasks = 0
+    for itask in itasks:
+        tasks += 1
+        sizes['TaskProxy'] += _sizeof_object(itask, seen)
+        sizes['TaskState'] += _sizeof_object(itask.state, seen)
+        sizes['TaskOutputs'] += _sizeof_object(itask.state.outputs, seen)
+        for prereq in (
+            *itask.state.prerequisites,
+            *itask.state.suicide_prerequisites,
+        ):
+            sizes['Prerequisite'] += _sizeof_object(prereq, seen)
+    return {'tasks': tasks, **sizes}
+
+
+def _sizeof_object(obj: object, seen: Set[int]) -> int:
+    """Return the size of an object and the builtins it references."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    for cls in type(obj).__mro__:
+        for attr in getattr(cls, '__slots__', ()):
+            # (unset slots e.g. lazily allocated attributes are skipped)
+            value = getattr(obj, attr, None)
+            if isinstance(value, BUILTINS):
+                size += _sizeof(value, seen)
+    if hasattr(obj, '__dict__'):
+        size += _sizeof(obj.__dict__, seen)
+    return size
+
+
+def _sizeof(obj: object, seen: Set[int]) -> int:
+    """Return the size of a builtin and the builtins it contains.
+
+    Examples:
+        >>> seen = set()
+        >>> shared = ['a' * 100]
+        >>> _sizeof([shared], seen) > _sizeof([shared], seen)
+        True
+
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        items: Iterable = (*obj.keys(), *obj.values())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = obj
+    else:
+        return size
+    for item in items:
+        if isinstance(item, BUILTINS):
+            size += _sizeof(item, seen)
+    return size
+
+
+def _format(sizes: Dict[str, int]) -> str:
+    """Format a measurement for the log.
+
+    Examples:
+        >>> print(_format({
+        ...     'tasks': 2,
+        ...     'TaskProxy': 2048,
+        ...     'TaskState': 1024,
+        ...     'Prerequisite': 512,
+        ...     'TaskOutputs': 512,
+        ... }))  # doctest: +NORMALIZE_WHITESPACE
+        Task memory: 2 tasks, 4.0 KiB (2.0 KiB/task): TaskProxy 2.0 KiB,
+        TaskState 1.0 KiB, Prerequisite 0.5 KiB, TaskOutputs 0.5 KiB
+
+    """
+    total = sum(sizes[category] for category in CATEGORIES)
+    per_task = total / sizes['tasks'] if sizes['tasks'] else 0
+    return (
+        f'Task memory: {sizes["tasks"]} tasks, {total / 1024:.1f} KiB'
+        f' ({per_task / 1024:.1f} KiB/task): '
+        + ', '.join(
+            f'{category} {sizes[category] / 1024:.1f} KiB'
+            for category in CATEGORIES
+        )
+    )
+
+
+def _dump(data, path):
+    json.dump(
+        data,
+        Path(path, f'{__name__}.json').open('w+')
+    )
+    return True
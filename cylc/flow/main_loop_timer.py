@@ -0,0 +1,175 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Record how long each phase of the scheduler main loop takes."""
+
+from collections import deque
+from time import perf_counter, time
+from typing import Any, Deque, Dict, List, Optional
+
+
+# Upper bounds (seconds) of the histogram buckets, the last bucket is
+# unbounded.
+HISTOGRAM_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)
+
+# The percentiles reported for each phase.
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Return the pct percentile of a sorted list (nearest rank method).
+
+    Examples:
+        >>> percentile([1, 2, 3, 4], 50)
+        2
+        >>> percentile([1, 2, 3, 4], 99)
+        4
+        >>> percentile([5], 90)
+        5
+        >>> percentile([], 50)
+        0.0
+
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def histogram(values: List[float]) -> List[int]:
+    """Bin values into the HISTOGRAM_BUCKETS.
+
+    Examples:
+        >>> histogram([0.0001, 0.005, 0.005, 0.5, 20])
+        [1, 2, 0, 1, 0, 1]
+
+    """
+    counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+    for value in values:
+        for ind, upper in enumerate(HISTOGRAM_BUCKETS):
+            if value < upper:
+                counts[ind] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+
+class MainLoopTimer:
+    """Rolling record of main loop phase durations.
+
+    The main loop calls ``start`` at the beginning of each iteration, then
+    ``mark`` after each phase with the name of the phase which has just
+    completed, then ``end`` once the iteration is over. Each mark costs a
+    single clock call, the statistics are only computed when requested.
+
+    Phases which run more than once in an iteration are summed.
+
+    Args:
+        window:
+            The number of iterations to keep timings for.
+        interval:
+            The minimum time (seconds) between reports, see ``is_due``.
+
+    Examples:
+        >>> timer = MainLoopTimer(window=3)
+        >>> for _ in range(5):
+        ...     timer.start()
+        ...     timer.mark('foo')
+        ...     timer.mark('bar')
+        ...     timer.mark('foo')
+        ...     timer.end()
+        >>> list(timer.phases)
+        ['foo', 'bar', 'total']
+        >>> len(timer.phases['foo'])
+        3
+        >>> stats = timer.get_stats()
+        >>> stats['phases']['foo']['count']
+        3
+        >>> stats['buckets']
+        [0.001, 0.01, 0.1, 1.0, 10.0]
+
+    """
+
+    def __init__(self, window: int = 1000, interval: float = 30.) -> None:
+        self.window = window
+        self.interval = interval
+        self.phases: Dict[str, Deque[float]] = {}
+        self._iteration: Dict[str, float] = {}
+        self._start = 0.
+        self._mark = 0.
+        self._last_report: Optional[float] = None
+
+    def start(self) -> None:
+        """Start timing a main loop iteration."""
+        self._start = self._mark = perf_counter()
+        self._iteration.clear()
+
+    def mark(self, phase: str) -> None:
+        """Record the time since the previous mark against this phase."""
+        now = perf_counter()
+        self._iteration[phase] = (
+            self._iteration.get(phase, 0.) + now - self._mark
+        )
+        self._mark = now
+
+    def end(self) -> None:
+        """Finish timing a main loop iteration."""
+        self._iteration['total'] = perf_counter() - self._start
+        for phase, duration in self._iteration.items():
+            try:
+                self.phases[phase].append(duration)
+            except KeyError:
+                self.phases[phase] = deque([duration], maxlen=self.window)
+
+    def is_due(self) -> bool:
+        """Return True if a report is due.
+
+        A report is due if there are timings to report and the interval has
+        elapsed since the last report. Resets the interval when True is
+        returned.
+        """
+        now = time()
+        if not self.phases or (
+            self._last_report is not None
+            and now - self._last_report < self.interval
+        ):
+            return False
+        self._last_report = now
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return statistics for each phase.
+
+        Durations are in seconds, "histogram" contains the number of
+        iterations in each of the "buckets" (the last is unbounded).
+        """
+        phases: Dict[str, Dict[str, Any]] = {}
+        for phase, durations in self.phases.items():
+            values = sorted(durations)
+            stats: Dict[str, Any] = {
+                'count': len(values),
+                'mean': sum(values) / len(values),
+                'max': values[-1],
+            }
+            for pct in PERCENTILES:
+                stats[f'p{pct}'] = percentile(values, pct)
+            stats['histogram'] = histogram(values)
+            phases[phase] = stats
+        return {
+            'buckets': list(HISTOGRAM_BUCKETS),
+            'phases': phases,
+        }
@@ -756,6 +756,7 @@ class Resolvers(BaseResolvers):
                 cmd,
             )
         )
+        self.schd.wakeup.set()
         return (True, cmd_uuid)
 
     def broadcast(
@@ -814,6 +815,7 @@ class Resolvers(BaseResolvers):
 
         """
         self.schd.ext_trigger_queue.put((message, id))
+        self.schd.wakeup.set()
         return (True, 'Event queued')
 
     def put_messages(
@@ -848,6 +850,7 @@ class Resolvers(BaseResolvers):
                     message,
                 )
             )
+        self.schd.wakeup.set()
         return (True, f'Messages queued: {len(messages)}')
 
     def set_graph_window_extent(
@@ -856,6 +856,20 @@ class Workflow(ObjectType):
             records.
         '''),
     )
+    main_loop_timings = GenericScalar(
+        resolver=resolve_json_dump,
+        description=sstrip('''
+            Durations (seconds) of each phase of the scheduler main loop.
+
+            Contains `buckets`, the upper bounds of the histogram bins, and
+            `phases`, a mapping of phase name to `count`, `mean`, `max`,
+            `p50`, `p90`, `p99` and `histogram` (the number of main loop
+            iterations falling in each bucket) over recent main loop
+            iterations.
+
+            This field is updated periodically rather than every iteration.
+        '''),
+    )
 
 
 class RuntimeSetting(ObjectType):
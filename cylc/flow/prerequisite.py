@@ -17,17 +17,20 @@
 
 """Functionality for expressing and evaluating logical triggers."""
 
+from functools import lru_cache
 import re
+from sys import intern
 from typing import (
     TYPE_CHECKING,
+    Callable,
     Dict,
-    ItemsView,
     Iterable,
     Iterator,
-    KeysView,
+    List,
     Literal,
     NamedTuple,
     Optional,
+    Sequence,
     Tuple,
     Union,
 )
@@ -81,6 +84,219 @@ SatisfiedState = Literal[
 ]
 
 
+# A compiled conditional expression: evaluates a sequence of satisfaction
+# states (one per slot in the expression template) to a bool.
+ConditionalFunc = Callable[[Sequence[SatisfiedState]], bool]
+
+# Tokens of a conditional expression template e.g. "{0}|({1}&{2})".
+_TEMPLATE_TOKEN = re.compile(r'\s*(?:\{(\d+)\}|([&|()]))')
+
+
+@lru_cache(maxsize=None)
+def compile_conditional_expr(template: str) -> ConditionalFunc:
+    """Compile a conditional expression template into a boolean function.
+
+    Templates refer to outputs by slot index rather than by task ID, so they
+    are independent of cycle point and can be shared by all instances of the
+    same dependency.
+
+    Args:
+        template: The expression with outputs replaced by "{<slot>}",
+            e.g. "{0}|({1}&{2})".
+
+    Returns:
+        A function which takes the satisfaction states of the outputs (in slot
+        order) and returns True if the expression is satisfied.
+
+    Raises:
+        TriggerExpressionError: If the template is not a valid expression.
+
+    Examples:
+        >>> func = compile_conditional_expr('{0}|({1}&{2})')
+        >>> func([False, 'satisfied naturally', False])
+        False
+        >>> func([False, 'satisfied naturally', 'force satisfied'])
+        True
+        >>> func(['satisfied naturally', False, False])
+        True
+        >>> compile_conditional_expr('{0}|({1}&{2})') is func
+        True
+        >>> compile_conditional_expr('{0}|')
+        Traceback (most recent call last):
+        ...
+        cylc.flow.exceptions.TriggerExpressionError: ...
+
+    """
+    tokens = []
+    pos = 0
+    while pos < len(template.rstrip()):
+        match = _TEMPLATE_TOKEN.match(template, pos)
+        if not match:
+            raise TriggerExpressionError(
+                f'"{template}": unexpected character at position {pos}'
+            )
+        slot, operator = match.groups()
+        tokens.append(int(slot) if slot is not None else operator)
+        pos = match.end()
+    tokens.append(None)  # end marker
+    index = 0
+
+    def _error() -> TriggerExpressionError:
+        token = tokens[index]
+        return TriggerExpressionError(
+            f'"{template}": unexpected '
+            + ('end of expression' if token is None else f'"{token}"')
+        )
+
+    def _combine(
+        funcs: List[ConditionalFunc], combinator: Callable[..., bool]
+    ) -> ConditionalFunc:
+        if len(funcs) == 1:
+            return funcs[0]
+        funcs_ = tuple(funcs)
+        return lambda values: combinator(func(values) for func in funcs_)
+
+    def _parse_or() -> ConditionalFunc:
+        nonlocal index
+        funcs = [_parse_and()]
+        while tokens[index] == '|':
+            index += 1
+            funcs.append(_parse_and())
+        return _combine(funcs, any)
+
+    def _parse_and() -> ConditionalFunc:
+        nonlocal index
+        funcs = [_parse_atom()]
+        while tokens[index] == '&':
+            index += 1
+            funcs.append(_parse_atom())
+        return _combine(funcs, all)
+
+    def _parse_atom() -> ConditionalFunc:
+        nonlocal index
+        token = tokens[index]
+        if isinstance(token, int):
+            index += 1
+            return lambda values: bool(values[token])
+        if token == '(':
+            index += 1
+            func = _parse_or()
+            if tokens[index] != ')':
+                raise _error()
+            index += 1
+            return func
+        raise _error()
+
+    func = _parse_or()
+    if tokens[index] is not None:
+        raise _error()
+    return func
+
+
+# The satisfaction states, stored by code in Prerequisite objects.
+# Code 0 (False) is the only unsatisfied state. Any other (legacy) states
+# encountered, e.g. loaded from the database, are registered on first use.
+_SATISFIED_STATES: List[SatisfiedState] = [
+    False,
+    'satisfied naturally',
+    'satisfied from database',
+    'satisfied by skip mode',
+    'force satisfied',
+]
+_SATISFIED_STATE_CODES: Dict[SatisfiedState, int] = {
+    state: code for code, state in enumerate(_SATISFIED_STATES)
+}
+_FORCE_SATISFIED = _SATISFIED_STATE_CODES['force satisfied']
+
+
+def _get_state_code(value: SatisfiedState) -> int:
+    """Return the code for a satisfaction state.
+
+    Examples:
+        >>> _get_state_code(False)
+        0
+        >>> _get_state_code('satisfied naturally')
+        1
+        >>> _SATISFIED_STATES[_get_state_code('1')]
+        '1'
+
+    """
+    if not value:
+        return 0
+    try:
+        return _SATISFIED_STATE_CODES[value]
+    except KeyError:
+        _SATISFIED_STATES.append(value)
+        code = _SATISFIED_STATE_CODES[value] = len(_SATISFIED_STATES) - 1
+        return code
+
+
+class PrereqTemplate:
+    """The cycle point independent structure of a Prerequisite.
+
+    This holds the task outputs (by slot) and the conditional expression of a
+    prerequisite. Templates are shared (flyweight) between all prerequisites
+    with the same structure, so each Prerequisite only needs to store the
+    cycle point and satisfaction state of each slot.
+
+    Templates are immutable, extending a template returns a (cached) new one:
+
+    Examples:
+        >>> tmpl = PrereqTemplate.EMPTY.add('a', 'succeeded').add('b', 'x')
+        >>> tmpl.outputs
+        (('a', 'succeeded'), ('b', 'x'))
+        >>> tmpl is PrereqTemplate.EMPTY.add('a', 'succeeded').add('b', 'x')
+        True
+        >>> tmpl.with_conditional('{0}|{1}').conditional
+        '{0}|{1}'
+
+    """
+
+    __slots__ = ('outputs', 'slots', 'conditional', '_children')
+
+    EMPTY: 'PrereqTemplate'
+
+    def __init__(
+        self,
+        outputs: Tuple[Tuple[str, str], ...] = (),
+        conditional: Optional[str] = None,
+    ):
+        # The (task name, output) of each slot.
+        self.outputs = outputs
+        # The slot(s) of each (task name, output).
+        self.slots: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+        for slot, output in enumerate(outputs):
+            self.slots[output] = (*self.slots.get(output, ()), slot)
+        # Expression present only when the OR operator is used, refers to
+        # outputs by slot (see compile_conditional_expr).
+        self.conditional = conditional
+        self._children: Dict[object, 'PrereqTemplate'] = {}
+
+    def add(self, task: str, output: str) -> 'PrereqTemplate':
+        """Return this template extended with a new slot."""
+        key = (task, output)
+        try:
+            return self._children[key]
+        except KeyError:
+            child = self._children[key] = PrereqTemplate(
+                (*self.outputs, key), self.conditional
+            )
+            return child
+
+    def with_conditional(self, conditional: str) -> 'PrereqTemplate':
+        """Return this template with a conditional expression."""
+        try:
+            return self._children[conditional]
+        except KeyError:
+            child = self._children[conditional] = PrereqTemplate(
+                self.outputs, conditional
+            )
+            return child
+
+
+PrereqTemplate.EMPTY = PrereqTemplate()
+
+
 class Prerequisite:
     """The concrete result of an abstract logical trigger expression.
 
@@ -92,18 +308,21 @@ class Prerequisite:
     (e.g. `a => c`, `b => c`). But a single Prerequisite object
     can also have multiple dependencies from operator-joined left-hand side
     expressions in the graph (e.g. `a & (b | c) => d`).
+
+    The structure of the prerequisite is held in a shared PrereqTemplate,
+    each instance stores only the cycle point and the satisfaction state code
+    of each slot.
     """
 
     # Memory optimization - constrain possible attributes to this list.
     __slots__ = (
-        "_satisfied",
+        "_template",
+        "_points",
+        "_state",
         "_cached_satisfied",
-        "conditional_expression",
         "point",
     )
 
-    # Extracts T from "foo.T succeeded" etc.
-    SATISFIED_TEMPLATE = 'bool(self._satisfied[("%s", "%s", "%s")])'
     MESSAGE_TEMPLATE = r'%s/%s %s'
 
     def __init__(self, point: 'PointBase'):
@@ -111,14 +330,17 @@ class Prerequisite:
         # cylc.flow.cycling.PointBase
         self.point = point
 
-        # Dictionary of task outputs pertaining to this prerequisite
-        # (i.e. all the outputs on the LHS of the graph arrow).
-        # {('point string', 'task name', 'output'): DEP_STATE_X, ...}
-        self._satisfied: Dict[PrereqTuple, SatisfiedState] = {}
+        # The task outputs pertaining to this prerequisite (i.e. all the
+        # outputs on the LHS of the graph arrow) and the conditional
+        # expression (if any).
+        self._template = PrereqTemplate.EMPTY
 
-        # Expression present only when the OR operator is used.
-        # '1/foo failed | 1/bar succeeded'
-        self.conditional_expression: Optional[str] = None
+        # The cycle point of each slot in the template.
+        self._points: Tuple[str, ...] = ()
+
+        # The satisfaction state code of each slot in the template
+        # (0 if unsatisfied).
+        self._state = bytearray()
 
         # The cached state of this prerequisite:
         # * `None` (no cached state)
@@ -136,17 +358,35 @@ class Prerequisite:
         """
         return hash((
             self.point,
-            self.conditional_expression,
-            tuple(self._satisfied.keys()),
+            self._template.conditional,
+            self._template.outputs,
+            self._points,
         ))
 
+    def _get_slot(self, key: PrereqTuple) -> Optional[int]:
+        """Return the slot of a dependency (or None if not present)."""
+        for slot in self._template.slots.get((key.task, key.output), ()):
+            if self._points[slot] == key.point:
+                return slot
+        return None
+
+    def _set_slot(self, slot: int, value: SatisfiedState) -> None:
+        """Set the satisfaction state of a slot."""
+        self._state[slot] = _get_state_code(value)
+        if not (self._cached_satisfied and value):
+            # Force later recalculation of cached satisfaction state:
+            self._cached_satisfied = None
+
     def __getitem__(self, key: AnyPrereqTuple) -> SatisfiedState:
         """Return the satisfaction state of a dependency.
 
         Args:
             key: Tuple of (point, name, output) for a task.
         """
-        return self._satisfied[PrereqTuple.coerce(key)]
+        slot = self._get_slot(PrereqTuple.coerce(key))
+        if slot is None:
+            raise KeyError(key)
+        return _SATISFIED_STATES[self._state[slot]]
 
     def __setitem__(
         self,
@@ -164,19 +404,39 @@ class Prerequisite:
         key = PrereqTuple.coerce(key)
         if value is True:
             value = 'satisfied naturally'
-        self._satisfied[key] = value
-        if not (self._cached_satisfied and value):
-            # Force later recalculation of cached satisfaction state:
-            self._cached_satisfied = None
+        slot = self._get_slot(key)
+        if slot is None:
+            self._template = self._template.add(key.task, key.output)
+            self._points = (*self._points, intern(key.point))
+            self._state.append(0)
+            slot = len(self._state) - 1
+        self._set_slot(slot, value)
 
     def __iter__(self) -> Iterator[PrereqTuple]:
-        return iter(self._satisfied)
+        for point, (task, output) in zip(
+            self._points, self._template.outputs
+        ):
+            yield PrereqTuple(point, task, output)
+
+    @property
+    def _satisfied(self) -> Dict[PrereqTuple, SatisfiedState]:
+        """Dictionary of task outputs pertaining to this prerequisite.
+
+        {('point string', 'task name', 'output'): DEP_STATE_X, ...}
+        """
+        return dict(zip(self, self.values()))
+
+    def items(self) -> Iterator[Tuple[PrereqTuple, SatisfiedState]]:
+        for point, (task, output), code in zip(
+            self._points, self._template.outputs, self._state
+        ):
+            yield PrereqTuple(point, task, output), _SATISFIED_STATES[code]
 
-    def items(self) -> ItemsView[PrereqTuple, SatisfiedState]:
-        return self._satisfied.items()
+    def keys(self) -> Iterator[PrereqTuple]:
+        return iter(self)
 
-    def keys(self) -> KeysView[PrereqTuple]:
-        return self._satisfied.keys()
+    def values(self) -> List[SatisfiedState]:
+        return [_SATISFIED_STATES[code] for code in self._state]
 
     def get_raw_conditional_expression(self):
         """Return a representation of this prereq as a string.
@@ -184,13 +444,39 @@ class Prerequisite:
         Returns None if this prerequisite does not involve an OR operator.
 
         """
-        expr = self.conditional_expression
+        expr = self._template.conditional
         if not expr:
             return None
-        for task_output in self._satisfied:
-            expr = expr.replace(self.SATISFIED_TEMPLATE % task_output,
-                                self.MESSAGE_TEMPLATE % task_output)
-        return expr
+        return expr.format(*(self.MESSAGE_TEMPLATE % key for key in self))
+
+    def set_conditional(
+        self, template: str, keys: Iterable[AnyPrereqTuple]
+    ) -> None:
+        """Set the conditional expression for this prerequisite.
+
+        Resets the cached state (self._cached_satisfied).
+
+        Args:
+            template: The expression template, see compile_conditional_expr.
+            keys: The outputs referred to by each slot in the template.
+
+        Examples:
+            >>> preq = Prerequisite(1)
+            >>> preq[(1, 'a', 'succeeded')] = False
+            >>> preq[(1, 'b', 'succeeded')] = False
+            >>> preq.set_conditional(
+            ...     '{0}|{1}', [(1, 'b', 'succeeded'), (1, 'a', 'succeeded')]
+            ... )
+            >>> preq.get_raw_conditional_expression()
+            '1/b succeeded|1/a succeeded'
+
+        """
+        self._cached_satisfied = None
+        # Re-number the template to refer to the slots of this prerequisite.
+        template = template.format(*(
+            '{%d}' % self._get_slot(PrereqTuple.coerce(key)) for key in keys
+        ))
+        self._template = self._template.with_conditional(template)
 
     def set_conditional_expr(self, expr):
         """Set the conditional expression for this prerequisite.
@@ -203,10 +489,8 @@ class Prerequisite:
             >>> preq[(1, 'foo', 'succeeded')] = False
             >>> preq[(11, 'foo', 'succeeded')] = False
             >>> preq.set_conditional_expr("11/foo succeeded|1/foo succeeded")
-            >>> expr = preq.conditional_expression
-            >>> expr.split('|')  # doctest: +NORMALIZE_WHITESPACE
-            ['bool(self._satisfied[("11", "foo", "succeeded")])',
-            'bool(self._satisfied[("1", "foo", "succeeded")])']
+            >>> preq._template.conditional
+            '{1}|{0}'
 
             # GH #6588 integer offset "x[-P2] | a" gives a negative cycle point
             # during validation, for evaluation at the initial cycle point 1.
@@ -214,15 +498,13 @@ class Prerequisite:
             >>> preq[(-1, 'x', 'succeeded')] = False
             >>> preq[(1, 'a', 'succeeded')] = False
             >>> preq.set_conditional_expr("-1/x succeeded|1/a succeeded")
-            >>> expr = preq.conditional_expression
-            >>> expr.split('|')  # doctest: +NORMALIZE_WHITESPACE
-            ['bool(self._satisfied[("-1", "x", "succeeded")])',
-            'bool(self._satisfied[("1", "a", "succeeded")])']
+            >>> preq._template.conditional
+            '{0}|{1}'
         """
         self._cached_satisfied = None
         if '|' in expr:
-            # Make a Python expression so we can eval() the logic.
-            for t_output in self._satisfied:
+            # Convert to a template so we can compile the logic.
+            for ind, t_output in enumerate(self):
                 # Use '\b' in case one task name is a substring of another
                 # and escape special chars ('.', timezone '+') in task IDs.
                 msg = self.MESSAGE_TEMPLATE % t_output
@@ -231,13 +513,8 @@ class Prerequisite:
                     pattern = fr"-\b{re.escape(msg[1:])}\b"
                 else:
                     pattern = fr"\b{re.escape(msg)}\b"
-                expr = re.sub(
-                    pattern,
-                    self.SATISFIED_TEMPLATE % t_output,
-                    expr
-                )
-
-            self.conditional_expression = expr
+                expr = re.sub(pattern, '{%d}' % ind, expr)
+            self._template = self._template.with_conditional(expr)
 
     def is_satisfied(self):
         """Return True if prerequisite is satisfied.
@@ -248,7 +525,7 @@ class Prerequisite:
         if self._cached_satisfied is not None:
             # Cached value.
             return self._cached_satisfied
-        if self._satisfied == {}:
+        if not self._state:
             # No prerequisites left after pre-initial simplification.
             return True
         self._cached_satisfied = self._eval_satisfied()
@@ -260,18 +537,18 @@ class Prerequisite:
         Does not cache the result.
 
         """
-        if not self.conditional_expression:
-            return all(self._satisfied.values())
+        template = self._template.conditional
+        if not template:
+            return 0 not in self._state
 
         try:
-            res = eval(self.conditional_expression)  # nosec
-            # * the expression is constructed internally
-            # * https://github.com/cylc/cylc-flow/issues/4403
-        except (SyntaxError, ValueError) as exc:
+            func = compile_conditional_expr(template)
+        except TriggerExpressionError as exc:
             raise TriggerExpressionError(
-                f'"{self.get_raw_conditional_expression}":\n{str(exc)}'
+                f'"{self.get_raw_conditional_expression()}":\n{exc}'
             ) from None
-        return res
+        # (state codes are falsy only if unsatisfied)
+        return func(self._state)  # type: ignore[arg-type]
 
     def satisfy_me(
         self,
@@ -288,38 +565,60 @@ class Prerequisite:
                 `cylc remove`.
         """
         for output in outputs:
-            output_tuple = PrereqTuple(
-                output['cycle'], output['task'], output['task_sel']
+            self.satisfy_output(
+                PrereqTuple(
+                    output['cycle'], output['task'], output['task_sel']
+                ),
+                mode=mode,
+                forced=forced,
+            )
+
+    def satisfy_output(
+        self,
+        output_tuple: PrereqTuple,
+        mode: Optional[RunMode] = None,
+        forced: bool = False,
+    ) -> None:
+        """Set a single output as satisfied (if it is not already).
+
+        Args:
+            output_tuple: The output to satisfy.
+            mode: Task run mode.
+            forced: If True, records that this should not be undone by
+                `cylc remove`.
+        """
+        slot = self._get_slot(output_tuple)
+        if slot is None:
+            return
+        if not self._state[slot]:
+            self._set_slot(
+                slot,
+                'force satisfied' if forced
+                else 'satisfied by skip mode' if mode == RunMode.SKIP
+                else 'satisfied naturally'
             )
-            if output_tuple not in self._satisfied:
-                continue
-            if not self._satisfied[output_tuple]:
-                self[output_tuple] = (
-                    'force satisfied' if forced
-                    else 'satisfied by skip mode' if mode == RunMode.SKIP
-                    else 'satisfied naturally'
-                )
 
     def api_dump(self) -> Optional[PbPrerequisite]:
         """Return list of populated Protobuf data objects."""
-        if not self._satisfied:
+        if not self._state:
             return None
-        if self.conditional_expression:
+        satisfied = self._satisfied
+        if self._template.conditional:
             expr = (
                 self.get_raw_conditional_expression()
             ).replace('|', ' | ').replace('&', ' & ')
         else:
             expr = ' & '.join(
                 self.MESSAGE_TEMPLATE % task_output
-                for task_output in self._satisfied
+                for task_output in satisfied
             )
         conds = []
-        num_length = len(str(len(self._satisfied)))
-        for ind, output_tuple in enumerate(sorted(self._satisfied)):
+        num_length = len(str(len(satisfied)))
+        for ind, output_tuple in enumerate(sorted(satisfied)):
             t_id = output_tuple.get_id()
             char = str(ind).zfill(num_length)
             c_msg = self.MESSAGE_TEMPLATE % output_tuple
-            c_val = self._satisfied[output_tuple]
+            c_val = satisfied[output_tuple]
             conds.append(
                 PbCondition(
                     task_proxy=t_id,
@@ -343,18 +642,17 @@ class Prerequisite:
         Sets all of the outputs in this prerequisite to satisfied if not
         already.
         """
-        for task_output in self._satisfied:
-            if not self._satisfied[task_output]:
-                self._satisfied[task_output] = 'force satisfied'
-        if self.conditional_expression:
+        state = self._state
+        for slot, code in enumerate(state):
+            if not code:
+                state[slot] = _FORCE_SATISFIED
+        if self._template.conditional:
             self._cached_satisfied = self._eval_satisfied()
         else:
             self._cached_satisfied = True
 
     def iter_target_point_strings(self):
-        yield from {
-            task_output.point for task_output in self._satisfied
-        }
+        yield from set(self._points)
 
     def get_target_points(self):
         """Return a list of cycle points target by each prerequisite,
@@ -370,7 +668,7 @@ class Prerequisite:
         Returns True if any dependencies were changed.
         """
         changed = False
-        for t_output, sat in self._satisfied.items():
+        for t_output, sat in self.items():
             if t_output.get_id() == id_ and sat and sat != 'force satisfied':
                 self[t_output] = False
                 changed = True
@@ -244,7 +244,7 @@ DEFAULT_INCLUDES = [
 
 def construct_rsync_over_ssh_cmd(
     src_path: str, dst_path: str, platform: Dict[str, Any],
-    rsync_includes=None, bad_hosts=None
+    rsync_includes=None, bad_hosts=None, ssh_pool=None
 ) -> Tuple[List[str], str]:
     """Constructs the rsync command used for remote file installation.
 
@@ -256,6 +256,7 @@ def construct_rsync_over_ssh_cmd(
         dst_path: path of target
         platform: contains info relating to platform
         rsync_includes: files and directories to be included in the rsync
+        ssh_pool: SSH connection pool (cylc.flow.ssh_pool) to use, if any
 
     Raises:
         NoHostsError:
@@ -269,6 +270,10 @@ def construct_rsync_over_ssh_cmd(
     dst_path = dst_path.replace('$HOME/', '')
     dst_host = get_host_from_platform(platform, bad_hosts=bad_hosts)
     ssh_cmd = platform['ssh command']
+    if ssh_pool is not None:
+        ssh_opts = ssh_pool.get_ssh_opts(platform, dst_host)
+        if ssh_opts:
+            ssh_cmd = f'{ssh_cmd} {shlex.join(ssh_opts)}'
     command = platform['rsync command']
     rsync_cmd = shlex.split(command)
     rsync_options = [
@@ -302,6 +307,7 @@ def construct_ssh_cmd(
     set_UTC=False,
     set_verbosity=False,
     timeout=None,
+    ssh_pool=None,
 ):
     """Build an SSH command for execution on a remote platform hosts.
 
@@ -323,6 +329,9 @@ def construct_ssh_cmd(
             If True apply -q, -v opts to match cylc.flow.flags.verbosity.
         timeout (str):
             String for bash timeout command.
+        ssh_pool (cylc.flow.ssh_pool.SSHConnectionPool):
+            If provided, run the command over a persistent master connection
+            where possible.
 
     Returns:
         list - A list containing a chosen command including all arguments and
@@ -336,6 +345,8 @@ def construct_ssh_cmd(
         command.append('-Y')
     if stdin is None:
         command.append('-n')
+    if ssh_pool is not None:
+        command += ssh_pool.get_ssh_opts(platform, host)
 
     command.append(host)
 
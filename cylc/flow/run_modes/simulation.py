@@ -363,7 +363,11 @@ def sim_time_check(
                 rtconfig
             )
 
-        if now > itask.mode_settings.timeout:
+        if now <= itask.mode_settings.timeout:
+            task_events_manager.wakeup.set_deadline(
+                itask.mode_settings.timeout
+            )
+        else:
             # simulate custom outputs
             for msg in itask.tdef.rtconfig['outputs'].values():
                 task_events_manager.process_message(
@@ -237,6 +237,19 @@ class CylcWorkflowDAO:
     TABLE_XTRIGGERS = "xtriggers"
     TABLE_ABS_OUTPUTS = "absolute_outputs"
 
+    # Tables cached by cycle point for task history lookups.
+    TASK_HISTORY_TABLES = {TABLE_TASK_OUTPUTS, TABLE_TASK_STATES}
+    # Max number of cycle points to hold in the task history cache.
+    TASK_HISTORY_CACHE_SIZE = 100
+
+    # Indexes in addition to the primary keys, {name: (table, columns)}.
+    # (These are added to existing databases by "create_tables".)
+    INDEXES = {
+        # Task history lookups by cycle point, see "select_prev_instances"
+        # (the primary key is name first so can't be used for these).
+        'task_states_cycle': (TABLE_TASK_STATES, ['cycle']),
+    }
+
     TABLES_ATTRS = {
         TABLE_BROADCAST_EVENTS: [
             ["time"],
@@ -396,6 +409,19 @@ class CylcWorkflowDAO:
             for name, attrs in sorted(self.TABLES_ATTRS.items())
         }
 
+        # Task history (task_states and task_outputs rows) cached by cycle
+        # point then task name, see select_prev_instances and
+        # select_task_outputs.
+        self._prev_instances_cache: Dict[
+            str, Dict[str, List[Tuple[int, bool, Set[int], str]]]
+        ] = {}
+        self._task_outputs_cache: Dict[
+            str, Dict[str, Dict[str, 'FlowNums']]
+        ] = {}
+        # Cycle points with queued writes to the task history tables
+        # (None if the affected points are not known).
+        self._task_history_writes: Set[Optional[str]] = set()
+
         if create_tables:
             self.create_tables()
 
@@ -413,6 +439,10 @@ class CylcWorkflowDAO:
         all these items.
 
         """
+        if table_name in self.TASK_HISTORY_TABLES:
+            self._task_history_writes.add(
+                (where_args or {}).get('cycle')
+            )
         self.tables[table_name].add_delete_item(where_args)
 
     def add_insert_item(self, table_name, args):
@@ -426,6 +456,14 @@ class CylcWorkflowDAO:
         Empty elements are padded with None.
 
         """
+        if table_name in self.TASK_HISTORY_TABLES:
+            if isinstance(args, dict):
+                cycle = args.get('cycle')
+            else:
+                cycle = args[[
+                    column.name for column in self.tables[table_name].columns
+                ].index('cycle')]
+            self._task_history_writes.add(cycle)
         self.tables[table_name].add_insert_item(args)
 
     def add_update_item(
@@ -439,8 +477,33 @@ class CylcWorkflowDAO:
         all these items.
 
         """
+        if table_name in self.TASK_HISTORY_TABLES:
+            if isinstance(item[0], str):
+                self._task_history_writes.add(None)
+            else:
+                self._task_history_writes.add(
+                    cast('DbArgDict', item[1]).get('cycle')
+                )
         self.tables[table_name].add_update_item(item)
 
+    def _invalidate_task_history_cache(self) -> None:
+        """Drop cached task history for points which have been written to."""
+        if None in self._task_history_writes:
+            self._prev_instances_cache.clear()
+            self._task_outputs_cache.clear()
+        else:
+            for cycle in self._task_history_writes:
+                self._prev_instances_cache.pop(cycle, None)
+                self._task_outputs_cache.pop(cycle, None)
+        self._task_history_writes.clear()
+
+    @classmethod
+    def _cache_task_history(cls, cache: dict, cycle: str, value: Any) -> None:
+        """Add a cycle point to a task history cache, evicting the oldest."""
+        if len(cache) >= cls.TASK_HISTORY_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[cycle] = value
+
     def close(self) -> None:
         """Explicitly close the connection."""
         if self.conn is not None:
@@ -469,6 +532,15 @@ class CylcWorkflowDAO:
         for name, table in self.tables.items():
             if name not in names:
                 cur = self.conn.execute(table.get_create_stmt())
+        for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type==?", ["index"]):
+            names.append(row[0])
+        for name, (table_name, columns) in self.INDEXES.items():
+            if name not in names:
+                cur = self.conn.execute(  # nosec B608 (code constants)
+                    f"CREATE INDEX {name} ON {table_name}"
+                    f"({', '.join(columns)})"
+                )
         if cur is not None:
             self.conn.commit()
 
@@ -561,6 +633,7 @@ class CylcWorkflowDAO:
                 table.delete_queues.clear()
                 table.insert_queue.clear()
                 table.update_queues.clear()
+            self._invalidate_task_history_cache()
             # Report public database retry recovery if necessary
             if self.n_tries:
                 LOG.info(
@@ -843,25 +916,33 @@ class CylcWorkflowDAO:
         """Select task_states table info about previous instances of a task.
 
         Flow merge results in multiple entries for the same submit number.
+
+        The rows for all tasks at the cycle point are fetched in one query
+        and cached until the task_states table is written to for that point.
         """
+        try:
+            return list(self._prev_instances_cache[point].get(name, []))
+        except KeyError:
+            pass
         # Ignore bandit false positive: B608: hardcoded_sql_expressions
         # Not an injection, simply putting the table name in the SQL query
         # expression as a string constant local to this module.
         stmt = (  # nosec B608
-            r"SELECT flow_nums,submit_num,flow_wait,status FROM %(name)s"
-            r" WHERE name==? AND cycle==?"
+            r"SELECT name,flow_nums,submit_num,flow_wait,status FROM %(name)s"
+            r" WHERE cycle==?"
         ) % {"name": self.TABLE_TASK_STATES}
-        return [
-            (
+        instances: Dict[str, List[Tuple[int, bool, Set[int], str]]] = {}
+        for name_, flow_nums_str, submit_num, flow_wait, status in (
+            self.connect().execute(stmt, (point,))
+        ):
+            instances.setdefault(name_, []).append((
                 submit_num,
                 flow_wait == 1,
                 deserialise_set(flow_nums_str),
                 status
-            )
-            for flow_nums_str, submit_num, flow_wait, status in (
-                self.connect().execute(stmt, (name, point,))
-            )
-        ]
+            ))
+        self._cache_task_history(self._prev_instances_cache, point, instances)
+        return instances.get(name, [])
 
     def select_latest_flow_nums(self) -> Optional['FlowNums']:
         """Return a list of the most recent previous flow numbers."""
@@ -887,21 +968,31 @@ class CylcWorkflowDAO:
 
         Return: {outputs_dict_str: flow_nums_set}
 
+        The rows for all tasks at the cycle point are fetched in one query
+        and cached until the task_outputs table is written to for that point.
+
         """
+        try:
+            return dict(self._task_outputs_cache[point].get(name, {}))
+        except KeyError:
+            pass
         stmt = rf'''
             SELECT
-               flow_nums,outputs
+               name,flow_nums,outputs
             FROM
                {self.TABLE_TASK_OUTPUTS}
             WHERE
-                name==? AND cycle==?
+                cycle==?
         '''  # nosec B608 (table name is code constant)
-        return {
-            outputs: deserialise_set(flow_nums)
-            for flow_nums, outputs in self.connect().execute(
-                stmt, (name, point,)
+        task_outputs: Dict[str, Dict[str, 'FlowNums']] = {}
+        for name_, flow_nums, outputs in self.connect().execute(
+            stmt, (point,)
+        ):
+            task_outputs.setdefault(name_, {})[outputs] = (
+                deserialise_set(flow_nums)
             )
-        }
+        self._cache_task_history(self._task_outputs_cache, point, task_outputs)
+        return dict(task_outputs.get(name, {}))
 
     def select_xtriggers_for_restart(self, callback):
         stmt = rf'''
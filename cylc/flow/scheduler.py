@@ -110,6 +110,7 @@ from cylc.flow.loggingutil import (
     patch_log_level,
 )
 from cylc.flow.main_loop.health_check import HealthCheckFailed
+from cylc.flow.main_loop_timer import MainLoopTimer
 from cylc.flow.network import API
 from cylc.flow.network.authentication import key_housekeeping
 from cylc.flow.network.server import WorkflowRuntimeServer
@@ -136,7 +137,8 @@ from cylc.flow.profiler import Profiler
 from cylc.flow.resources import get_resources
 from cylc.flow.run_modes import RunMode
 from cylc.flow.run_modes.simulation import sim_time_check
-from cylc.flow.subprocpool import SubProcPool
+from cylc.flow.ssh_pool import SSHConnectionPool
+from cylc.flow.subprocpool import AsyncSubProcPool, SubProcPool
 from cylc.flow.task_events_mgr import TaskEventsManager
 from cylc.flow.task_job_mgr import TaskJobManager
 from cylc.flow.task_pool import TaskPool
@@ -170,6 +172,7 @@ from cylc.flow.wallclock import (
 )
 from cylc.flow.workflow_db_mgr import WorkflowDatabaseManager
 from cylc.flow.workflow_events import WorkflowEventHandler
+from cylc.flow.wakeup import WakeUp
 from cylc.flow.workflow_status import (
     AutoRestartMode,
     StopMode,
@@ -239,6 +242,7 @@ class Scheduler:
     profiler: Profiler
     pool: TaskPool
     proc_pool: SubProcPool
+    ssh_pool: SSHConnectionPool
     task_job_mgr: TaskJobManager
     task_events_mgr: TaskEventsManager
     workflow_event_handler: WorkflowEventHandler
@@ -247,6 +251,7 @@ class Scheduler:
     broadcast_mgr: BroadcastMgr
     xtrigger_mgr: XtriggerManager
     flow_mgr: FlowMgr
+    wakeup: WakeUp
 
     # queues
     command_queue: 'Queue[Tuple[str, str, AsyncGenerator]]'
@@ -316,6 +321,7 @@ class Scheduler:
         self._profile_amounts = {}
         self._profile_update_times = {}
         self.bad_hosts: Set[str] = set()
+        self.main_loop_timer = MainLoopTimer()
 
         self.restored_stop_task_id: Optional[str] = None
 
@@ -399,16 +405,27 @@ class Scheduler:
 
         self.server = WorkflowRuntimeServer(self)
 
-        self.proc_pool = SubProcPool()
+        self.wakeup = WakeUp(
+            glbl_cfg().get(['scheduler', 'main loop', 'event driven'])
+        )
+        if (
+            glbl_cfg().get(['scheduler', 'process pool backend'])
+            == 'asyncio'
+        ):
+            self.proc_pool = AsyncSubProcPool(self.wakeup)
+        else:
+            self.proc_pool = SubProcPool(self.wakeup)
         self.command_queue = Queue()
         self.message_queue = Queue()
         self.ext_trigger_queue = Queue()
+        self.ssh_pool = SSHConnectionPool(self.bad_hosts, self.proc_pool)
         self.workflow_event_handler = WorkflowEventHandler(self.proc_pool)
 
         self.xtrigger_mgr = XtriggerManager(
             self,
             workflow_run_dir=self.workflow_run_dir,
             workflow_share_dir=self.workflow_share_dir,
+            wakeup=self.wakeup,
         )
 
         self.task_events_mgr = TaskEventsManager(
@@ -420,7 +437,9 @@ class Scheduler:
             self.data_store_mgr,
             self.options.log_timestamp,
             self.bad_hosts,
-            self.reset_inactivity_timer
+            self.reset_inactivity_timer,
+            wakeup=self.wakeup,
+            ssh_pool=self.ssh_pool,
         )
 
         self.task_job_mgr = TaskJobManager(
@@ -431,6 +450,7 @@ class Scheduler:
             self.data_store_mgr,
             self.bad_hosts,
             self.server,
+            ssh_pool=self.ssh_pool,
         )
 
         self.profiler = Profiler(self, self.options.profile_mode)
@@ -1430,13 +1450,10 @@ class Scheduler:
 
     def late_tasks_check(self):
         """Report tasks that are never active and are late."""
-        now = time()
-        for itask in self.pool.get_tasks():
+        for itask in self.pool.late_deadlines.pop_due(time()):
             if (
                     not itask.is_late
-                    and itask.get_late_time()
                     and itask.state(*TASK_STATUSES_NEVER_ACTIVE)
-                    and now > itask.get_late_time()
             ):
                 msg = '%s (late-time=%s)' % (
                     self.task_events_mgr.EVENT_LATE,
@@ -1475,6 +1492,7 @@ class Scheduler:
         # Is the workflow ready to shut down now?
         if self.pool.can_stop(self.stop_mode):
             await self.update_data_structure()
+            self.task_job_mgr.flush_job_cmds(force=True)
             self.proc_pool.close()
             if self.stop_mode != StopMode.REQUEST_NOW_NOW:
                 # Wait for process pool to complete,
@@ -1483,7 +1501,9 @@ class Scheduler:
                     "Waiting for the command process pool to empty" +
                     " for shutdown")
                 while self.proc_pool.is_not_done():
-                    sleep(self.INTERVAL_STOP_PROCESS_POOL_EMPTY)
+                    # (yield to the event loop, which runs the commands of
+                    # the asyncio process pool backend)
+                    await asyncio.sleep(self.INTERVAL_STOP_PROCESS_POOL_EMPTY)
                     if stop_process_pool_empty_msg:
                         LOG.info(stop_process_pool_empty_msg)
                         stop_process_pool_empty_msg = None
@@ -1619,31 +1639,36 @@ class Scheduler:
         """A single iteration of the main loop."""
 
         tinit = time()
+        timer = self.main_loop_timer
+        timer.start()
 
         self.pool.compute_runahead()
         self.pool.release_runahead_tasks()
+        timer.mark('release_runahead_tasks')
         # If applicable, set stop mode or shutdown on task failure:
         await self.workflow_shutdown()
+        timer.mark('workflow_shutdown')
 
         # Useful for debugging core scheduler issues:
         # import logging
         # self.pool.log_task_pool(logging.CRITICAL)
         if self.incomplete_ri_map:
             self.manage_remote_init()
+            timer.mark('manage_remote_init')
 
         await self.process_command_queue()
+        timer.mark('process_command_queue')
+        self.task_job_mgr.flush_job_cmds()
         self.proc_pool.process()
+        self.xtrigger_mgr.process_coroutines()
+        timer.mark('process_subprocess_pool')
+        self.ssh_pool.housekeep()
+        timer.mark('ssh_pool_housekeep')
 
         # Unqueued tasks with satisfied prerequisites must be waiting on
         # xtriggers or ext_triggers. Check these and queue tasks if ready.
-        for itask in self.pool.get_tasks():
-            if (
-                not itask.state(TASK_STATUS_WAITING)
-                or itask.state.is_queued
-                or itask.state.is_runahead
-            ):
-                continue
-
+        self.xtrigger_mgr.check_clock_xtriggers()
+        for itask in self.pool.get_waiting_unqueued_tasks():
             if (
                 itask.state.xtriggers
                 and not itask.state.xtriggers_all_satisfied()
@@ -1660,11 +1685,15 @@ class Scheduler:
             self.pool.spawn_psx_task(itask)
             self.pool.queue_if_ready(itask)
 
+        self.xtrigger_mgr.call_xtrigger_batches()
         if self.xtrigger_mgr.do_housekeeping:
-            self.xtrigger_mgr.housekeep(self.pool.get_tasks())
+            self.xtrigger_mgr.housekeep()
+        timer.mark('check_waiting_tasks')
 
         self.pool.clock_expire_tasks()
+        timer.mark('clock_expire_tasks')
         self.release_tasks_to_run()
+        timer.mark('release_tasks_to_run')
 
         if (
             self.get_run_mode() == RunMode.SIMULATION
@@ -1676,6 +1705,7 @@ class Scheduler:
         ):
             # A simulated task state change occurred.
             self.reset_inactivity_timer()
+        timer.mark('sim_time_check')
 
         # auto expire broadcasts
         if not self.is_paused:
@@ -1693,19 +1723,23 @@ class Scheduler:
                     self.broadcast_mgr.expire_broadcast(
                         min_point - self.config.interval_of_longest_sequence
                     )
+        timer.mark('expire_broadcasts')
 
         self.late_tasks_check()
+        timer.mark('late_tasks_check')
 
         self.process_queued_task_messages()
+        timer.mark('process_queued_task_messages')
         await self.process_command_queue()
+        timer.mark('process_command_queue')
         self.task_events_mgr.process_events(self)
 
         # Update state summary, database, and uifeed
         self.workflow_db_mgr.put_task_event_timers(self.task_events_mgr)
+        timer.mark('process_events')
 
         # List of task whose states have changed.
-        updated_task_list = [
-            t for t in self.pool.get_tasks() if t.state.is_updated]
+        updated_task_list = self.pool.pop_updated_tasks()
         has_updated = updated_task_list or self.is_updated
 
         if updated_task_list and self.is_restart_timeout_wait:
@@ -1714,6 +1748,9 @@ class Scheduler:
                 self.timers[self.EVENT_RESTART_TIMEOUT].stop()
                 self.is_restart_timeout_wait = False
 
+        if timer.is_due():
+            self.data_store_mgr.delta_main_loop_timings()
+
         if has_updated or self.data_store_mgr.updates_pending:
             # Update the datastore.
             await self.update_data_structure()
@@ -1734,15 +1771,19 @@ class Scheduler:
                 # Stop the stalled timer.
                 with suppress(KeyError):
                     self.timers[self.EVENT_STALL_TIMEOUT].stop()
+        timer.mark('update_data_structure')
 
         self.process_workflow_db_queue()
+        timer.mark('process_workflow_db_queue')
 
         # If public database is stuck, blast it away by copying the content
         # of the private database into it.
         self.database_health_check()
+        timer.mark('database_health_check')
 
         # Shutdown workflow if timeouts have occurred
         self.timeout_check()
+        timer.mark('timeout_check')
 
         if self.options.profile_mode:
             self.update_profiler_logs(tinit)
@@ -1755,30 +1796,58 @@ class Scheduler:
                 self
             )
         )
+        timer.mark('main_loop_plugins')
 
         if not has_updated and not self.stop_mode:
             # Has the workflow stalled?
             self.check_workflow_stalled()
-
-        # Sleep a bit for things to catch up.
-        # Quick sleep if there are items pending in process pool.
-        # (Should probably use quick sleep logic for other queues?)
-        elapsed = time() - tinit
-        quick_mode = self.proc_pool.is_not_done()
-        if (elapsed >= self.INTERVAL_MAIN_LOOP or
-                quick_mode and elapsed >= self.INTERVAL_MAIN_LOOP_QUICK):
-            # Main loop has taken quite a bit to get through
-            # Still yield control to other threads by sleep(0.0)
-            duration: float = 0
-        elif quick_mode:
-            duration = self.INTERVAL_MAIN_LOOP_QUICK - elapsed
+            timer.mark('check_workflow_stalled')
+
+        if self.wakeup.enabled:
+            # Sleep until there is something to do.
+            if has_updated:
+                # Changes made in this iteration may have created more work
+                # (e.g. newly queued tasks), go round again straight away.
+                self.wakeup.set()
+            self._set_wakeup_deadlines()
+            await self.wakeup.wait(
+                self.cylc_config['main loop']['maximum sleep interval']
+            )
         else:
-            duration = self.INTERVAL_MAIN_LOOP - elapsed
-        await asyncio.sleep(duration)
+            # Sleep a bit for things to catch up.
+            # Quick sleep if there are items pending in process pool.
+            # (Should probably use quick sleep logic for other queues?)
+            elapsed = time() - tinit
+            quick_mode = self.proc_pool.is_not_done()
+            if (elapsed >= self.INTERVAL_MAIN_LOOP or
+                    quick_mode and elapsed >= self.INTERVAL_MAIN_LOOP_QUICK):
+                # Main loop has taken quite a bit to get through
+                # Still yield control to other threads by sleep(0.0)
+                duration: float = 0
+            elif quick_mode:
+                duration = self.INTERVAL_MAIN_LOOP_QUICK - elapsed
+            else:
+                duration = self.INTERVAL_MAIN_LOOP - elapsed
+            await asyncio.sleep(duration)
+        timer.mark('sleep')
+        timer.end()
         # Record latest main loop interval
         self.main_loop_intervals.append(time() - tinit)
         # END MAIN LOOP
 
+    def _set_wakeup_deadlines(self) -> None:
+        """Tell the main loop when the scheduler's own timers are next due."""
+        for timer in self.timers.values():
+            self.wakeup.set_deadline(timer.timeout)
+        self.wakeup.set_deadline(self.stop_clock_time)
+        self.wakeup.set_deadline(self.time_next_kill)
+        self.wakeup.set_deadline(self.auto_restart_time)
+        for deadlines in (
+            self.pool.clock_expire_deadlines,
+            self.pool.late_deadlines,
+        ):
+            self.wakeup.set_deadline(deadlines.next_deadline())
+
     def _update_workflow_state(self):
         """Update workflow state in the data store and push out any deltas.
 
@@ -1885,6 +1954,9 @@ class Scheduler:
             except Exception as exc:
                 LOG.exception(exc)
 
+        if hasattr(self, 'xtrigger_mgr'):
+            self.xtrigger_mgr.cancel_coroutines()
+
         if hasattr(self, 'pool'):
             try:
                 if not self.is_stalled:
@@ -1913,6 +1985,18 @@ class Scheduler:
             # only attempt remote tidy if the workflow has been started
             self.task_job_mgr.task_remote_mgr.remote_tidy()
 
+        if hasattr(self, 'ssh_pool'):
+            try:
+                self.ssh_pool.close()
+            except Exception as exc:
+                LOG.exception(exc)
+
+        if hasattr(self, 'task_job_mgr'):
+            try:
+                self.task_job_mgr.close()
+            except Exception as exc:
+                LOG.exception(exc)
+
         try:
             # Remove ZMQ keys from scheduler
             LOG.debug("Removing authentication keys from scheduler")
@@ -16,19 +16,23 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """USAGE: cylc function-run <module> <name> <json-args> <json-kwargs> <src-dir>
+       cylc function-run --worker
 
 (This command is for internal use.)
 
 Run a Python xtrigger function "<name>(*args, **kwargs)" in the process pool.
 Positional and keyword arguments must be passed in as JSON strings.
 
+With "--worker", run any number of functions, reading the arguments for each
+from STDIN (see cylc.flow.subprocpool.run_function_worker).
+
 Python entry points are the preferred way to make xtriggers available to the
 scheduler, but local xtriggers can be stored in <src-dir>.
 
 """
 import sys
 
-from cylc.flow.subprocpool import run_function
+from cylc.flow.subprocpool import run_function, run_function_worker
 
 INTERNAL = True
 
@@ -38,6 +42,9 @@ def main(*api_args):
         args = [None] + list(api_args)
     else:
         args = sys.argv
+    if args[1:] == ["--worker"]:
+        run_function_worker()
+        return
     if args[1] in ["help", "--help"] or len(args) != 6:
         print(__doc__)
         sys.exit(0)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""cylc main-loop-timings [OPTIONS] ARGS
+
+Show how long each phase of a running scheduler's main loop is taking.
+
+The scheduler records the duration of each phase of its main loop over recent
+iterations. This command prints the number of iterations recorded, the mean,
+50th, 90th and 99th percentile and maximum duration of each phase in
+milliseconds.
+
+The "sleep" phase is the time the scheduler spent idle waiting for something
+to do, the "total" phase is the duration of the whole main loop iteration.
+
+Timings are updated periodically by the scheduler (not every main loop
+iteration).
+
+Examples:
+  # print main loop timings for a running workflow
+  $ cylc main-loop-timings myflow
+
+  # print the timings and histograms in JSON format
+  $ cylc main-loop-timings --json myflow
+"""
+
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from cylc.flow.id_cli import parse_id_async
+from cylc.flow.network.client_factory import get_client
+from cylc.flow.option_parsers import (
+    WORKFLOW_ID_ARG_DOC,
+    CylcOptionParser as COP,
+)
+from cylc.flow.terminal import cli_function
+
+if TYPE_CHECKING:
+    from optparse import Values
+
+
+QUERY = '''
+query ($wFlows: [ID]) {
+  workflows(ids: $wFlows) {
+    id
+    mainLoopTimings
+  }
+}
+'''
+
+COLUMNS = ('count', 'mean', 'p50', 'p90', 'p99', 'max')
+
+
+def get_option_parser() -> COP:
+    parser = COP(
+        __doc__,
+        comms=True,
+        argdoc=[WORKFLOW_ID_ARG_DOC],
+    )
+    parser.add_option(
+        '--json',
+        help='Print the timings (including histograms) in JSON format.',
+        action='store_true',
+        default=False,
+        dest='json',
+    )
+    return parser
+
+
+def format_timings(timings: Dict[str, Any]) -> List[str]:
+    """Format main loop timings as a table (durations in milliseconds).
+
+    Examples:
+        >>> format_timings({})
+        []
+        >>> print('\\n'.join(format_timings({'phases': {'foo': {
+        ...     'count': 3, 'mean': 0.01, 'p50': 0.01, 'p90': 0.012,
+        ...     'p99': 0.012, 'max': 0.0125,
+        ... }}})))
+        phase count  mean   p50   p90   p99   max
+        foo       3 10.00 10.00 12.00 12.00 12.50
+
+    """
+    phases = timings.get('phases', {})
+    if not phases:
+        return []
+    rows = [('phase', *COLUMNS)]
+    for phase, stats in phases.items():
+        rows.append((
+            phase,
+            str(stats['count']),
+            *(f'{stats[key] * 1000:.2f}' for key in COLUMNS[1:]),
+        ))
+    widths = [max(len(cell) for cell in column) for column in zip(*rows)]
+    return [
+        ' '.join(
+            cell.ljust(width) if ind == 0 else cell.rjust(width)
+            for ind, (cell, width) in enumerate(zip(row, widths))
+        ).rstrip()
+        for row in rows
+    ]
+
+
+async def main_loop_timings(workflow_id: str, options: 'Values') -> int:
+    workflow_id, *_ = await parse_id_async(
+        workflow_id,
+        constraint='workflows',
+    )
+    pclient = get_client(workflow_id, timeout=options.comms_timeout)
+
+    query_kwargs = {
+        'request_string': QUERY,
+        'variables': {'wFlows': [workflow_id]}
+    }
+    result = await pclient.async_request('graphql', query_kwargs)
+
+    for workflow in result['workflows']:
+        timings = workflow.get('mainLoopTimings') or {}
+        if options.json:
+            print(json.dumps(timings, indent=4))
+        elif timings.get('phases'):
+            print('\n'.join(format_timings(timings)))
+        else:
+            print('No main loop timings available yet.')
+    return 0
+
+
+@cli_function(get_option_parser)
+def main(_, options: 'Values', workflow_id: str) -> None:
+    asyncio.run(main_loop_timings(workflow_id, options))
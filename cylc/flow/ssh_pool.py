@@ -0,0 +1,374 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Manage persistent SSH master connections for remote commands.
+
+OpenSSH can run many sessions over one connection: a "master" connection
+listens on a control socket, and other ssh commands which are given the
+socket path (``-o ControlPath=...``) run over it, rather than each making
+(and authenticating) a new connection.
+
+The scheduler keeps one master connection per host (and ssh command) for
+platforms with ``ssh connection pool = True``. Commands for a host use its
+master once it is up, and connect directly otherwise.
+
+"""
+
+from contextlib import suppress
+from hashlib import sha256
+import os
+from pathlib import Path
+import shlex
+from shutil import rmtree
+from signal import SIGKILL, SIGTERM
+from subprocess import DEVNULL, TimeoutExpired  # nosec
+from tempfile import mkdtemp
+from time import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from cylc.flow import LOG
+from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
+from cylc.flow.cylc_subproc import procopen
+
+if TYPE_CHECKING:
+    from subprocess import Popen
+
+    from cylc.flow.subprocpool import SubProcPool
+
+
+class SSHMaster:
+    """A master connection to a host, listening on a control socket."""
+
+    # Timeout for control commands (these only talk to the local master).
+    CONTROL_TIMEOUT = 10
+
+    def __init__(self, ssh_cmd: List[str], host: str, path: str):
+        self.ssh_cmd = ssh_cmd
+        self.host = host
+        self.path = path  # control socket
+        self.proc: Optional['Popen[bytes]'] = None
+        self.check_proc: Optional['Popen[bytes]'] = None  # health check
+        self.last_used = self.last_checked = time()
+        # Closing once the commands running over it have finished.
+        self.closing = False
+        self.stop_time: Optional[float] = None
+
+    def start(self) -> None:
+        """Start the master connection (without waiting for it to connect).
+        """
+        cmd = [
+            *self.ssh_cmd,
+            '-o', 'ControlMaster=yes',
+            '-o', f'ControlPath={self.path}',
+            '-o', 'ControlPersist=no',
+            '-N',
+            self.host,
+        ]
+        try:
+            self.proc = procopen(
+                cmd, stdin=DEVNULL, stdout=DEVNULL, stderrpipe=True,
+                # Run as a process group leader, so the master is not sent
+                # signals meant for the scheduler.
+                preexec_fn=os.setpgrp,
+            )
+        except OSError as exc:
+            LOG.warning(
+                f'Could not start SSH master connection to {self.host}: {exc}'
+            )
+        else:
+            LOG.debug(f'Starting SSH master connection: {shlex.join(cmd)}')
+
+    def poll(self) -> Optional[int]:
+        """Return the exit code of the master, or None if still running."""
+        if self.proc is None:
+            # failed to start
+            return 1
+        return self.proc.poll()
+
+    def is_ready(self) -> bool:
+        """Return True if commands can run over the master connection."""
+        # (the master creates its socket once it has connected)
+        return self.poll() is None and os.path.exists(self.path)
+
+    def get_opts(self) -> List[str]:
+        """Return the ssh options for commands to use the master connection.
+        """
+        self.last_used = time()
+        return self._get_control_opts()
+
+    def is_used_by(self, cmd: Any) -> bool:
+        """Return True if a command (list or string) uses the master."""
+        if not cmd:
+            return False
+        opt = f'ControlPath={self.path}'
+        if isinstance(cmd, str):
+            return opt in cmd
+        # (the options may be embedded in an argument, e.g. "rsync --rsh")
+        return any(opt in arg for arg in cmd)
+
+    def start_check(self) -> None:
+        """Start a health check of the master connection.
+
+        The result is collected by "poll_check", so the caller is not
+        blocked while the check runs.
+        """
+        self.last_checked = time()
+        cmd = [*self.ssh_cmd, *self._get_control_opts(), '-O', 'check']
+        try:
+            self.check_proc = procopen(
+                [*cmd, self.host],
+                stdin=DEVNULL, stdout=DEVNULL, stderr=DEVNULL,
+            )
+        except OSError as exc:
+            LOG.warning(
+                f'Could not check SSH master connection to {self.host}: {exc}'
+            )
+
+    def poll_check(self) -> Optional[bool]:
+        """Return the result of the health check (True if it passed).
+
+        Returns None if no check is running, or it has not finished yet.
+        Checks which take longer than CONTROL_TIMEOUT are killed, and fail.
+        """
+        if self.check_proc is None:
+            return None
+        ret_code = self.check_proc.poll()
+        if ret_code is None:
+            if time() - self.last_checked < self.CONTROL_TIMEOUT:
+                return None
+            self.check_proc.kill()
+            self.check_proc.wait()
+        self.check_proc = None
+        return ret_code == 0
+
+    def stop(self) -> None:
+        """Ask the master connection to close (see "reap")."""
+        self.stop_time = time()
+        if self.check_proc is not None and self.check_proc.poll() is None:
+            self.check_proc.kill()
+        if self.proc is not None and self.proc.poll() is None:
+            with suppress(ProcessLookupError):
+                os.killpg(self.proc.pid, SIGTERM)
+
+    def reap(self, wait: bool = False) -> bool:
+        """Return True once the stopped master connection has exited.
+
+        Kills it if it has not exited within CONTROL_TIMEOUT of stopping.
+
+        Args:
+            wait:
+                Wait for the master to exit (else return False if it is
+                still running).
+
+        """
+        if self.proc is not None and self.proc.poll() is None:
+            remaining = (
+                (self.stop_time or 0) + self.CONTROL_TIMEOUT - time()
+            )
+            if remaining > 0:
+                if not wait:
+                    return False
+                with suppress(TimeoutExpired):
+                    self.proc.wait(remaining)
+            if self.proc.poll() is None:
+                with suppress(ProcessLookupError):
+                    os.killpg(self.proc.pid, SIGKILL)
+        if self.proc is not None:
+            self.proc.communicate()
+        if self.check_proc is not None:
+            self.check_proc.wait()
+            self.check_proc = None
+        Path(self.path).unlink(missing_ok=True)
+        return True
+
+    def get_err(self) -> str:
+        """Return the stderr of an exited master connection."""
+        if self.proc is None or self.proc.stderr is None:
+            return ''
+        return self.proc.stderr.read().decode(errors='replace').strip()
+
+    def _get_control_opts(self) -> List[str]:
+        """Return the ssh options for using the control socket."""
+        return ['-o', 'ControlMaster=no', '-o', f'ControlPath={self.path}']
+
+
+class SSHConnectionPool:
+    """Persistent SSH master connections, one per host and ssh command.
+
+    * Master connections are started on demand (see "get_ssh_opts") and
+      closed once they have been idle for the "idle timeout".
+    * Master connections are health checked every "health check interval"
+      (in the background, see "housekeep"). Ones which fail are closed, and
+      replaced when next needed.
+    * If a master connection fails to connect (exits 255), its host is
+      added to "bad_hosts", so that other hosts are tried.
+    * Master connections to hosts in "bad_hosts" (e.g. because a command
+      run over them failed to connect) are closed, and not restarted until
+      the host is removed from "bad_hosts".
+    * Master connections are not idle while commands in the process pool
+      are running over them. Ones to be closed stop taking new commands
+      (which connect directly instead), and are closed once these finish.
+
+    Args:
+        bad_hosts:
+            The scheduler's set of unreachable hosts (shared, not copied).
+        proc_pool:
+            The scheduler's process pool, which runs the commands using the
+            master connections.
+
+    """
+
+    def __init__(
+        self,
+        bad_hosts: Optional[Set[str]] = None,
+        proc_pool: Optional['SubProcPool'] = None,
+    ):
+        self.bad_hosts: Set[str] = set() if bad_hosts is None else bad_hosts
+        self.proc_pool = proc_pool
+        conf = glbl_cfg().get(['scheduler', 'ssh connection pool'])
+        self.check_interval: float = conf['health check interval']
+        self.idle_timeout: float = conf['idle timeout']
+        self.masters: Dict[Tuple[str, str], SSHMaster] = {}
+        # Master connections which have been stopped but not yet exited.
+        # (A new master can't use the control socket until they have.)
+        self.stopping: Dict[Tuple[str, str], SSHMaster] = {}
+        # Directory for control sockets (created when first needed).
+        # NOTE: socket paths are limited to ~100 characters, so these can't
+        # go in the (arbitrarily long) workflow run directory.
+        self.socket_dir: Optional[str] = None
+
+    def get_ssh_opts(self, platform: Dict[str, Any], host: str) -> List[str]:
+        """Return ssh options for a command to use a master connection.
+
+        Starts a master connection to the host if there isn't one. Returns
+        no options (i.e. connect directly) until the master is up.
+        """
+        if not platform.get('ssh connection pool') or host in self.bad_hosts:
+            return []
+        key = (platform['ssh command'], host)
+        if key in self.stopping:
+            return []
+        try:
+            master = self.masters[key]
+        except KeyError:
+            master = self.masters[key] = SSHMaster(
+                shlex.split(platform['ssh command']),
+                host,
+                self._get_socket_path(key),
+            )
+            master.start()
+            return []
+        if master.is_ready() and not master.closing:
+            return master.get_opts()
+        return []
+
+    def housekeep(self) -> None:
+        """Remove failed and idle master connections, run health checks."""
+        for key, master in list(self.stopping.items()):
+            if master.reap():
+                del self.stopping[key]
+        now = time()
+        in_use = self._get_in_use()
+        for key, master in list(self.masters.items()):
+            ret_code = master.poll()
+            if ret_code is not None:
+                LOG.warning(
+                    f'SSH master connection to {master.host} exited'
+                    f' ({ret_code}): {master.get_err()}'
+                )
+                if ret_code == 255:
+                    # could not connect
+                    self.bad_hosts.add(master.host)
+                self._stop(key)
+                continue
+            if master in in_use:
+                master.last_used = now
+            if not master.closing:
+                master.closing = self._should_close(master, now)
+            # (close once the commands running over it have finished)
+            if master.closing and master not in in_use:
+                self._stop(key)
+
+    def close(self) -> None:
+        """Close all master connections."""
+        for key in list(self.masters):
+            self._stop(key)
+        for master in self.stopping.values():
+            master.reap(wait=True)
+        self.stopping.clear()
+        if self.socket_dir:
+            rmtree(self.socket_dir, ignore_errors=True)
+            self.socket_dir = None
+
+    def _stop(self, key: Tuple[str, str]) -> None:
+        """Stop a master connection, without waiting for it to exit."""
+        master = self.masters.pop(key)
+        master.stop()
+        if not master.reap():
+            self.stopping[key] = master
+
+    def _should_close(self, master: SSHMaster, now: float) -> bool:
+        """Return True if a running master connection should be closed.
+
+        Starts a health check if one is due.
+        """
+        if master.host in self.bad_hosts:
+            LOG.debug(
+                f'Closing SSH master connection to bad host {master.host}'
+            )
+            return True
+        if now - master.last_used > self.idle_timeout:
+            LOG.debug(f'Closing idle SSH master connection to {master.host}')
+            return True
+        # (the health check also catches masters which never connect)
+        if master.poll_check() is False:
+            LOG.warning(
+                f'SSH master connection to {master.host} failed health'
+                ' check, closing'
+            )
+            return True
+        if (
+            master.check_proc is None
+            and now - master.last_checked > self.check_interval
+        ):
+            master.start_check()
+        return False
+
+    def _get_in_use(self) -> Set[SSHMaster]:
+        """Return the master connections which commands are running over."""
+        if self.proc_pool is None or not self.masters:
+            return set()
+        return {
+            master
+            for ctx in self.proc_pool.get_running_ctxs()
+            for master in self.masters.values()
+            if master.is_used_by(ctx.cmd)
+        }
+
+    def _get_socket_path(self, key: Tuple[str, str]) -> str:
+        """Return a (short) control socket path for a master connection."""
+        if self.socket_dir is None:
+            self.socket_dir = mkdtemp(prefix='cylc-ssh-')
+        name = sha256('\n'.join(key).encode()).hexdigest()[:16]
+        return os.path.join(self.socket_dir, name)
@@ -16,14 +16,26 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Manage queueing and pooling of subprocesses for the scheduler."""
 
+import asyncio
 from collections import deque
+from contextlib import (
+    redirect_stderr,
+    redirect_stdout,
+    suppress,
+)
+from heapq import merge
+from io import StringIO
+from itertools import count
 import json
 import os
+import re
+import resource
 import selectors
 import shlex
 from signal import SIGKILL
 from subprocess import (  # nosec
     DEVNULL,
+    PIPE,
     TimeoutExpired,
     run,
 )
@@ -31,13 +43,18 @@ import sys
 from tempfile import SpooledTemporaryFile
 from threading import RLock
 from time import time
+import traceback
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Deque,
+    Dict,
+    Iterator,
     List,
     Optional,
     Set,
+    Tuple,
 )
 
 from cylc.flow import (
@@ -55,6 +72,7 @@ from cylc.flow.platforms import (
 from cylc.flow.subprocctx import SubFuncContext
 from cylc.flow.task_events_mgr import TaskJobLogsRetrieveContext
 from cylc.flow.task_proxy import TaskProxy
+from cylc.flow.wakeup import WakeUp
 from cylc.flow.wallclock import get_current_time_string
 
 
@@ -68,7 +86,13 @@ _XTRIG_FUNC_CACHE: dict = {}
 
 
 def _killpg(proc, signal):
-    """Kill a process group."""
+    """Kill a process group.
+
+    Args:
+        proc: The (Popen or asyncio) process leading the group.
+        signal: The signal to send.
+
+    """
     try:
         os.killpg(proc.pid, signal)
     except ProcessLookupError:
@@ -83,7 +107,7 @@ def _killpg(proc, signal):
         # problem that shouldn't happen (it's really a bug in the Cylc subproc)
         LOG.error(
             f'Could not kill process group: {proc.pid}'
-            f'\nCommand: {" ".join(proc.args)}'
+            f'\nCommand: {" ".join(getattr(proc, "args", []))}'
         )
         return False
     return True
@@ -173,6 +197,607 @@ def run_function(mod_name, func_name, json_args, json_kwargs, src_dir):
     sys.stdout.write(json.dumps(res))
 
 
+def run_function_worker():
+    """Run Python functions in a long-lived worker process.
+
+    Reads function calls from STDIN, one per line, each a JSON list of the
+    "run_function" arguments. For each call, writes a JSON object to STDOUT
+    (on a single line) containing the "out", "err" and "ret_code" that the
+    equivalent "cylc function-run" command would have produced, and the peak
+    memory use of the worker in KiB ("maxrss").
+
+    Imported modules are cached between calls.
+
+    Writes "XtriggerWorker.READY" (on a single line) once it has started up
+    and is ready to read calls. Exits at the end of STDIN.
+
+    """
+    # Keep the original STDOUT for results, and send anything else written to
+    # it (e.g. by subprocesses of the functions) to STDERR.
+    results = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    results.write(json.dumps(XtriggerWorker.READY) + '\n')
+    results.flush()
+
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        mod_name, func_name, json_args, json_kwargs, src_dir = (
+            json.loads(line)
+        )
+        err = StringIO()
+        out = ''
+        ret_code = 0
+        try:
+            # Redirect function stdout (and stderr) to the call's stderr.
+            with redirect_stdout(err), redirect_stderr(err):
+                func = get_xtrig_func(mod_name, func_name, src_dir)
+                res = func(*json.loads(json_args), **json.loads(json_kwargs))
+            out = json.dumps(res)
+        except Exception:
+            err.write(traceback.format_exc())
+            ret_code = 1
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            # (reported in bytes rather than KiB)
+            maxrss //= 1024
+        results.write(json.dumps({
+            'out': out,
+            'err': err.getvalue(),
+            'ret_code': ret_code,
+            'maxrss': maxrss,
+        }) + '\n')
+        results.flush()
+
+
+class XtriggerWorker:
+    """A long-lived process which runs xtrigger functions.
+
+    See "run_function_worker".
+    """
+
+    # Message written by the worker once it has started up.
+    READY = {'ready': True}
+
+    def __init__(self, proc: 'Popen[bytes]'):
+        self.proc = proc
+        self.start_time = time()
+        # Has the worker started up?
+        self.ready = False
+        # Number of calls made.
+        self.n_calls = 0
+        # Peak memory use (KiB).
+        self.maxrss = 0
+        # The SubProcPool queue item for the call in progress (if any).
+        self.running: Optional[list] = None
+        # Retire after the call in progress?
+        self.expired = False
+        # Output read from the process.
+        self.out = b''
+        self.err = b''
+        for handle in (proc.stdout, proc.stderr):
+            os.set_blocking(handle.fileno(), False)
+
+    def read(self) -> None:
+        """Read any available output from the process (without blocking)."""
+        for handle in (self.proc.stdout, self.proc.stderr):
+            if handle.closed:
+                continue
+            with suppress(BlockingIOError):
+                while data := os.read(handle.fileno(), 65536):
+                    if handle is self.proc.stdout:
+                        self.out += data
+                    else:
+                        self.err += data
+
+    def get_result(self) -> Optional[dict]:
+        """Return the result of the call in progress, if it has returned.
+
+        Raises:
+            ValueError: if the worker sent an invalid result.
+        """
+        while b'\n' in self.out:
+            line, self.out = self.out.split(b'\n', 1)
+            result = json.loads(line)
+            if self.ready:
+                return result
+            if result != self.READY:
+                raise ValueError(f'expected start-up message, got {result}')
+            self.ready = True
+        return None
+
+    def finish(self, ctx: 'SubProcContext', err: str = '') -> list:
+        """Record the end of the call in progress and return its queue item.
+        """
+        err = self.err.decode(errors='replace') + err
+        if err:
+            ctx.err = (ctx.err or '') + err
+        self.err = b''
+        item, self.running = self.running, None
+        return item  # type: ignore[return-value]
+
+    def kill(self) -> int:
+        """Kill the process, return its exit code."""
+        _killpg(self.proc, SIGKILL)
+        ret_code = self.proc.wait()
+        self.close()
+        return ret_code
+
+    def close(self) -> None:
+        """Read any remaining output and close the pipes of an exited process.
+        """
+        self.read()
+        for handle in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            handle.close()  # type: ignore[union-attr]
+
+
+class XtriggerWorkerPool:
+    """Run xtrigger functions in a pool of long-lived worker processes.
+
+    This avoids the cost of starting a new Python interpreter and importing
+    the xtrigger module for every xtrigger call.
+
+    Workers are started on demand, up to the pool size. A worker is retired
+    after "max_calls" calls, or once its memory use exceeds "max_memory" (MiB),
+    so that functions which leak cannot grow the worker indefinitely.
+
+    Calls are killed on timeout (along with the worker) as for any other
+    command in the process pool. The timeout does not include the time taken
+    for a new worker to start up, which is limited separately.
+
+    """
+
+    # Command to start a worker.
+    CMD = ['cylc', 'function-run', '--worker']
+    # Max time (seconds) for a new worker to start up.
+    STARTUP_TIMEOUT = 120
+
+    def __init__(
+        self, size: int, max_calls: int, max_memory: int, timeout: float
+    ):
+        self.size = size
+        self.max_calls = max_calls
+        self.max_memory = max_memory
+        self.timeout = timeout
+        # SubProcPool queue items waiting for a worker.
+        self.queuings: Deque[list] = deque()
+        self.workers: List[XtriggerWorker] = []
+        # Workers which have been told to exit.
+        self.retiring: List[XtriggerWorker] = []
+
+    def put(self, item: list) -> None:
+        """Queue a SubProcPool queue item for an xtrigger function."""
+        self.queuings.append(item)
+
+    def is_not_done(self) -> bool:
+        """Return True if any calls are queued or in progress."""
+        return bool(self.queuings or self.get_runnings())
+
+    def get_runnings(self) -> List[XtriggerWorker]:
+        """Return the workers with a call in progress."""
+        return [worker for worker in self.workers if worker.running]
+
+    def process(self) -> List[list]:
+        """Handle finished calls and start queued ones.
+
+        Returns:
+            The queue items of the finished calls.
+        """
+        done: List[list] = []
+        for worker in self.get_runnings():
+            self._check(worker, done)
+        while self.queuings:
+            worker = self._get_worker(done)
+            if worker is None:
+                break
+            self._send(worker, self.queuings.popleft(), done)
+        for worker in list(self.retiring):
+            if worker.proc.poll() is not None:
+                worker.close()
+                self.retiring.remove(worker)
+        return done
+
+    def recycle(self) -> None:
+        """Retire all workers, e.g. to pick up changes to xtrigger modules.
+
+        Calls in progress are left to finish.
+        """
+        for worker in list(self.workers):
+            if worker.running is None:
+                self._retire(worker)
+            else:
+                worker.expired = True
+
+    def terminate(self) -> List[list]:
+        """Kill all workers.
+
+        Returns:
+            The queue items of the calls in progress.
+        """
+        done: List[list] = []
+        for worker in (*self.workers, *self.retiring):
+            ret_code = worker.kill()
+            if worker.running:
+                ctx = worker.running[0]
+                ctx.ret_code = ret_code
+                done.append(worker.finish(ctx))
+        self.workers.clear()
+        self.retiring.clear()
+        return done
+
+    def _check(self, worker: XtriggerWorker, done: List[list]) -> None:
+        """Check a worker for the result of the call in progress."""
+        ctx = worker.running[0]  # type: ignore[index]
+        worker.read()
+        was_ready = worker.ready
+        try:
+            result = worker.get_result()
+        except ValueError as exc:
+            # Something other than the worker wrote to its STDOUT.
+            ctx.ret_code = 1
+            done.append(worker.finish(ctx, f'\nxtrigger worker error: {exc}'))
+            self._remove(worker)
+            return
+        if worker.ready and not was_ready:
+            # The worker has started up, start the clock on the call.
+            ctx.timeout = time() + self.timeout
+        if result is not None:
+            ctx.out = result['out']
+            ctx.ret_code = result['ret_code']
+            done.append(worker.finish(ctx, result['err']))
+            worker.n_calls += 1
+            worker.maxrss = result['maxrss']
+            if (
+                worker.expired
+                or (self.max_calls and worker.n_calls >= self.max_calls)
+                or (
+                    self.max_memory
+                    and worker.maxrss > self.max_memory * 1024
+                )
+            ):
+                self._retire(worker)
+        elif worker.proc.poll() is not None:
+            # The worker exited, e.g. the function called sys.exit.
+            worker.read()
+            ctx.ret_code = worker.proc.returncode
+            done.append(worker.finish(ctx))
+            self._remove(worker)
+        elif worker.ready and time() > ctx.timeout:
+            ctx.ret_code = worker.kill()
+            done.append(
+                worker.finish(ctx, f'\nkilled on timeout ({self.timeout})')
+            )
+            self._remove(worker)
+        elif (
+            not worker.ready
+            and time() > worker.start_time + self.STARTUP_TIMEOUT
+        ):
+            ctx.ret_code = worker.kill()
+            done.append(worker.finish(
+                ctx,
+                '\nxtrigger worker failed to start within'
+                f' {self.STARTUP_TIMEOUT}s',
+            ))
+            self._remove(worker)
+
+    def _get_worker(self, done: List[list]) -> Optional[XtriggerWorker]:
+        """Return an idle worker, starting a new one if there is room."""
+        for worker in self.workers:
+            if worker.running is None:
+                return worker
+        if len(self.workers) >= self.size:
+            return None
+        try:
+            proc = procopen(
+                self.CMD, stdin=PIPE, stdoutpipe=True, stderrpipe=True,
+                # Execute command as a process group leader,
+                # so we can use "os.killpg" to kill the whole group.
+                preexec_fn=os.setpgrp,
+            )
+        except OSError as exc:
+            if exc.filename is None:
+                exc.filename = self.CMD[0]
+            LOG.exception(exc)
+            # Fail the queued call rather than retry it forever.
+            ctx = self.queuings[0][0]
+            ctx.ret_code = 1
+            ctx.err = str(exc)
+            done.append(self.queuings.popleft())
+            return None
+        LOG.debug(f'Started xtrigger worker {proc.pid}')
+        worker = XtriggerWorker(proc)
+        self.workers.append(worker)
+        return worker
+
+    def _send(
+        self, worker: XtriggerWorker, item: list, done: List[list]
+    ) -> None:
+        """Send a call to a worker."""
+        ctx = item[0]
+        # (for a new worker, the clock starts once it is ready, see "_check")
+        ctx.timeout = time() + self.timeout if worker.ready else None
+        worker.running = item
+        # (ctx.cmd = cylc function-run <args...>)
+        request = (json.dumps(ctx.cmd[2:]) + '\n').encode()
+        try:
+            worker.proc.stdin.write(request)  # type: ignore[union-attr]
+        except OSError as exc:
+            # The worker has gone away.
+            ctx.ret_code = 1
+            done.append(worker.finish(ctx, f'\nxtrigger worker error: {exc}'))
+            self._remove(worker)
+        else:
+            LOG.debug(ctx.cmd)
+
+    def _retire(self, worker: XtriggerWorker) -> None:
+        """Tell an idle worker to exit."""
+        LOG.debug(
+            f'Retiring xtrigger worker {worker.proc.pid}'
+            f' ({worker.n_calls} calls, {worker.maxrss} KiB)'
+        )
+        self.workers.remove(worker)
+        worker.proc.stdin.close()  # type: ignore[union-attr]
+        self.retiring.append(worker)
+
+    def _remove(self, worker: XtriggerWorker) -> None:
+        """Remove a worker which has exited (or is broken)."""
+        if worker.proc.poll() is None:
+            worker.kill()
+        else:
+            worker.close()
+        self.workers.remove(worker)
+
+
+def get_lane_key(
+    ctx: 'SubProcContext', callback_args: Optional[list] = None
+) -> Tuple[str, str]:
+    """Return the process pool lane for a command.
+
+    Lanes are keyed by the type of command and the platform (or install
+    target) it is for. Commands which are not for a particular platform are
+    keyed by the host they run on.
+
+    Examples:
+        >>> from cylc.flow.subprocctx import SubProcContext
+        >>> get_lane_key(SubProcContext('jobs-poll', ['true']))
+        ('jobs-poll', 'localhost')
+        >>> get_lane_key(
+        ...     SubProcContext('remote-init', ['true'], host='h1'),
+        ...     [{'name': 'p1', 'install target': 't1'}],
+        ... )
+        ('remote-init', 't1')
+        >>> get_lane_key(SubProcContext(
+        ...     (('event-handler-00', 'failed'), 1), ['true']
+        ... ))
+        ('event-handler', 'localhost')
+
+    """
+    cmd_key = ctx.cmd_key
+    if isinstance(cmd_key, TaskJobLogsRetrieveContext):
+        return (
+            'job-logs-retrieve',
+            cmd_key.platform_name or ctx.host,
+        )
+    if hasattr(cmd_key, '_fields'):
+        # e.g. TaskEventMailContext
+        cmd_key = cmd_key.key
+    while isinstance(cmd_key, tuple):
+        # event handlers, e.g. ((handler, event), submit_num)
+        cmd_key = cmd_key[0]
+    # (event handlers are numbered, e.g. "workflow-event-handler-00")
+    cmd_type = re.sub(r'-\d+$', '', str(cmd_key))
+    for arg in callback_args or []:
+        if isinstance(arg, dict) and 'install target' in arg:
+            return (cmd_type, arg['install target'])
+        if isinstance(arg, list) and arg and isinstance(arg[0], TaskProxy):
+            # e.g. job submit/poll/kill for a batch of tasks
+            arg = arg[0]
+        if isinstance(arg, TaskProxy):
+            return (cmd_type, arg.platform['name'])
+    return (cmd_type, ctx.host)
+
+
+class SubProcLane:
+    """Queued commands of one type for one platform (or install target).
+
+    Also records how long commands wait in the queue before they start.
+    """
+
+    def __init__(self, key: Tuple[str, str], limit: int, weight: int):
+        self.key = key
+        self.name = ':'.join(key)
+        self.limit = limit  # max running commands (0 for no limit)
+        self.weight = weight  # share of the pool when lanes are competing
+        # Queued commands: (sequence number, time queued, queue item).
+        self.queuings: Deque[Tuple[int, float, list]] = deque()
+        self.n_running = 0
+        # Current weight for smooth weighted round robin.
+        self.current_weight = 0
+        # Queue wait metrics.
+        self.n_started = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def is_ready(self) -> bool:
+        """Return True if I have a command which can start now."""
+        return bool(self.queuings) and not (
+            self.limit and self.n_running >= self.limit
+        )
+
+    def get_stats(self, now: float) -> Dict[str, Any]:
+        """Return my queue wait metrics (times in seconds)."""
+        return {
+            'queued': len(self.queuings),
+            'running': self.n_running,
+            'started': self.n_started,
+            'wait mean': (
+                self.wait_total / self.n_started if self.n_started else 0.0
+            ),
+            'wait max': self.wait_max,
+            'wait oldest': (
+                now - self.queuings[0][1] if self.queuings else 0.0
+            ),
+        }
+
+
+class SubProcQueue:
+    """Commands waiting to run in the process pool, divided into lanes.
+
+    Each type of command for each platform (or install target) has its own
+    lane (see "get_lane_key"), so that a burst of commands for one platform
+    cannot hold up commands for others. Lanes can limit the number of
+    commands they have running, and the next command to start is picked
+    from the lanes by (smooth) weighted round robin. Lane limits and
+    weights are configured by command type under
+    [scheduler][process pool lanes].
+
+    Otherwise this acts like a deque of queue items in the order they were
+    queued, e.g. "popleft" returns the oldest item in any lane.
+
+    """
+
+    DEFAULT = 'default'
+
+    def __init__(self, lanes_conf: Optional[dict] = None):
+        self.lanes_conf: dict = lanes_conf or {}
+        self.lanes: Dict[Tuple[str, str], SubProcLane] = {}
+        # Lanes of started commands, by context.
+        self.running_lanes: Dict['SubProcContext', SubProcLane] = {}
+        # Queue order across lanes.
+        self._seq = count()
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[list]:
+        for _seq, _queued, item in merge(
+            *(lane.queuings for lane in self.lanes.values())
+        ):
+            yield item
+
+    def __getitem__(self, index: int) -> list:
+        if index == 0 and self._len:
+            return self._get_oldest().queuings[0][2]
+        return list(self)[index]
+
+    def append(self, item: list) -> None:
+        """Queue an item in its lane."""
+        self.get_lane(item[0], item[3]).queuings.append(
+            (next(self._seq), time(), item)
+        )
+        self._len += 1
+
+    def extend(self, items) -> None:
+        """Queue items in their lanes."""
+        for item in items:
+            self.append(item)
+
+    def popleft(self) -> list:
+        """Remove and return the oldest item (without starting it)."""
+        if not self._len:
+            raise IndexError('pop from an empty queue')
+        self._len -= 1
+        return self._get_oldest().queuings.popleft()[2]
+
+    def remove(self, item: list) -> None:
+        """Remove an item."""
+        for lane in self.lanes.values():
+            for entry in lane.queuings:
+                if entry[2] == item:
+                    lane.queuings.remove(entry)
+                    self._len -= 1
+                    return
+        raise ValueError('item not in queue')
+
+    def clear(self) -> None:
+        """Remove all items."""
+        for lane in self.lanes.values():
+            lane.queuings.clear()
+        self._len = 0
+
+    def get_lane(
+        self, ctx: 'SubProcContext', callback_args: Optional[list] = None
+    ) -> SubProcLane:
+        """Return the lane for a command, adding it if necessary."""
+        key = get_lane_key(ctx, callback_args)
+        try:
+            return self.lanes[key]
+        except KeyError:
+            pass
+        # (command type settings override the defaults)
+        limit, weight = 0, 1
+        for name in (self.DEFAULT, key[0]):
+            conf = self.lanes_conf.get(name) or {}
+            if conf.get('limit') is not None:
+                limit = conf['limit']
+            if conf.get('weight') is not None:
+                weight = conf['weight']
+        lane = self.lanes[key] = SubProcLane(key, limit, weight)
+        return lane
+
+    def start_next(self) -> Optional[list]:
+        """Remove and return the next item to start.
+
+        The item is counted as running in its lane until "done" is called
+        for its context.
+
+        Returns None if no lane can start a command (i.e. they are empty or
+        at their limits).
+        """
+        chosen: Optional[SubProcLane] = None
+        total_weight = 0
+        for lane in self.lanes.values():
+            if lane.is_ready():
+                lane.current_weight += lane.weight
+                total_weight += lane.weight
+                if (
+                    chosen is None
+                    or lane.current_weight > chosen.current_weight
+                ):
+                    chosen = lane
+        if chosen is None:
+            return None
+        chosen.current_weight -= total_weight
+        _seq, queued, item = chosen.queuings.popleft()
+        self._len -= 1
+        if not chosen.queuings:
+            # (don't carry credit over to the next burst)
+            chosen.current_weight = 0
+        wait = time() - queued
+        chosen.n_running += 1
+        chosen.n_started += 1
+        chosen.wait_total += wait
+        chosen.wait_max = max(chosen.wait_max, wait)
+        self.running_lanes[item[0]] = chosen
+        return item
+
+    def done(self, ctx: 'SubProcContext') -> None:
+        """Free the lane slot of a command returned by "start_next"."""
+        lane = self.running_lanes.pop(ctx, None)
+        if lane is not None:
+            lane.n_running -= 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return queue wait metrics for each lane, by lane name.
+
+        Lane names are "<command type>:<platform or install target>".
+        """
+        now = time()
+        return {
+            lane.name: lane.get_stats(now)
+            for lane in self.lanes.values()
+        }
+
+    def _get_oldest(self) -> SubProcLane:
+        """Return the (non-empty) lane with the oldest item."""
+        return min(
+            (lane for lane in self.lanes.values() if lane.queuings),
+            key=lambda lane: lane.queuings[0][0],
+        )
+
+
 class SubProcPool:
     """Manage queueing and pooling of subprocesses.
 
@@ -191,6 +816,14 @@ class SubProcPool:
     SubProcContext object as they are read. STDIN can also be specified for the
     command. This is currently fed into the command using a temporary file.
 
+    Queued commands are divided into lanes by command type and platform (see
+    SubProcQueue), so that a burst of commands for one platform does not
+    hold up commands for others.
+
+    If the main loop is event driven (see cylc.flow.wakeup.WakeUp), output on
+    (or closure of) the STDOUT/STDERR of a running command wakes up the main
+    loop so that exited commands are processed promptly.
+
     Note: For a cylc command that uses
     `cylc.flow.option_parsers.CylcOptionParser`, the default logging handler
     writes to the STDERR via a StreamHandler. Therefore, log messages will
@@ -203,7 +836,8 @@ class SubProcPool:
     JOBS_SUBMIT = 'jobs-submit'
     RET_CODE_WORKFLOW_STOPPING = 999
 
-    def __init__(self):
+    def __init__(self, wakeup: Optional[WakeUp] = None):
+        self.wakeup = wakeup or WakeUp(enabled=False)
         self.size = glbl_cfg().get(['scheduler', 'process pool size'])
         self.proc_pool_timeout = glbl_cfg().get(
             ['scheduler', 'process pool timeout'])
@@ -211,9 +845,22 @@ class SubProcPool:
         self.stopping = False  # No more job submit if True
         # .stopping may be set by an API command in a different thread
         self.stopping_lock = RLock()
-        self.queuings = deque()
-        self.runnings = []
+        self.queuings = SubProcQueue(
+            glbl_cfg().get(['scheduler', 'process pool lanes']))
+        self.runnings: List[list] = []
         self.pipepoller = selectors.DefaultSelector()
+        # File descriptors registered with the event loop for wake up
+        self._watched_fds: List[int] = []
+        # Long-lived processes for running xtrigger functions (optional)
+        self.xtrigger_workers: Optional[XtriggerWorkerPool] = None
+        workers_conf = glbl_cfg().get(['scheduler', 'xtrigger workers'])
+        if workers_conf['size']:
+            self.xtrigger_workers = XtriggerWorkerPool(
+                workers_conf['size'],
+                workers_conf['max calls'],
+                workers_conf['max memory'],
+                self.proc_pool_timeout,
+            )
 
     def close(self):
         """Mark the pool as closed, which will prevent putting new commands,
@@ -229,7 +876,27 @@ class SubProcPool:
 
     def is_not_done(self):
         """Return True if queuings or runnings not empty."""
-        return self.queuings or self.runnings
+        return (
+            self.queuings
+            or self.runnings
+            or (self.xtrigger_workers and self.xtrigger_workers.is_not_done())
+        )
+
+    def get_running_ctxs(self) -> List['SubProcContext']:
+        """Return the contexts of the commands currently running."""
+        return [running[1] for running in self.runnings]
+
+    def get_lane_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return queue wait metrics for each lane of the queue.
+
+        See SubProcQueue.get_stats.
+        """
+        return self.queuings.get_stats()
+
+    def recycle_xtrigger_workers(self) -> None:
+        """Restart xtrigger workers, e.g. to pick up changed modules."""
+        if self.xtrigger_workers:
+            self.xtrigger_workers.recycle()
 
     def _is_stopping(self):
         """Return whether .stopping is True or not.
@@ -252,6 +919,7 @@ class SubProcPool:
         callback_255_args: Optional[list] = None,
     ):
         """Get ret_code, out, err of exited command, and call its callback."""
+        self.queuings.done(ctx)
         ctx.ret_code = proc.wait()
         out, err = (f.decode() for f in proc.communicate())
         if out:
@@ -273,6 +941,7 @@ class SubProcPool:
 
     def process(self):
         """Process done child processes and submit more."""
+        self._unwatch_pipes()
         # Handle child processes that are done
         runnings = []
         for running in self.runnings:
@@ -323,14 +992,26 @@ class SubProcPool:
 
         # Update list of running items
         self.runnings[:] = runnings
-        # Create more child processes, if items in queue and space in pool
+        # Handle xtrigger functions run by workers
+        if self.xtrigger_workers:
+            for item in self.xtrigger_workers.process():
+                self._item_exit(*item)
+        self._run_queued()
+        self._watch_pipes()
+
+    def _run_queued(self) -> None:
+        """Create more child processes, if items in queue and space in pool."""
         stopping = self._is_stopping()
-        while self.queuings and len(self.runnings) < self.size:
+        while (
+            len(self.runnings) < self.size
+            and (item := self.queuings.start_next()) is not None
+        ):
             (
                 ctx, bad_hosts, callback, callback_args,
                 callback_255, callback_255_args
-            ) = self.queuings.popleft()
+            ) = item
             if stopping and ctx.cmd_key == self.JOBS_SUBMIT:
+                self.queuings.done(ctx)
                 ctx.err = self.ERR_WORKFLOW_STOPPING
                 ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
                 self._run_command_exit(ctx)
@@ -339,13 +1020,84 @@ class SubProcPool:
                     ctx, bad_hosts, callback, callback_args,
                     callback_255, callback_255_args
                 )
-                if proc is not None:
+                if proc is None:
+                    self.queuings.done(ctx)
+                else:
                     ctx.timeout = time() + self.proc_pool_timeout
                     self.runnings.append([
                         proc, ctx, bad_hosts, callback, callback_args,
                         callback_255, callback_255_args
                     ])
 
+    def _item_exit(
+        self,
+        ctx: 'SubProcContext',
+        bad_hosts: Optional[Set[str]] = None,
+        callback: Optional[Callable] = None,
+        callback_args: Optional[List[Any]] = None,
+        callback_255: Optional[Callable] = None,
+        callback_255_args: Optional[List[Any]] = None,
+    ) -> None:
+        """Call the callback of a command run outside of "runnings".
+
+        I.e. a function run by an xtrigger worker, or a command run on the
+        event loop.
+        """
+        LOG.debug(
+            ctx.dump() if isinstance(ctx, SubFuncContext) else ctx
+        )
+        self._run_command_exit(
+            ctx, bad_hosts=bad_hosts,
+            callback=callback, callback_args=callback_args,
+            callback_255=callback_255, callback_255_args=callback_255_args
+        )
+
+    def _watch_pipes(self) -> None:
+        """Wake the main loop when a running command has output or exits.
+
+        Exiting commands close their STDOUT/STDERR which makes them readable.
+        Readers are removed again on the first wake up (or the next call to
+        "process"), so a chatty command cannot cause the main loop to spin.
+        """
+        workers = (
+            self.xtrigger_workers.get_runnings()
+            if self.xtrigger_workers else []
+        )
+        if not self.wakeup.enabled or not (self.runnings or workers):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # not called from the main loop
+            return
+        for proc, ctx, *_ in (
+            *self.runnings,
+            *(
+                (worker.proc, worker.running[0])  # type: ignore[index]
+                for worker in workers
+            ),
+        ):
+            self.wakeup.set_deadline(ctx.timeout)
+            for handle in (proc.stdout, proc.stderr):
+                if handle and not handle.closed:
+                    loop.add_reader(handle.fileno(), self._on_pipe_readable)
+                    self._watched_fds.append(handle.fileno())
+
+    def _unwatch_pipes(self) -> None:
+        """Remove readers added by "_watch_pipes"."""
+        if not self._watched_fds:
+            return
+        with suppress(RuntimeError):
+            loop = asyncio.get_running_loop()
+            for fd in self._watched_fds:
+                loop.remove_reader(fd)
+        self._watched_fds.clear()
+
+    def _on_pipe_readable(self) -> None:
+        """Event loop callback for readable command STDOUT/STDERR."""
+        self._unwatch_pipes()
+        self.wakeup.set()
+
     def put_command(
         self, ctx, bad_hosts=None, callback=None, callback_args=None,
         callback_255=None, callback_255_args=None
@@ -372,12 +1124,15 @@ class SubProcPool:
                 callback_255=callback_255, callback_255_args=callback_255_args
             )
         else:
-            self.queuings.append(
-                [
-                    ctx, bad_hosts, callback, callback_args,
-                    callback_255, callback_255_args
-                ]
-            )
+            item = [
+                ctx, bad_hosts, callback, callback_args,
+                callback_255, callback_255_args
+            ]
+            if self.xtrigger_workers and isinstance(ctx, SubFuncContext):
+                self.xtrigger_workers.put(item)
+            else:
+                self.queuings.append(item)
+            self.wakeup.set()
 
     @classmethod
     def run_command(cls, ctx, callback: Optional[Callable] = None):
@@ -422,11 +1177,19 @@ class SubProcPool:
         """Drain queue, and kill and process remaining child processes."""
         self.close()
         # Drain queue
-        while self.queuings:
-            ctx = self.queuings.popleft()[0]
+        queuings = self.queuings
+        if self.xtrigger_workers:
+            queuings.extend(self.xtrigger_workers.queuings)
+            self.xtrigger_workers.queuings.clear()
+        while queuings:
+            ctx = queuings.popleft()[0]
             ctx.err = self.ERR_WORKFLOW_STOPPING
             ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
             self._run_command_exit(ctx)
+        # Kill xtrigger workers
+        if self.xtrigger_workers:
+            for item in self.xtrigger_workers.terminate():
+                self._item_exit(*item)
         # Kill remaining processes
         for value in self.runnings:
             proc = value[0]
@@ -434,6 +1197,7 @@ class SubProcPool:
                 _killpg(proc, SIGKILL)
         # Wait for child processes
         self.process()
+        self._unwatch_pipes()
         self.pipepoller.close()
 
     def _poll_proc_pipes(
@@ -483,6 +1247,34 @@ class SubProcPool:
             for handle in list(self.pipepoller.get_map()):
                 self.pipepoller.unregister(handle)
 
+    @classmethod
+    def _get_stdin_file(cls, ctx):
+        """Return the STDIN file for the command in ctx."""
+        if ctx.cmd_kwargs.get('stdin_files'):
+            if len(ctx.cmd_kwargs['stdin_files']) > 1:
+                stdin_file = cls.get_temporary_file()
+                for file_ in ctx.cmd_kwargs['stdin_files']:
+                    if hasattr(file_, 'read'):
+                        stdin_file.write(file_.read())
+                    else:
+                        with open(file_, 'rb') as openfile:
+                            stdin_file.write(openfile.read())
+                stdin_file.seek(0)
+            elif hasattr(ctx.cmd_kwargs['stdin_files'][0], 'read'):
+                stdin_file = ctx.cmd_kwargs['stdin_files'][0]
+            else:
+                stdin_file = open(  # noqa: SIM115
+                    # (nasty use of file handles, should avoid in future)
+                    ctx.cmd_kwargs['stdin_files'][0], 'rb'
+                )
+        elif ctx.cmd_kwargs.get('stdin_str'):
+            stdin_file = cls.get_temporary_file()
+            stdin_file.write(ctx.cmd_kwargs.get('stdin_str').encode())
+            stdin_file.seek(0)
+        else:
+            stdin_file = DEVNULL
+        return stdin_file
+
     @classmethod
     def _run_command_init(
         cls, ctx, bad_hosts=None, callback=None, callback_args=None,
@@ -490,29 +1282,7 @@ class SubProcPool:
     ):
         """Prepare and launch shell command in ctx."""
         try:
-            if ctx.cmd_kwargs.get('stdin_files'):
-                if len(ctx.cmd_kwargs['stdin_files']) > 1:
-                    stdin_file = cls.get_temporary_file()
-                    for file_ in ctx.cmd_kwargs['stdin_files']:
-                        if hasattr(file_, 'read'):
-                            stdin_file.write(file_.read())
-                        else:
-                            with open(file_, 'rb') as openfile:
-                                stdin_file.write(openfile.read())
-                    stdin_file.seek(0)
-                elif hasattr(ctx.cmd_kwargs['stdin_files'][0], 'read'):
-                    stdin_file = ctx.cmd_kwargs['stdin_files'][0]
-                else:
-                    stdin_file = open(  # noqa: SIM115
-                        # (nasty use of file handles, should avoid in future)
-                        ctx.cmd_kwargs['stdin_files'][0], 'rb'
-                    )
-            elif ctx.cmd_kwargs.get('stdin_str'):
-                stdin_file = cls.get_temporary_file()
-                stdin_file.write(ctx.cmd_kwargs.get('stdin_str').encode())
-                stdin_file.seek(0)
-            else:
-                stdin_file = DEVNULL
+            stdin_file = cls._get_stdin_file(ctx)
             proc = procopen(
                 ctx.cmd, stdin=stdin_file, stdoutpipe=True, stderrpipe=True,
                 # Execute command as a process group leader,
@@ -691,3 +1461,200 @@ class SubProcPool:
         ):
             rsync_255_fail = True
         return rsync_255_fail
+
+
+class AsyncSubProcPool(SubProcPool):
+    """Manage queueing and pooling of subprocesses on the event loop.
+
+    Commands are run with asyncio subprocesses, rather than being polled each
+    time "process" is called (i.e. once per main loop iteration):
+
+    * Queued commands are started as soon as there is space in the pool,
+      i.e. when they are queued, or as soon as another command exits.
+    * Command STDOUT/STDERR are read by the event loop as they are written.
+    * Exited commands wake up the main loop, which calls their callbacks in
+      "process" as for SubProcPool. So callbacks still run at a known point
+      in the main loop, not in the middle of other work.
+
+    Commands can only be started from within a running event loop. If
+    "process" is called outside of one (e.g. in tests), queued commands are
+    run by SubProcPool as normal.
+
+    """
+
+    def __init__(self, wakeup: Optional[WakeUp] = None):
+        super().__init__(wakeup)
+        # Commands running on the event loop: their queue items and
+        # processes (once started).
+        self.tasks: Dict[
+            'asyncio.Task',
+            Tuple[list, Optional['asyncio.subprocess.Process']],
+        ] = {}
+        # Exited commands, waiting for their callbacks to be called.
+        self.exited: Deque[list] = deque()
+
+    def is_not_done(self):
+        """Return True if queuings, runnings or exited not empty."""
+        return super().is_not_done() or self.tasks or self.exited
+
+    def get_running_ctxs(self) -> List['SubProcContext']:
+        """Return the contexts of the commands currently running."""
+        return [
+            *super().get_running_ctxs(),
+            *(item[0] for item, _proc in self.tasks.values()),
+        ]
+
+    def put_command(
+        self, ctx, bad_hosts=None, callback=None, callback_args=None,
+        callback_255=None, callback_255_args=None
+    ):
+        """Queue a new shell command to execute.
+
+        The command starts straight away if there is space in the pool.
+
+        See SubProcPool.put_command.
+        """
+        super().put_command(
+            ctx, bad_hosts=bad_hosts,
+            callback=callback, callback_args=callback_args,
+            callback_255=callback_255, callback_255_args=callback_255_args
+        )
+        if self.queuings:
+            self._run_queued()
+
+    def process(self):
+        """Call the callbacks of exited commands and submit more."""
+        while self.exited:
+            self._item_exit(*self.exited.popleft())
+        super().process()
+
+    def _run_queued(self) -> None:
+        """Start commands on the event loop, if there is space in the pool."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # not called from the event loop
+            super()._run_queued()
+            return
+        stopping = self._is_stopping()
+        while (
+            len(self.runnings) + len(self.tasks) < self.size
+            and (item := self.queuings.start_next()) is not None
+        ):
+            ctx = item[0]
+            if stopping and ctx.cmd_key == self.JOBS_SUBMIT:
+                self.queuings.done(ctx)
+                ctx.err = self.ERR_WORKFLOW_STOPPING
+                ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
+                self._run_command_exit(ctx)
+                continue
+            task = asyncio.ensure_future(self._run_command_async(item))
+            self.tasks[task] = (item, None)
+            task.add_done_callback(self._on_task_done)
+
+    async def _run_command_async(self, item: list) -> None:
+        """Run a command, then queue it for its callback."""
+        try:
+            await self._run_command_proc(item)
+        finally:
+            self.queuings.done(item[0])
+
+    async def _run_command_proc(self, item: list) -> None:
+        """Run the command of a queue item and record its output."""
+        ctx = item[0]
+        cmd = [ctx.cmd] if isinstance(ctx.cmd, str) else list(ctx.cmd)
+        if ctx.cmd_kwargs.get('shell'):
+            # (as for Popen(shell=True))
+            cmd = ['/bin/sh', '-c', *cmd]
+        try:
+            stdin_file = self._get_stdin_file(ctx)
+            proc = await asyncio.create_subprocess_exec(  # nosec
+                *cmd,
+                stdin=stdin_file, stdout=PIPE, stderr=PIPE,
+                # Execute command as a process group leader,
+                # so we can use "os.killpg" to kill the whole group.
+                preexec_fn=os.setpgrp,
+                env=ctx.cmd_kwargs.get('env'),
+            )
+        except OSError as exc:
+            if exc.filename is None:
+                exc.filename = ctx.cmd[0]
+            LOG.exception(exc)
+            ctx.ret_code = 1
+            ctx.err = str(exc)
+            self._exit_async(item)
+            return
+        LOG.debug(ctx.cmd)
+        self.tasks[asyncio.current_task()] = (  # type: ignore[index]
+            item, proc
+        )
+        ctx.timeout = time() + self.proc_pool_timeout
+
+        # Read STDOUT/STDERR as they are written, until the command exits.
+        outputs = asyncio.ensure_future(asyncio.gather(
+            self._read_pipe(proc.stdout),
+            self._read_pipe(proc.stderr),
+            proc.wait(),
+        ))
+        err_xtra = ''
+        try:
+            out, err, ctx.ret_code = await asyncio.wait_for(
+                asyncio.shield(outputs), self.proc_pool_timeout
+            )
+        except asyncio.TimeoutError:
+            # Command timed out, kill it
+            if _killpg(proc, SIGKILL):
+                err_xtra = f"\nkilled on timeout ({self.proc_pool_timeout})"
+            out, err, ctx.ret_code = await outputs
+        if out:
+            ctx.out = (ctx.out or '') + out
+        if err + err_xtra:
+            ctx.err = (ctx.err or '') + err + err_xtra
+        self._exit_async(item)
+
+    def _exit_async(self, item: list) -> None:
+        """Queue an exited command for its callback.
+
+        (Unless the pool was terminated while it was running, in which case
+        its callback has already been called, see "terminate").
+        """
+        if asyncio.current_task() in self.tasks:
+            self.exited.append(item)
+
+    @staticmethod
+    async def _read_pipe(stream: Optional[asyncio.StreamReader]) -> str:
+        """Read a command STDOUT/STDERR until it is closed."""
+        if stream is None:
+            return ''
+        return (await stream.read()).decode()
+
+    def _on_task_done(self, task: 'asyncio.Task') -> None:
+        """Event loop callback for commands which have exited."""
+        self.tasks.pop(task, None)
+        # make use of the free space in the pool
+        self._run_queued()
+        # the main loop needs to call the callback
+        self.wakeup.set()
+
+    def terminate(self):
+        """Drain queue, and kill and process remaining child processes.
+
+        Commands running on the event loop are killed and their callbacks
+        called here, as for SubProcPool (without waiting for the event loop
+        to reap them).
+        """
+        for item, proc in self.tasks.values():
+            ctx = item[0]
+            if proc:
+                _killpg(proc, SIGKILL)
+                ctx.ret_code = -SIGKILL
+            else:
+                # not started yet
+                ctx.err = self.ERR_WORKFLOW_STOPPING
+                ctx.ret_code = self.RET_CODE_WORKFLOW_STOPPING
+            self.queuings.done(ctx)
+            self.exited.append(item)
+        # (the tasks are left to finish, but no longer report their exit)
+        self.tasks.clear()
+        # (calls the callbacks of the "exited" commands)
+        super().terminate()
@@ -59,6 +59,7 @@ from cylc.flow import (
 )
 from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.cycling.loader import get_point
+from cylc.flow.deadlines import Deadlines
 from cylc.flow.exceptions import (
     NoHostsError,
     PlatformLookupError,
@@ -123,6 +124,7 @@ from cylc.flow.task_state import (
     TASK_STATUS_WAITING,
     TASK_STATUSES_ACTIVE,
 )
+from cylc.flow.wakeup import WakeUp
 from cylc.flow.wallclock import (
     get_current_time_string,
     get_seconds_as_interval_string as intvl_as_str,
@@ -141,6 +143,7 @@ if TYPE_CHECKING:
     from cylc.flow.data_store_mgr import DataStoreMgr
     from cylc.flow.id import Tokens
     from cylc.flow.scheduler import Scheduler
+    from cylc.flow.ssh_pool import SSHConnectionPool
     from cylc.flow.taskdef import TaskDef
     from cylc.flow.workflow_db_mgr import WorkflowDatabaseManager
     from cylc.flow.xtrigger_mgr import XtriggerManager
@@ -512,9 +515,10 @@ class TaskEventsManager():
     def __init__(
         self, workflow, proc_pool, workflow_db_mgr, broadcast_mgr,
         xtrigger_mgr, data_store_mgr, timestamp, bad_hosts,
-        reset_inactivity_timer_func
+        reset_inactivity_timer_func, wakeup=None, ssh_pool=None
     ):
         self.workflow = workflow
+        self.wakeup: WakeUp = wakeup or WakeUp(enabled=False)
         self.proc_pool = proc_pool
         self.workflow_db_mgr: WorkflowDatabaseManager = workflow_db_mgr
         self.broadcast_mgr: BroadcastMgr = broadcast_mgr
@@ -525,10 +529,13 @@ class TaskEventsManager():
         # NOTE: do not mutate directly
         # use the {add,remove,unset_waiting}_event_timers methods
         self._event_timers: Dict[EventKey, Any] = {}
+        # The event timers by the time they next need processing.
+        self._event_timer_deadlines: Deadlines[EventKey] = Deadlines()
         # NOTE: flag for DB use
         self.event_timers_updated = True
         self.timestamp = timestamp
         self.bad_hosts = bad_hosts
+        self.ssh_pool: Optional['SSHConnectionPool'] = ssh_pool
 
     @staticmethod
     def check_poll_time(itask, now=None):
@@ -604,8 +611,10 @@ class TaskEventsManager():
         """
         ctx_groups: dict = {}
         now = time()
-        for id_key, timer in self._event_timers.copy().items():
+        for id_key in self._event_timer_deadlines.pop_due(now):
+            timer = self._event_timers[id_key]
             if timer.is_waiting:
+                # (will be due again when unset_waiting_event_timer is called)
                 continue
             # Set timer if timeout is None.
             if not timer.is_timeout_set():
@@ -634,7 +643,10 @@ class TaskEventsManager():
                 if msg:
                     LOG.debug("%s %s", id_key.tokens.relative_id, msg)
             # Ready to run?
-            if not timer.is_delay_done() or (
+            if not timer.is_delay_done():
+                self._event_timer_deadlines.push(id_key, timer.timeout)
+                continue
+            if (
                 # Avoid flooding user's mail box with mail notification.
                 # Group together as many notifications as possible within a
                 # given interval.
@@ -643,6 +655,7 @@ class TaskEventsManager():
                 self.next_mail_time is not None and
                 self.next_mail_time > now
             ):
+                self._event_timer_deadlines.push(id_key, self.next_mail_time)
                 continue
 
             timer.set_waiting()
@@ -676,6 +689,8 @@ class TaskEventsManager():
             elif isinstance(ctx, TaskJobLogsRetrieveContext):
                 self._process_job_logs_retrieval(schd, ctx, id_keys)
 
+        self.wakeup.set_deadline(self._event_timer_deadlines.next_deadline())
+
     def process_message(
         self,
         itask: 'TaskProxy',
@@ -1225,6 +1240,10 @@ class TaskEventsManager():
 
         # construct the retrieval command
         ssh_str = str(platform["ssh command"])
+        if self.ssh_pool is not None:
+            ssh_opts = self.ssh_pool.get_ssh_opts(platform, host)
+            if ssh_opts:
+                ssh_str += f' {shlex.join(ssh_opts)}'
         rsync_str = str(platform["retrieve job logs command"])
         cmd = shlex.split(rsync_str) + ["--rsh=" + ssh_str]
         if LOG.isEnabledFor(DEBUG):
@@ -1270,6 +1289,7 @@ class TaskEventsManager():
             for key in proc_ctx.cmd_kwargs['id_keys']:
                 timer = self._event_timers[key]
                 timer.reset()
+                self._event_timer_deadlines.push(key, 0)
 
     def _job_logs_retrieval_callback(
         self,
@@ -1374,6 +1394,7 @@ class TaskEventsManager():
                 os.getenv("CYLC_WORKFLOW_RUN_DIR")
             )
             itask.state.add_xtrigger(label)
+        self.xtrigger_mgr.update_task(itask)
 
         # add the retry xtrigger to the data store
         sig = self.xtrigger_mgr.get_xtrig_ctx(itask, label).get_signature()
@@ -2055,16 +2076,19 @@ class TaskEventsManager():
     ) -> None:
         """Add a new event timer."""
         self._event_timers[id_key] = event_timer
+        self._event_timer_deadlines.push(id_key, 0)
         self.event_timers_updated = True
 
     def remove_event_timer(self, id_key: EventKey) -> None:
         """Remove an event timer."""
         del self._event_timers[id_key]
+        self._event_timer_deadlines.remove(id_key)
         self.event_timers_updated = True
 
     def unset_waiting_event_timer(self, id_key: EventKey) -> None:
         """Invoke unset_waiting on an event timer."""
         self._event_timers[id_key].unset_waiting()
+        self._event_timer_deadlines.push(id_key, 0)
         self.event_timers_updated = True
 
     def reset_bad_hosts(self):
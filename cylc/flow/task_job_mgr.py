@@ -25,6 +25,7 @@ This module provides logic to:
 * Prepare jobs poll/kill, and manage the callbacks.
 """
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import suppress
 import json
 from logging import (
@@ -51,6 +52,7 @@ from typing import (
 )
 
 from cylc.flow import LOG
+from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.cfgspec.globalcfg import SYSPATH
 from cylc.flow.exceptions import (
     NoHostsError,
@@ -132,10 +134,27 @@ from cylc.flow.wallclock import (
 
 if TYPE_CHECKING:
     from cylc.flow.data_store_mgr import DataStoreMgr
+    from cylc.flow.ssh_pool import SSHConnectionPool
     from cylc.flow.task_proxy import TaskProxy
     from cylc.flow.workflow_db_mgr import WorkflowDatabaseManager
 
 
+class PendingJobCmd:
+    """A job poll or kill command waiting for more jobs to act on.
+
+    See TaskJobManager.flush_job_cmds.
+    """
+
+    def __init__(self, deadline: float, callback, callback_255):
+        self.deadline = deadline  # when to run the command
+        self.callback = callback
+        self.callback_255 = callback_255
+        # The tasks to act on and their submit numbers (i.e. jobs), by id.
+        self.itasks: Dict[int, Tuple['TaskProxy', int]] = {}
+        # Number of requests merged into this command.
+        self.n_requests = 0
+
+
 class TaskJobManager:
     """Manage task job submit, poll and kill.
 
@@ -151,6 +170,8 @@ class TaskJobManager:
     JOBS_KILL = 'jobs-kill'
     JOBS_POLL = 'jobs-poll'
     JOBS_SUBMIT = SubProcPool.JOBS_SUBMIT
+    # Job commands which are merged within the coalescing window.
+    COALESCED_JOB_CMDS = {JOBS_KILL, JOBS_POLL}
     POLL_FAIL = 'poll failed'
     REMOTE_SELECT_MSG = 'waiting for remote host selection'
     REMOTE_INIT_MSG = 'remote host initialising'
@@ -172,6 +193,7 @@ class TaskJobManager:
         data_store_mgr,
         bad_hosts,
         server,
+        ssh_pool=None,
     ):
         self.workflow: str = workflow
         self.proc_pool = proc_pool
@@ -182,8 +204,24 @@ class TaskJobManager:
         self.job_runner_mgr = self.job_file_writer.job_runner_mgr
         self.bad_hosts: Set[str] = bad_hosts
         self.bad_hosts_to_clear: Set[str] = set()
+        self.ssh_pool: Optional['SSHConnectionPool'] = ssh_pool
+        # Poll and kill commands waiting for the coalescing window to close,
+        # by (command, platform name).
+        self.job_cmd_window: float = glbl_cfg().get(
+            ['scheduler', 'job command coalescing window'])
+        self.pending_job_cmds: Dict[Tuple[str, str], PendingJobCmd] = {}
+        # Threads for writing job files (None: write in the main loop).
+        self.job_file_executor: Optional[ThreadPoolExecutor] = None
+        n_threads = glbl_cfg().get(['scheduler', 'job file writer threads'])
+        if n_threads:
+            self.job_file_executor = ThreadPoolExecutor(
+                n_threads, thread_name_prefix='job-file-writer'
+            )
+        # Job file writes in progress, by task: (submit number, future).
+        self.job_file_writes: 'Dict[TaskProxy, Tuple[int, Future]]' = {}
         self.task_remote_mgr = TaskRemoteMgr(
-            workflow, proc_pool, self.bad_hosts, self.workflow_db_mgr, server
+            workflow, proc_pool, self.bad_hosts, self.workflow_db_mgr, server,
+            ssh_pool=ssh_pool,
         )
 
     def check_task_jobs(self, task_pool):
@@ -193,6 +231,7 @@ class TaskJobManager:
         """
         now = time()
         poll_tasks = set()
+        wakeup = self.task_events_mgr.wakeup
         for itask in task_pool.get_tasks():
             if self.task_events_mgr.check_job_time(itask, now):
                 poll_tasks.add(itask)
@@ -201,6 +240,9 @@ class TaskJobManager:
                         f"[{itask}] poll now, (next in "
                         f"{itask.poll_timer.delay_timeout_as_str()})"
                     )
+            if itask.poll_timer is not None:
+                wakeup.set_deadline(itask.poll_timer.timeout)
+            wakeup.set_deadline(itask.timeout)
         if poll_tasks:
             self.poll_task_jobs(poll_tasks)
 
@@ -220,6 +262,7 @@ class TaskJobManager:
         itask.summary['platforms_used'][itask.submit_num] = ''
         itask.waiting_on_job_prep = False
         itask.local_job_file_path = None  # reset for retry
+        self._discard_job_file_write(itask)
         self._set_retry_timers(itask)
         self._prep_submit_task_job_error(itask, '(killed in job prep)', '')
 
@@ -509,7 +552,7 @@ class TaskJobManager:
 
             if remote_mode:
                 cmd = construct_ssh_cmd(
-                    cmd, platform, host
+                    cmd, platform, host, ssh_pool=self.ssh_pool
                 )
             else:
                 cmd = ['cylc'] + cmd
@@ -927,16 +970,96 @@ class TaskJobManager:
         Group itasks with their platform_name and host.
         Put a job command for each group to the multiprocess pool.
 
+        Poll and kill commands are held for the coalescing window (if set),
+        so that requests for the same platform made within it are merged
+        into one command (see "flush_job_cmds").
+
         """
         if not itasks:
             return
-        # sort itasks into lists based upon where they were run.
-        auth_itasks = {}
+        if self.job_cmd_window and cmd_key in self.COALESCED_JOB_CMDS:
+            self._coalesce_job_cmd(cmd_key, itasks, callback, callback_255)
+        else:
+            self._put_job_cmds(cmd_key, itasks, callback, callback_255)
+
+    def _coalesce_job_cmd(
+        self, cmd_key, itasks, callback, callback_255
+    ) -> None:
+        """Add tasks to the pending job commands for their platforms."""
+        deadline = time() + self.job_cmd_window
+        requested: Set[PendingJobCmd] = set()
         for itask in itasks:
-            auth_itasks.setdefault(itask.platform['name'], []).append(itask)
+            key = (cmd_key, itask.platform['name'])
+            try:
+                pending = self.pending_job_cmds[key]
+            except KeyError:
+                pending = self.pending_job_cmds[key] = PendingJobCmd(
+                    deadline, callback, callback_255
+                )
+                self.task_events_mgr.wakeup.set_deadline(deadline)
+            pending.itasks[id(itask)] = (itask, itask.submit_num)
+            requested.add(pending)
+        for pending in requested:
+            pending.n_requests += 1
+
+    def flush_job_cmds(self, force: bool = False) -> None:
+        """Run pending poll and kill commands whose window has closed.
+
+        Args:
+            force: Run all pending commands now.
+
+        """
+        if not self.pending_job_cmds:
+            return
+        now = time()
+        for (cmd_key, platform_name), pending in list(
+            self.pending_job_cmds.items()
+        ):
+            if not force and pending.deadline > now:
+                # (the wake up deadline is cleared on each wake up)
+                self.task_events_mgr.wakeup.set_deadline(pending.deadline)
+                continue
+            del self.pending_job_cmds[(cmd_key, platform_name)]
+            # Drop tasks whose job has changed in the meantime (e.g. they
+            # were re-triggered), the command was for the previous job.
+            itasks = [
+                itask
+                for itask, submit_num in pending.itasks.values()
+                if itask.submit_num == submit_num
+            ]
+            if cmd_key == self.JOBS_POLL:
+                # (tasks may have been reset to waiting in the meantime)
+                itasks = [
+                    itask for itask in itasks
+                    if itask.state.status != TASK_STATUS_WAITING
+                ]
+            if not itasks:
+                continue
+            LOG.debug(
+                f'{cmd_key} for {platform_name}: {len(itasks)} job(s)'
+                f' from {pending.n_requests} request(s)'
+            )
+            self._put_job_cmds(
+                cmd_key, itasks, pending.callback, pending.callback_255
+            )
+
+    def _put_job_cmds(
+        self, cmd_key, itasks, callback, callback_255
+    ):
+        """Put a job command for each platform to the process pool."""
+        if not itasks:
+            return
+        # sort itasks into lists based upon where they were run (dropping
+        # duplicates, the job acted on is the latest job of each task).
+        auth_itasks: Dict[str, Dict[int, 'TaskProxy']] = {}
+        for itask in itasks:
+            auth_itasks.setdefault(itask.platform['name'], {})[
+                id(itask)
+            ] = itask
 
         # Go through each list of itasks and carry out commands as required.
-        for platform_name, itasks in sorted(auth_itasks.items()):
+        for platform_name, platform_itasks in sorted(auth_itasks.items()):
+            itasks = list(platform_itasks.values())
             try:
                 platform = get_platform(platform_name)
             except NoPlatformsError:
@@ -971,7 +1094,7 @@ class TaskJobManager:
                         platform, bad_hosts=self.bad_hosts
                     )
                     cmd = construct_ssh_cmd(
-                        cmd, platform, host
+                        cmd, platform, host, ssh_pool=self.ssh_pool
                     )
                 except NoHostsError:
                     ctx.err = f'No available hosts for {platform["name"]}'
@@ -1150,6 +1273,14 @@ class TaskJobManager:
         if itask.local_job_file_path:
             return itask
 
+        with suppress(KeyError):
+            submit_num, future = self.job_file_writes[itask]
+            if submit_num == itask.submit_num:
+                # job file write in progress
+                return self._get_job_file_write_result(itask, future)
+            # (left over from an earlier submission)
+            self._discard_job_file_write(itask)
+
         # Handle broadcasts
         rtconfig = self.task_events_mgr.broadcast_mgr.get_updated_rtconfig(
             itask
@@ -1277,6 +1408,20 @@ class TaskJobManager:
                 itask.tdef.name,
                 itask.submit_num,
             )
+            if self.job_file_executor is not None:
+                # write the job file in the background
+                future = self.job_file_executor.submit(
+                    self._write_job_file,
+                    local_job_file_path,
+                    job_conf,
+                    check_syntax,
+                )
+                self.job_file_writes[itask] = (itask.submit_num, future)
+                # wake the main loop to submit the job when the file is ready
+                future.add_done_callback(
+                    lambda _: self.task_events_mgr.wakeup.set()
+                )
+                return None
             self.job_file_writer.write(
                 local_job_file_path,
                 job_conf,
@@ -1291,6 +1436,48 @@ class TaskJobManager:
         itask.local_job_file_path = local_job_file_path
         return itask
 
+    def _write_job_file(
+        self, local_job_file_path: str, job_conf: dict, check_syntax: bool
+    ) -> str:
+        """Write a job file (called in a job file writer thread)."""
+        self.job_file_writer.write(
+            local_job_file_path,
+            job_conf,
+            check_syntax=check_syntax,
+        )
+        return local_job_file_path
+
+    def _get_job_file_write_result(
+        self, itask: 'TaskProxy', future: Future
+    ) -> 'Union[TaskProxy, None, Literal[False]]':
+        """Helper for self._prep_submit_task_job. On job file write.
+
+        Returns as for _prep_submit_task_job.
+        """
+        if not future.done():
+            return None
+        del self.job_file_writes[itask]
+        try:
+            itask.local_job_file_path = future.result()
+        except Exception as exc:
+            itask.waiting_on_job_prep = False
+            self._prep_submit_task_job_error(itask, '(prepare job file)', exc)
+            return False
+        return itask
+
+    def _discard_job_file_write(self, itask: 'TaskProxy') -> None:
+        """Forget any job file write in progress for a task."""
+        with suppress(KeyError):
+            _, future = self.job_file_writes.pop(itask)
+            future.cancel()
+
+    def close(self) -> None:
+        """Wait for job file writes in progress, stop the writer threads."""
+        if self.job_file_executor is not None:
+            self.job_file_executor.shutdown(wait=True, cancel_futures=True)
+            self.job_file_executor = None
+        self.job_file_writes.clear()
+
     def _prep_submit_task_job_platform_error(
         self, itask: 'TaskProxy', rtconfig: dict, exc: Exception | str
     ):
@@ -17,9 +17,11 @@
 """Task output message manager and constants."""
 
 import ast
+from functools import lru_cache
 import re
 from typing import (
     TYPE_CHECKING,
+    Callable,
     Dict,
     Iterable,
     Iterator,
@@ -34,7 +36,7 @@ from cylc.flow.exceptions import InvalidCompletionExpression
 from cylc.flow.util import (
     BOOL_SYMBOLS,
     get_variable_names,
-    restricted_evaluator,
+    restricted_function,
 )
 
 
@@ -73,8 +75,8 @@ TASK_OUTPUTS = (
 # DB output message for forced completion
 FORCED_COMPLETION_MSG = "(manually completed)"
 
-# this evaluates task completion expressions
-CompletionEvaluator = restricted_evaluator(
+# this compiles task completion expressions
+CompletionCompiler = restricted_function(
     # expressions
     ast.Expression,
     # variables
@@ -194,6 +196,49 @@ def get_completion_expression(tdef: 'TaskDef') -> str:
     return ' or '.join(parts)
 
 
+@lru_cache(maxsize=None)
+def compile_completion_expression(
+    expression: str,
+    compvars: Tuple[str, ...],
+) -> Callable[..., bool]:
+    """Return a function which evaluates a completion expression.
+
+    The expression is parsed and validated once, the result is cached.
+
+    Args:
+        expression:
+            The completion expression.
+        compvars:
+            The completion variables, these are the arguments of the
+            returned function (in order). If a variable is listed more than
+            once, the last value provided for it is used.
+
+    Examples:
+        >>> func = compile_completion_expression(
+        ...     'succeeded or (failed and x)',
+        ...     ('succeeded', 'failed', 'x'),
+        ... )
+        >>> func(False, True, False)
+        False
+        >>> func(False, True, True)
+        True
+        >>> func is compile_completion_expression(
+        ...     'succeeded or (failed and x)',
+        ...     ('succeeded', 'failed', 'x'),
+        ... )
+        True
+
+    """
+    return CompletionCompiler(
+        expression,
+        [
+            # (replace earlier duplicates with unused argument names)
+            compvar if compvar not in compvars[ind + 1:] else f'_{ind}'
+            for ind, compvar in enumerate(compvars)
+        ],
+    )
+
+
 def get_optional_outputs(
     expression: str,
     outputs: Iterable[str],
@@ -261,20 +306,23 @@ def get_optional_outputs(
     # Allows exclusion of additional outcomes:
     extra_excludes = {disable: False} if disable else {}
 
+    fixed_values = {
+        # don't consider pre-execution conditions as optional
+        # (pre-conditions are considered separately)
+        'expired': False,
+        'submit_failed': False,
+        **extra_excludes
+    }
+    compvars = tuple(sorted({*all_compvars, *fixed_values}))
+    func = compile_completion_expression(expression, compvars)
+
     return {  # output: is_optional
         # the outputs that are used in the expression
         **{
-            output: CompletionEvaluator(
-                expression,
-                **{
-                    **{out: out != output for out in all_compvars},
-                    # don't consider pre-execution conditions as optional
-                    # (pre-conditions are considered separately)
-                    'expired': False,
-                    'submit_failed': False,
-                    **extra_excludes
-                },
-            )
+            output: func(*(
+                fixed_values.get(compvar, compvar != output)
+                for compvar in compvars
+            ))
             for output in used_compvars
         },
         **dict.fromkeys(all_compvars - used_compvars),
@@ -474,13 +522,9 @@ class TaskOutputs:
         # complete when any final output has been generated.
         # See https://github.com/cylc/cylc-flow/pull/5067
         expr = self._completion_expression or FINAL_OUTPUT_COMPLETION
-        return CompletionEvaluator(
-            expr,
-            **{
-                self._message_to_compvar[message]: completed
-                for message, completed in self._completed.items()
-            },
-        )
+        return compile_completion_expression(
+            expr, tuple(self._message_to_compvar.values())
+        )(*self._completed.values())
 
     def get_incomplete_implied(self, message: str) -> List[str]:
         """Return an ordered list of incomplete implied messages.
@@ -19,9 +19,11 @@
 
 from collections import Counter
 from contextlib import suppress
+from heapq import heappop, heappush
 import json
 import logging
 from textwrap import indent
+from time import time
 from typing import (
     TYPE_CHECKING,
     Dict,
@@ -40,6 +42,7 @@ from cylc.flow.cycling.loader import (
     get_point,
     standardise_point_string,
 )
+from cylc.flow.deadlines import Deadlines
 from cylc.flow.exceptions import (
     PlatformLookupError,
     PointParsingError,
@@ -79,6 +82,7 @@ from cylc.flow.task_outputs import (
 )
 from cylc.flow.task_proxy import TaskProxy
 from cylc.flow.task_queues.independent import IndepQueueManager
+from cylc.flow.task_queues.priority import PriorityQueueManager
 from cylc.flow.task_state import (
     TASK_STATUS_EXPIRED,
     TASK_STATUS_FAILED,
@@ -89,6 +93,7 @@ from cylc.flow.task_state import (
     TASK_STATUS_WAITING,
     TASK_STATUSES_ACTIVE,
     TASK_STATUSES_FINAL,
+    TASK_STATUSES_NEVER_ACTIVE,
     status_geq,
 )
 from cylc.flow.task_trigger import TaskTrigger
@@ -107,8 +112,9 @@ if TYPE_CHECKING:
         FlowMgr,
         FlowNums,
     )
-    from cylc.flow.prerequisite import SatisfiedState
+    from cylc.flow.prerequisite import Prerequisite, SatisfiedState
     from cylc.flow.task_events_mgr import TaskEventsManager
+    from cylc.flow.task_queues import TaskQueueManagerBase
     from cylc.flow.taskdef import TaskDef
     from cylc.flow.workflow_db_mgr import WorkflowDatabaseManager
     from cylc.flow.xtrigger_mgr import XtriggerManager
@@ -193,9 +199,39 @@ class TaskPool:
 
         # Tasks in the active window of the workflow.
         self.active_tasks: Pool = {}
+        # The same tasks indexed by relative ID for quick lookup.
+        self.active_tasks_by_id: Dict[str, TaskProxy] = {}
         self._active_tasks_list: List[TaskProxy] = []
+        # The cycle points of the active tasks as a min-heap (points removed
+        # from the pool are only dropped from the heap when they reach the
+        # top, see get_min_point).
+        self._active_points_heap: List['PointBase'] = []
+        self._active_points_in_heap: Set['PointBase'] = set()
         self.active_tasks_changed = False
         self.tasks_removed = False
+        # Waiting tasks which are neither queued nor runahead limited, i.e.
+        # those which may be waiting on xtriggers, ext-triggers or
+        # prerequisites (used as an ordered set).
+        self.waiting_unqueued_tasks: Dict[TaskProxy, None] = {}
+        # Tasks whose state has changed since the scheduler last checked
+        # (used as an ordered set).
+        self.updated_tasks: Dict[TaskProxy, None] = {}
+        # Active tasks (preparing, submitted, running or awaiting job prep)
+        # counted by name, for queue limiting.
+        self.active_task_counter: Counter[str] = Counter()
+        self._counted_active_tasks: Set[TaskProxy] = set()
+        # Tasks which have entered the submission pipeline but have not yet
+        # completed job prep (used as an ordered set).
+        self.pre_prep_tasks: Dict[TaskProxy, None] = {}
+        # Prerequisites of pool tasks (including suicide prerequisites)
+        # indexed by the outputs they depend on:
+        # {output: {itask: [prerequisite, ...]}}
+        self.prereqs_by_output: Dict[
+            PrereqTuple, Dict[TaskProxy, List['Prerequisite']]
+        ] = {}
+        # Pool tasks by clock-expire time and late time.
+        self.clock_expire_deadlines: Deadlines[TaskProxy] = Deadlines()
+        self.late_deadlines: Deadlines[TaskProxy] = Deadlines()
 
         self.hold_point: Optional['PointBase'] = None
         self.abs_outputs_done: Set[Tuple[str, str, str]] = set()
@@ -206,16 +242,29 @@ class TaskPool:
         self.expected_failed_tasks = self.config.get_expected_failed_tasks()
 
         self.task_name_list = self.config.get_task_name_list()
-        self.task_queue_mgr = IndepQueueManager(
-            self.config.cfg['scheduling']['queues'],
-            self.task_name_list,
-            self.config.runtime['descendants']
-        )
+        self.task_queue_mgr = self._create_task_queue_mgr()
 
         self.tasks_to_hold: set[tuple[str, 'PointBase']] = set()
         self.tasks_to_trigger_now: set['TaskProxy'] = set()
         self.pre_start_tasks_to_trigger: set[tuple[str, 'PointBase']] = set()
 
+    def _create_task_queue_mgr(self) -> 'TaskQueueManagerBase':
+        """Return the task queue manager selected in the workflow config."""
+        qconfig = self.config.cfg['scheduling']['queues']
+        mgr_config = self.config.cfg['scheduling']['queue manager']
+        if mgr_config['type'] == 'priority':
+            return PriorityQueueManager(
+                qconfig,
+                self.task_name_list,
+                self.config.runtime['descendants'],
+                mgr_config['total limit'],
+            )
+        return IndepQueueManager(
+            qconfig,
+            self.task_name_list,
+            self.config.runtime['descendants']
+        )
+
     def set_stop_task(self, task_id):
         """Set stop after a task."""
         tokens = Tokens(task_id, relative=True)
@@ -242,8 +291,121 @@ class TaskPool:
     def _swap_out(self, itask):
         """Swap old task for new, during reload."""
         if itask.identity in self.active_tasks.get(itask.point, set()):
+            old_itask = self.active_tasks[itask.point][itask.identity]
+            self._unindex_task(old_itask)
             self.active_tasks[itask.point][itask.identity] = itask
+            self.active_tasks_by_id[itask.identity] = itask
             self.active_tasks_changed = True
+            itask.on_state_change = self._index_task_state
+            self._index_task_state(itask)
+            self._index_task_prereqs(itask)
+            self.xtrigger_mgr.update_task(itask)
+
+    def _index_task_state(self, itask: TaskProxy) -> None:
+        """Update the state indexes for a pool task.
+
+        Called whenever the state of a pool task changes.
+        """
+        if itask.state.is_updated:
+            self.updated_tasks[itask] = None
+        if (
+            itask.state.status == TASK_STATUS_WAITING
+            and not itask.state.is_queued
+            and not itask.state.is_runahead
+        ):
+            self.waiting_unqueued_tasks[itask] = None
+        else:
+            self.waiting_unqueued_tasks.pop(itask, None)
+        if itask.waiting_on_job_prep:
+            self.pre_prep_tasks[itask] = None
+        else:
+            self.pre_prep_tasks.pop(itask, None)
+        if (
+            itask.expire_time is not None
+            and itask.state.status == TASK_STATUS_WAITING
+        ):
+            self.clock_expire_deadlines.push(itask, itask.expire_time)
+        if (
+            not itask.is_late
+            and itask.state.status in TASK_STATUSES_NEVER_ACTIVE
+            and itask.get_late_time()
+        ):
+            self.late_deadlines.push(itask, itask.get_late_time())
+        if itask.waiting_on_job_prep or itask.state(
+            TASK_STATUS_PREPARING,
+            TASK_STATUS_SUBMITTED,
+            TASK_STATUS_RUNNING,
+        ):
+            if itask not in self._counted_active_tasks:
+                self._counted_active_tasks.add(itask)
+                self._update_active_count(itask.tdef.name, 1)
+        elif itask in self._counted_active_tasks:
+            self._counted_active_tasks.remove(itask)
+            self._update_active_count(itask.tdef.name, -1)
+
+    def _unindex_task(self, itask: TaskProxy) -> None:
+        """Remove a task from the state indexes.
+
+        Called when a task leaves the pool.
+        """
+        itask.on_state_change = None
+        self.waiting_unqueued_tasks.pop(itask, None)
+        self.updated_tasks.pop(itask, None)
+        self.pre_prep_tasks.pop(itask, None)
+        self.clock_expire_deadlines.remove(itask)
+        self.late_deadlines.remove(itask)
+        if itask in self._counted_active_tasks:
+            self._counted_active_tasks.remove(itask)
+            self._update_active_count(itask.tdef.name, -1)
+        self._unindex_task_prereqs(itask)
+        self.xtrigger_mgr.remove_task(itask)
+
+    def _index_task_prereqs(self, itask: TaskProxy) -> None:
+        """Index the prerequisites of a pool task by output."""
+        for prereq in (
+            *itask.state.prerequisites, *itask.state.suicide_prerequisites
+        ):
+            for output in prereq:
+                self.prereqs_by_output.setdefault(
+                    output, {}
+                ).setdefault(itask, []).append(prereq)
+
+    def _unindex_task_prereqs(self, itask: TaskProxy) -> None:
+        """Remove the prerequisites of a task from the output index."""
+        for prereq in (
+            *itask.state.prerequisites, *itask.state.suicide_prerequisites
+        ):
+            for output in prereq:
+                dependants = self.prereqs_by_output.get(output)
+                if dependants is None:
+                    continue
+                dependants.pop(itask, None)
+                if not dependants:
+                    del self.prereqs_by_output[output]
+
+    def _update_active_count(self, name: str, delta: int) -> None:
+        """Update the active task counters for a task name."""
+        self.active_task_counter[name] += delta
+        if not self.active_task_counter[name]:
+            del self.active_task_counter[name]
+        self.task_queue_mgr.update_active(name, delta)
+
+    def get_waiting_unqueued_tasks(self) -> List[TaskProxy]:
+        """Return waiting tasks which are not queued or runahead limited.
+
+        These are the tasks which may be waiting on xtriggers, ext-triggers
+        or prerequisites.
+        """
+        return list(self.waiting_unqueued_tasks)
+
+    def pop_updated_tasks(self) -> List[TaskProxy]:
+        """Return tasks whose state has changed since the last call.
+
+        Note: it is down to the caller to reset the "is_updated" flag.
+        """
+        updated_tasks = list(self.updated_tasks)
+        self.updated_tasks.clear()
+        return updated_tasks
 
     def spawn_to_runahead_limit(self):
         """Spawn the task pool out to the runahead limit in one go.
@@ -322,13 +484,22 @@ class TaskPool:
     def add_to_pool(self, itask) -> None:
         """Add a task to the pool."""
 
-        self.active_tasks.setdefault(itask.point, {})
-        if itask.identity in self.active_tasks[itask.point]:
+        if itask.point not in self.active_tasks:
+            self.active_tasks[itask.point] = {}
+            if itask.point not in self._active_points_in_heap:
+                self._active_points_in_heap.add(itask.point)
+                heappush(self._active_points_heap, itask.point)
+        elif itask.identity in self.active_tasks[itask.point]:
             # If logged, something has gone wrong.
             LOG.debug(f"{itask.identity} not added to n=0: already exists")
             return None
         self.active_tasks[itask.point][itask.identity] = itask
+        self.active_tasks_by_id[itask.identity] = itask
         self.active_tasks_changed = True
+        itask.on_state_change = self._index_task_state
+        self._index_task_state(itask)
+        self._index_task_prereqs(itask)
+        self.xtrigger_mgr.update_task(itask)
         LOG.debug(f"[{itask}] added to the n=0 window")
 
         self.create_data_store_elements(itask)
@@ -430,17 +601,18 @@ class TaskPool:
                 ),
                 default=None,
             )
+        elif not cylc.flow.flags.cylc7_back_compat:
+            # Find the earliest point with incomplete tasks (all n=0 tasks
+            # are incomplete by definition).
+            base_point = self.get_min_point()
         else:
             # Find the earliest point with incomplete tasks.
             for point, itasks in sorted(self.get_tasks_by_point().items()):
-                # All n=0 tasks are incomplete by definition, but Cylc 7
-                # ignores failed ones (it does not ignore submit-failed!).
-                if (
-                    cylc.flow.flags.cylc7_back_compat and
-                    all(
-                        itask.state(TASK_STATUS_FAILED)
-                        for itask in itasks
-                    )
+                # Cylc 7 ignores failed tasks (it does not ignore
+                # submit-failed!).
+                if all(
+                    itask.state(TASK_STATUS_FAILED)
+                    for itask in itasks
                 ):
                     continue
                 base_point = point
@@ -893,6 +1065,8 @@ class TaskPool:
         except KeyError:
             pass
         else:
+            del self.active_tasks_by_id[itask.identity]
+            self._unindex_task(itask)
             self.tasks_to_trigger_now.discard(itask)
             self.pre_start_tasks_to_trigger.discard(
                 (itask.tdef.name, itask.point)
@@ -945,7 +1119,7 @@ class TaskPool:
 
     def get_task_ids(self) -> Set[str]:
         """Return a list of task IDs in the task pool."""
-        return {itask.identity for itask in self.get_tasks()}
+        return set(self.active_tasks_by_id)
 
     def get_tasks_by_point(self) -> 'Dict[PointBase, List[TaskProxy]]':
         """Return a map of task proxies by cycle point."""
@@ -956,18 +1130,11 @@ class TaskPool:
 
     def get_task(self, point: 'PointBase', name: str) -> Optional[TaskProxy]:
         """Retrieve a task from the pool."""
-        rel_id = f'{point}/{name}'
-        tasks = self.active_tasks.get(point)
-        if tasks:
-            return tasks.get(rel_id)
-        return None
+        return self.active_tasks_by_id.get(f'{point}/{name}')
 
     def _get_task_by_id(self, id_: str) -> Optional[TaskProxy]:
         """Return pool task by ID if it exists, or None."""
-        for itask_ids in self.active_tasks.values():
-            if id_ in itask_ids:
-                return itask_ids[id_]
-        return None
+        return self.active_tasks_by_id.get(id_)
 
     def get_itasks(self, ids: 'Iterable[Tokens]') -> List[TaskProxy]:
         """Return a list of itasks matching the IDs provided.
@@ -979,13 +1146,16 @@ class TaskPool:
             A list of an active tasks matching these IDs.
 
         """
-        ids_ = {id_.relative_id for id_ in ids}
-        return [
-            itask
-            for itasks in self.active_tasks.values()
-            for id_, itask in itasks.items()
-            if id_ in ids_
-        ]
+        itasks: Dict[str, TaskProxy] = {}
+        for id_ in ids:
+            rel_id = id_.relative_id
+            with suppress(KeyError):
+                itasks[rel_id] = self.active_tasks_by_id[rel_id]
+        # (sort for deterministic results, the IDs are often a set)
+        return sorted(
+            itasks.values(),
+            key=lambda itask: (itask.point, itask.tdef.name),
+        )
 
     def queue_task(self, itask: TaskProxy) -> None:
         """Queue a task that is ready to run.
@@ -1005,36 +1175,6 @@ class TaskPool:
             self.data_store_mgr.delta_task_state(itask)
             self.task_queue_mgr.remove_task(itask)
 
-    def count_active_tasks(self):
-        """Count active tasks and identify pre-prep tasks."""
-
-        # count active tasks by name
-        # {task_name: number_of_active_instances, ...}
-        active_task_counter = Counter()
-
-        # tasks which have entered the submission pipeline but have not yet
-        # entered the PREPARING state
-        pre_prep_tasks = []
-
-        for itask in self.get_tasks():
-            # populate active_task_counter and pre_prep_tasks together to
-            # avoid iterating the task pool twice
-            if itask.waiting_on_job_prep:
-                # a task which has entered the submission pipeline
-                # for the purposes of queue limiting this should be treated
-                # the same as an active task
-                active_task_counter.update([itask.tdef.name])
-                pre_prep_tasks.append(itask)
-            elif itask.state(
-                TASK_STATUS_PREPARING,
-                TASK_STATUS_SUBMITTED,
-                TASK_STATUS_RUNNING,
-            ):
-                # an active task
-                active_task_counter.update([itask.tdef.name])
-
-        return active_task_counter, pre_prep_tasks
-
     def release_queued_tasks(self) -> set['TaskProxy']:
         """Return list of queue-released tasks awaiting job prep.
 
@@ -1045,10 +1185,11 @@ class TaskPool:
             they have been previously returned.
 
         """
-        active_task_counter, pre_prep_tasks = self.count_active_tasks()
+        # (copy, this is updated as tasks are released)
+        pre_prep_tasks = list(self.pre_prep_tasks)
 
         # release queued tasks
-        released = self.task_queue_mgr.release_tasks(active_task_counter)
+        released = self.task_queue_mgr.release_tasks()
 
         for itask in released:
             itask.state_reset(is_queued=False)
@@ -1066,13 +1207,15 @@ class TaskPool:
         # Note: released and pre_prep_tasks can overlap
         return set(released + pre_prep_tasks)
 
-    def get_min_point(self):
+    def get_min_point(self) -> Optional['PointBase']:
         """Return the minimum cycle point currently in the pool."""
-        cycles = list(self.active_tasks)
-        minc = None
-        if cycles:
-            minc = min(cycles)
-        return minc
+        heap = self._active_points_heap
+        # Drop points which are no longer in the pool.
+        while heap and heap[0] not in self.active_tasks:
+            self._active_points_in_heap.remove(heappop(heap))
+        if heap:
+            return heap[0]
+        return None
 
     def set_max_future_offset(self):
         """Calculate the latest required future trigger offset."""
@@ -1182,11 +1325,9 @@ class TaskPool:
 
         # Reassign live tasks to the internal queue
         del self.task_queue_mgr
-        self.task_queue_mgr = IndepQueueManager(
-            self.config.cfg['scheduling']['queues'],
-            self.task_name_list,
-            self.config.runtime['descendants']
-        )
+        self.task_queue_mgr = self._create_task_queue_mgr()
+        for name, count in self.active_task_counter.items():
+            self.task_queue_mgr.update_active(name, count)
 
         # Now queue all tasks that are ready to run
         for itask in self.get_tasks():
@@ -1491,6 +1632,7 @@ class TaskPool:
             # task has begun submission -> clear all xtriggers
             self.xtrigger_mgr.force_satisfy_all(itask, log=False)
 
+        output_tuple = PrereqTuple(str(itask.point), itask.tdef.name, output)
         suicide = []
         for c_name, c_point, is_abs in children:
             if is_abs:
@@ -1515,27 +1657,31 @@ class TaskPool:
             tasks: List[TaskProxy]
             if c_task is not None:
                 # Have child task, update its prerequisites.
+                # (pool tasks are looked up by the output they depend on)
+                dependants = self.prereqs_by_output.get(output_tuple, {})
                 if is_abs:
                     # NOTE: Absolute triggers can have an infinite number of
                     # graph children, so only the first match is listed. We
                     # satisfy the prerequisite for all other tasks of the same
                     # name in the pool, future task instances have their
                     # prereqs satisfied from the DB at spawn-time.
-                    matched, _unmatched = self.id_match(
-                        {TaskTokens(cycle='*', task=c_name)},
-                        only_match_pool=True,
-                    )
-                    tasks = self.get_itasks(matched)
+                    tasks = [t for t in dependants if t.tdef.name == c_name]
                     if c_task not in tasks:
                         tasks.append(c_task)
                 else:
                     tasks = [c_task]
 
                 for t in tasks:
-                    t.satisfy_me(
-                        [itask.tokens.duplicate(task_sel=output)],
-                        mode=itask.run_mode
-                    )
+                    if t in dependants:
+                        for prereq in dependants[t]:
+                            prereq.satisfy_output(
+                                output_tuple, mode=itask.run_mode
+                            )
+                    else:
+                        t.satisfy_me(
+                            [itask.tokens.duplicate(task_sel=output)],
+                            mode=itask.run_mode
+                        )
                     self.data_store_mgr.delta_task_prerequisite(t)
                     if not in_pool:
                         self.add_to_pool(t)
@@ -2346,8 +2492,7 @@ class TaskPool:
 
         if not itask.state.is_queued:
             # queue it if limiting
-            active, _ = self.count_active_tasks()
-            if self.task_queue_mgr.push_task_if_limited(itask, active):
+            if self.task_queue_mgr.push_task_if_limited(itask):
                 itask.state_reset(is_queued=True)
                 self.data_store_mgr.delta_task_state(itask)
 
@@ -2362,8 +2507,13 @@ class TaskPool:
             self.tasks_to_trigger_now.add(itask)
 
     def clock_expire_tasks(self):
-        """Expire any tasks past their clock-expiry time."""
-        for itask in self.get_tasks():
+        """Expire any tasks past their clock-expiry time.
+
+        Only tasks whose clock-expiry time has come up are checked. Tasks which
+        can not expire now are checked again if they return to the waiting
+        state.
+        """
+        for itask in self.clock_expire_deadlines.pop_due(time()):
             if (
                 # force triggered tasks can not clock-expire
                 # see proposal point 10:
@@ -27,9 +27,11 @@ from typing import (
     Counter as TypingCounter,
     Dict,
     Iterable,
+    Generic,
     List,
     Optional,
     Set,
+    TypeVar,
 )
 
 from metomi.isodatetime.timezone import get_local_time_zone
@@ -65,6 +67,42 @@ if TYPE_CHECKING:
     from cylc.flow.taskdef import TaskDef
 
 
+T = TypeVar('T')
+
+
+class _LazyAttribute(Generic[T]):
+    """A task proxy attribute which is only allocated on first access.
+
+    Many task proxies (e.g. tasks waiting in the runahead pool) never use
+    these attributes, so there is no need to allocate them up front.
+
+    The value is held in the slot of the same name prefixed with an
+    underscore, see TaskProxy.is_allocated.
+    """
+
+    __slots__ = ('factory', 'slot')
+
+    def __init__(self, factory: Callable[['TaskProxy'], T]) -> None:
+        self.factory = factory
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        # the slot descriptor
+        self.slot = owner.__dict__[f'_{name}']
+
+    def __get__(self, itask: 'TaskProxy', owner: type) -> T:
+        if itask is None:
+            return self  # type: ignore[return-value]
+        try:
+            return self.slot.__get__(itask, owner)
+        except AttributeError:
+            value = self.factory(itask)
+            self.slot.__set__(itask, value)
+            return value
+
+    def __set__(self, itask: 'TaskProxy', value: T) -> None:
+        self.slot.__set__(itask, value)
+
+
 class TaskProxy:
     """Represent an instance of a cycling task in a running workflow.
 
@@ -167,6 +205,10 @@ class TaskProxy:
         .removed:
             A flag to indicate this task has been removed by command (used
             e.g. to disable failed/submit-failed event handlers).
+        .on_state_change:
+            Function to call with this task proxy whenever its state is
+            changed by "state_reset", or "waiting_on_job_prep" is changed
+            (used by the task pool to index tasks by state).
 
     Args:
         tdef: The definition object of this task.
@@ -182,16 +224,17 @@ class TaskProxy:
 
     # Memory optimization - constrain possible attributes to this list.
     __slots__ = (
-        'clock_trigger_times',
+        '_clock_trigger_times',
         'expire_time',
         'identity',
         'is_late',
         'is_manual_submit',
         'job_vacated',
-        'jobs',
+        '_jobs',
         'late_time',
         'local_job_file_path',
-        'non_unique_events',
+        '_non_unique_events',
+        'on_state_change',
         'point',
         'point_as_seconds',
         'poll_timer',
@@ -200,19 +243,19 @@ class TaskProxy:
         'submit_num',
         'tdef',
         'state',
-        'summary',
+        '_summary',
         'flow_nums',
         'flow_wait',
         'graph_children',
         'platform',
         'timeout',
         'tokens',
-        'try_timers',
-        'waiting_on_job_prep',
+        '_try_timers',
         'mode_settings',
         'transient',
         'is_xtrigger_sequential',
         'removed',
+        '_waiting_on_job_prep',
     )
 
     def __init__(
@@ -236,7 +279,6 @@ class TaskProxy:
         if submit_num is None:
             submit_num = 0
         self.submit_num = submit_num
-        self.jobs: List[dict] = []
         if flow_nums is None:
             self.flow_nums = set()
         else:
@@ -253,20 +295,6 @@ class TaskProxy:
         self.point_as_seconds: Optional[int] = None
 
         self.is_manual_submit = is_manual_submit
-        self.summary: Dict[str, Any] = {
-            'submitted_time': None,
-            'submitted_time_string': None,
-            'started_time': None,
-            'started_time_string': None,
-            'finished_time': None,
-            'finished_time_string': None,
-            'platforms_used': {},
-            'execution_time_limit': None,
-            'job_runner_name': None,
-            'submit_method_id': None,
-            'flow_nums': set(),
-            'flow_wait': self.flow_wait
-        }
 
         self.local_job_file_path: Optional[str] = None
 
@@ -280,15 +308,13 @@ class TaskProxy:
         self.job_vacated = False
         self.poll_timer: Optional['TaskActionTimer'] = None
         self.timeout: Optional[float] = None
-        self.try_timers: Dict[str, 'TaskActionTimer'] = {}
-        self.non_unique_events: TypingCounter[str] = Counter()
 
-        self.clock_trigger_times: Dict[str, int] = {}
         self.expire_time: Optional[float] = None
         self.late_time: Optional[float] = None
         self.is_late = is_late
-        self.waiting_on_job_prep = False
+        self._waiting_on_job_prep = False
         self.removed: bool = False
+        self.on_state_change: Optional[Callable[['TaskProxy'], None]] = None
 
         self.state = TaskState(tdef, self.point, status, is_held)
 
@@ -318,6 +344,53 @@ class TaskProxy:
                 )
             )
 
+    def _new_summary(self) -> Dict[str, Any]:
+        return {
+            'submitted_time': None,
+            'submitted_time_string': None,
+            'started_time': None,
+            'started_time_string': None,
+            'finished_time': None,
+            'finished_time_string': None,
+            'platforms_used': {},
+            'execution_time_limit': None,
+            'job_runner_name': None,
+            'submit_method_id': None,
+            'flow_nums': set(),
+            'flow_wait': self.flow_wait
+        }
+
+    # Attributes allocated on first access.
+    summary: _LazyAttribute[Dict[str, Any]] = _LazyAttribute(_new_summary)
+    jobs: _LazyAttribute[List[dict]] = _LazyAttribute(lambda _: [])
+    try_timers: _LazyAttribute[
+        Dict[str, 'TaskActionTimer']
+    ] = _LazyAttribute(lambda _: {})
+    non_unique_events: _LazyAttribute[
+        TypingCounter[str]
+    ] = _LazyAttribute(lambda _: Counter())
+    clock_trigger_times: _LazyAttribute[
+        Dict[str, int]
+    ] = _LazyAttribute(lambda _: {})
+
+    def is_allocated(self, attr: str) -> bool:
+        """Return True if a lazily allocated attribute has been accessed.
+
+        Use this to avoid allocating attributes just to find they are empty.
+        """
+        return hasattr(self, f'_{attr}')
+
+    @property
+    def waiting_on_job_prep(self) -> bool:
+        return self._waiting_on_job_prep
+
+    @waiting_on_job_prep.setter
+    def waiting_on_job_prep(self, value: bool) -> None:
+        if value != self._waiting_on_job_prep:
+            self._waiting_on_job_prep = value
+            if self.on_state_change is not None:
+                self.on_state_change(self)
+
     @property
     def job_tokens(self) -> 'Tokens':
         """Return the job tokens for this task proxy."""
@@ -350,9 +423,10 @@ class TaskProxy:
         reload_successor.submit_num = self.submit_num
         reload_successor.flow_wait = self.flow_wait
         reload_successor.is_manual_submit = self.is_manual_submit
-        reload_successor.summary = self.summary
         reload_successor.local_job_file_path = self.local_job_file_path
-        reload_successor.try_timers = self.try_timers
+        for attr in ('summary', 'try_timers', 'jobs'):
+            if self.is_allocated(attr):
+                setattr(reload_successor, attr, getattr(self, attr))
         reload_successor.platform = self.platform
         reload_successor.job_vacated = self.job_vacated
         reload_successor.poll_timer = self.poll_timer
@@ -402,7 +476,6 @@ class TaskProxy:
                 key.startswith('_cylc_wallclock')
             )
         })
-        reload_successor.jobs = self.jobs
 
     @staticmethod
     def get_offset_as_seconds(offset):
@@ -468,7 +541,8 @@ class TaskProxy:
     def get_try_num(self):
         """Return the number of automatic tries (try number)."""
         try:
-            return self.try_timers[TimerFlags.EXECUTION_RETRY].num + 1
+            # (raises AttributeError if try_timers is not allocated)
+            return self._try_timers[TimerFlags.EXECUTION_RETRY].num + 1
         except (AttributeError, KeyError):
             return 0
 
@@ -481,7 +555,10 @@ class TaskProxy:
         if self.state.is_held:
             # A held task is not ready to run.
             return False
-        if self.state.status in self.try_timers:
+        if (
+            self.is_allocated('try_timers')
+            and self.state.status in self.try_timers
+        ):
             # A try timer is still active.
             return self.try_timers[self.state.status].is_delay_done()
         return (
@@ -508,6 +585,8 @@ class TaskProxy:
 
     def reset_try_timers(self):
         # unset any retry delay timers
+        if not self.is_allocated('try_timers'):
+            return
         for timer in self.try_timers.values():
             timer.timeout = None
 
@@ -566,6 +645,8 @@ class TaskProxy:
         ):
             if not silent and not self.transient:
                 LOG.info(f"[{before}] => {self.state}")
+            if self.on_state_change is not None:
+                self.on_state_change(self)
             return True
 
         return False
@@ -17,8 +17,9 @@
 
 """Define the Cylc task queue management API."""
 
-from typing import List, Dict, Counter, Any, TYPE_CHECKING
+from typing import List, Dict, Any, TYPE_CHECKING
 from abc import ABCMeta, abstractmethod
+from contextlib import suppress
 
 if TYPE_CHECKING:
     from cylc.flow.task_proxy import TaskProxy
@@ -27,6 +28,8 @@ if TYPE_CHECKING:
 class TaskQueueManagerBase(metaclass=ABCMeta):
     """Base class for queueing implementations."""
 
+    Q_DEFAULT = "default"
+
     @abstractmethod
     def __init__(self,
                  qconfig: dict,
@@ -49,18 +52,23 @@ class TaskQueueManagerBase(metaclass=ABCMeta):
         raise NotImplementedError
 
     @abstractmethod
-    def push_task_if_limited(
-            self, itask: 'TaskProxy', active: Counter[str]
-    ) -> bool:
+    def update_active(self, name: str, delta: int) -> None:
+        """Update the count of active tasks with the given name.
+
+        Called whenever a task becomes active or inactive.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def push_task_if_limited(self, itask: 'TaskProxy') -> bool:
         """Queue the task only if the queue limit is reached.
 
-        Requires current active task counts.
         Return True if queued, else False.
         """
         raise NotImplementedError
 
     @abstractmethod
-    def release_tasks(self, active: Counter[str]) -> 'List[TaskProxy]':
+    def release_tasks(self) -> 'List[TaskProxy]':
         """Release tasks, given current active task counts."""
         raise NotImplementedError
 
@@ -102,4 +110,35 @@ class TaskQueueManagerBase(metaclass=ABCMeta):
             queues[qname] = {}
             queues[qname]["members"] = qmembers
             queues[qname]["limit"] = queue["limit"]
+            queues[qname]["weight"] = queue.get("weight", 1.0)
+        return queues
+
+    def _make_indep(self, in_queues: dict) -> dict:
+        """Make queues independent: each task can belong to one queue only.
+
+        If a task is assigned to multiple queues the last assignment takes
+        precedence. The "default" queue contains tasks not in another queue.
+
+        """
+        queues: Dict[str, Any] = {}
+        seen: Dict[str, str] = {}
+        for qname, qconfig in in_queues.items():
+            queues[qname] = {}
+            queues[qname]["members"] = qconfig["members"]
+            queues[qname]["limit"] = qconfig["limit"]
+            queues[qname]["weight"] = qconfig["weight"]
+            if qname == self.Q_DEFAULT:
+                continue
+            for qmem in qconfig["members"]:
+                # Remove from default queue
+                with suppress(KeyError):
+                    # may already have been removed
+                    queues[self.Q_DEFAULT]["members"].remove(qmem)
+                if qmem in seen:
+                    # Override previous queue assignment.
+                    oldq = seen[qmem]
+                    queues[oldq]["members"].remove(qmem)
+                else:
+                    queues[qname]["members"].add(qmem)
+                seen[qmem] = qname
         return queues
@@ -34,6 +34,7 @@ class LimitedTaskQueue:
         """Initialize limiter for active tasks."""
         self.limit = limit  # max active tasks
         self.members = members  # member task names
+        self.n_active = 0  # number of active member tasks
         self.deque: deque = deque()
 
     def push_task(self, itask: 'TaskProxy') -> None:
@@ -41,27 +42,22 @@ class LimitedTaskQueue:
         if itask.tdef.name in self.members:
             self.deque.appendleft(itask)
 
-    def push_task_if_limited(
-        self, itask: 'TaskProxy', active: Counter[str]
-    ) -> bool:
+    def push_task_if_limited(self, itask: 'TaskProxy') -> bool:
         """Queue task if in my membership and the queue limit is reached."""
-        n_active = sum(active[mem] for mem in self.members)
         if (
-            self.limit and n_active >= self.limit
+            self.limit and self.n_active >= self.limit
             and itask.tdef.name in self.members
         ):
             self.deque.appendleft(itask)
             return True
         return False
 
-    def release(self, active: Counter[str]) -> List['TaskProxy']:
+    def release(self) -> List['TaskProxy']:
         """Release tasks if below the active limit."""
-        # The "active" argument counts active tasks by name.
         released: List['TaskProxy'] = []
         held: List['TaskProxy'] = []
-        n_active: int = 0
-        for mem in self.members:
-            n_active += active[mem]
+        # (released tasks are counted by the caller once they become active)
+        n_active: int = self.n_active
         while not self.limit or n_active < self.limit:
             try:
                 itask = self.deque.pop()
@@ -73,7 +69,6 @@ class LimitedTaskQueue:
             else:
                 released.append(itask)
                 n_active += 1
-                active.update({itask.tdef.name: 1})
         for itask in held:
             self.deque.appendleft(itask)
         return released
@@ -102,7 +97,6 @@ class IndepQueueManager(TaskQueueManagerBase):
     A limit of zero means unlimited.
 
     """
-    Q_DEFAULT = "default"
 
     def __init__(self,
                  qconfig: dict,
@@ -113,6 +107,12 @@ class IndepQueueManager(TaskQueueManagerBase):
         # Map of queues by name.
         self.queues: Dict[str, LimitedTaskQueue] = {}
 
+        # Map of queues by member task name.
+        self.member_queues: Dict[str, LimitedTaskQueue] = {}
+
+        # Active tasks by name.
+        self.active: Counter[str] = Counter()
+
         # Add all task names to default queue membership list.
         qconfig[self.Q_DEFAULT]['members'] = set(all_task_names)
 
@@ -126,26 +126,35 @@ class IndepQueueManager(TaskQueueManagerBase):
             self.queues[name] = LimitedTaskQueue(
                 config["limit"], config["members"]
             )
+            for member in config["members"]:
+                self.member_queues[member] = self.queues[name]
 
     def push_task(self, itask: 'TaskProxy') -> None:
         """Push a task to the appropriate queue."""
         for queue in self.queues.values():
             queue.push_task(itask)
 
-    def push_task_if_limited(
-        self, itask: 'TaskProxy', active: Counter[str]
-    ) -> bool:
+    def update_active(self, name: str, delta: int) -> None:
+        """Update the count of active tasks with the given name."""
+        self.active[name] += delta
+        if not self.active[name]:
+            del self.active[name]
+        with suppress(KeyError):
+            self.member_queues[name].n_active += delta
+
+    def push_task_if_limited(self, itask: 'TaskProxy') -> bool:
         """Push a task to its queue only if the queue limit is reached."""
-        return any(
-            queue.push_task_if_limited(itask, active)
-            for queue in self.queues.values()
-        )
+        try:
+            queue = self.member_queues[itask.tdef.name]
+        except KeyError:
+            return False
+        return queue.push_task_if_limited(itask)
 
-    def release_tasks(self, active: Counter[str]) -> List['TaskProxy']:
+    def release_tasks(self) -> List['TaskProxy']:
         """Release tasks up to the queue limits."""
         released: List['TaskProxy'] = []
         for queue in self.queues.values():
-            released += queue.release(active)
+            released += queue.release()
         return released
 
     def remove_task(self, itask: 'TaskProxy') -> bool:
@@ -154,33 +163,9 @@ class IndepQueueManager(TaskQueueManagerBase):
 
     def adopt_tasks(self, orphans: List[str]) -> None:
         """Adopt orphaned tasks to the default group."""
-        self.queues[self.Q_DEFAULT].adopt(orphans)
-
-    def _make_indep(self, in_queues: dict) -> dict:
-        """Make queues independent: each task can belong to one queue only.
-
-        If a task is assigned to multiple queues the last assignment takes
-        precedence. The "default" queue contains tasks not in another queue.
-
-        """
-        queues: Dict[str, Any] = {}
-        seen: Dict[str, str] = {}
-        for qname, qconfig in in_queues.items():
-            queues[qname] = {}
-            queues[qname]["members"] = qconfig["members"]
-            queues[qname]["limit"] = qconfig["limit"]
-            if qname == self.Q_DEFAULT:
-                continue
-            for qmem in qconfig["members"]:
-                # Remove from default queue
-                with suppress(KeyError):
-                    # may already have been removed
-                    queues[self.Q_DEFAULT]["members"].remove(qmem)
-                if qmem in seen:
-                    # Override previous queue assignment.
-                    oldq = seen[qmem]
-                    queues[oldq]["members"].remove(qmem)
-                else:
-                    queues[qname]["members"].add(qmem)
-                seen[qmem] = qname
-        return queues
+        queue = self.queues[self.Q_DEFAULT]
+        queue.adopt(orphans)
+        for orphan in orphans:
+            if orphan not in self.member_queues:
+                self.member_queues[orphan] = queue
+                queue.n_active += self.active[orphan]
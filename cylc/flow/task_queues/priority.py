@@ -0,0 +1,251 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Implement priority task queues with weighted fair share."""
+
+from contextlib import suppress
+from heapq import heapify, heappop, heappush
+from itertools import count
+from math import inf
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Counter,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from cylc.flow.task_queues import TaskQueueManagerBase
+
+if TYPE_CHECKING:
+    from cylc.flow.task_proxy import TaskProxy
+
+
+# A queued task: [-priority, sequence number, task (None if removed)]
+QueueEntry = List[Any]
+
+
+class PriorityTaskQueue:
+    """One task queue with group members, active limit and weight.
+
+    Tasks are released highest priority first, then in the order they were
+    queued.
+    """
+
+    def __init__(
+        self, limit: int, members: Set[str], weight: float
+    ) -> None:
+        self.limit = limit  # max active tasks
+        self.members = members  # member task names
+        self.weight = weight  # share of the total limit
+        self.n_active = 0  # number of active member tasks
+        # Queued tasks (removed tasks are left in the heap and skipped).
+        self.heap: List[QueueEntry] = []
+        self.entries: Dict['TaskProxy', QueueEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def push_task(self, itask: 'TaskProxy', seq: int) -> None:
+        """Queue a task (if not already queued)."""
+        if itask in self.entries:
+            return
+        entry = [
+            -(itask.tdef.rtconfig.get('queue priority') or 0),
+            seq,
+            itask,
+        ]
+        self.entries[itask] = entry
+        heappush(self.heap, entry)
+
+    def pop(self) -> Optional[QueueEntry]:
+        """Return and remove the next task to release."""
+        while self.heap:
+            entry = heappop(self.heap)
+            if entry[2] is not None:
+                del self.entries[entry[2]]
+                return entry
+        return None
+
+    def restore(self, entry: QueueEntry) -> None:
+        """Return a popped task to the queue, retaining its position."""
+        self.entries[entry[2]] = entry
+        heappush(self.heap, entry)
+
+    def remove(self, itask: 'TaskProxy') -> bool:
+        """Remove a single task from queue, return True if removed."""
+        try:
+            entry = self.entries.pop(itask)
+        except KeyError:
+            # not queued
+            return False
+        entry[2] = None
+        return True
+
+    def is_limited(self, n_active: int) -> bool:
+        """Return True if the given number of active tasks is at the limit."""
+        return bool(self.limit) and n_active >= self.limit
+
+    def usage(self, n_active: int) -> float:
+        """Return the given number of active tasks relative to my weight."""
+        if self.weight <= 0:
+            return inf
+        return n_active / self.weight
+
+    def adopt(self, orphans: List[str]) -> None:
+        """Add orphan task names to my membership list."""
+        self.members.update(orphans)
+
+
+class PriorityQueueManager(TaskQueueManagerBase):
+    """Implement priority task queues with weighted fair share.
+
+    A task can only belong to one queue. Queues release tasks if the number of
+    active tasks in its membership list is below its limit, highest priority
+    first (then in the order they were queued).
+
+    The total number of active tasks across all queues can also be limited.
+    Release slots under the total limit go to the queue with the fewest active
+    tasks relative to its weight, so busy queues cannot starve others.
+
+    A limit of zero means unlimited.
+
+    """
+
+    def __init__(self,
+                 qconfig: dict,
+                 all_task_names: List[str],
+                 descendants: dict,
+                 total_limit: int = 0
+                 ) -> None:
+
+        # Map of queues by name.
+        self.queues: Dict[str, PriorityTaskQueue] = {}
+
+        # Map of queues by member task name.
+        self.member_queues: Dict[str, PriorityTaskQueue] = {}
+
+        # Active tasks by name.
+        self.active: Counter[str] = Counter()
+
+        # Active limit across all queues.
+        self.total_limit = total_limit
+        self.n_active = 0
+
+        # Queue order of tasks with the same priority.
+        self._seq = count()
+
+        # Add all task names to default queue membership list.
+        qconfig[self.Q_DEFAULT]['members'] = set(all_task_names)
+
+        # Expand family names in membership lists.
+        queues: Dict[str, Any] = self._expand_families(
+            qconfig, all_task_names, descendants)
+
+        # Make the queues independent.
+        queues = self._make_indep(queues)
+        for name, config in queues.items():
+            self.queues[name] = PriorityTaskQueue(
+                config["limit"], config["members"], config["weight"]
+            )
+            for member in config["members"]:
+                self.member_queues[member] = self.queues[name]
+
+    def push_task(self, itask: 'TaskProxy') -> None:
+        """Push a task to the appropriate queue."""
+        with suppress(KeyError):
+            self.member_queues[itask.tdef.name].push_task(
+                itask, next(self._seq)
+            )
+
+    def update_active(self, name: str, delta: int) -> None:
+        """Update the count of active tasks with the given name."""
+        self.active[name] += delta
+        if not self.active[name]:
+            del self.active[name]
+        self.n_active += delta
+        with suppress(KeyError):
+            self.member_queues[name].n_active += delta
+
+    def push_task_if_limited(self, itask: 'TaskProxy') -> bool:
+        """Push a task to its queue only if a queue limit is reached."""
+        try:
+            queue = self.member_queues[itask.tdef.name]
+        except KeyError:
+            return False
+        if (
+            queue.is_limited(queue.n_active)
+            or (self.total_limit and self.n_active >= self.total_limit)
+        ):
+            queue.push_task(itask, next(self._seq))
+            return True
+        return False
+
+    def release_tasks(self) -> List['TaskProxy']:
+        """Release tasks up to the queue limits."""
+        released: List['TaskProxy'] = []
+        held: List[Tuple[PriorityTaskQueue, QueueEntry]] = []
+        # (released tasks are counted by the caller once they become active)
+        n_active = self.n_active
+
+        # Queues which can release tasks, least used (by weight) first.
+        candidates: List[Tuple[float, int, PriorityTaskQueue, int]] = [
+            (queue.usage(queue.n_active), ind, queue, queue.n_active)
+            for ind, queue in enumerate(self.queues.values())
+            if queue and not queue.is_limited(queue.n_active)
+        ]
+        heapify(candidates)
+
+        while candidates and not (
+            self.total_limit and n_active >= self.total_limit
+        ):
+            _, ind, queue, q_active = heappop(candidates)
+            entry = queue.pop()
+            if entry is None:
+                # queue empty
+                continue
+            itask = entry[2]
+            if itask.state.is_held:
+                held.append((queue, entry))
+            else:
+                released.append(itask)
+                n_active += 1
+                q_active += 1
+            if queue and not queue.is_limited(q_active):
+                heappush(
+                    candidates, (queue.usage(q_active), ind, queue, q_active)
+                )
+
+        for queue, entry in held:
+            queue.restore(entry)
+        return released
+
+    def remove_task(self, itask: 'TaskProxy') -> bool:
+        """Try to remove a task from the queues. Return True if done."""
+        return any(queue.remove(itask) for queue in self.queues.values())
+
+    def adopt_tasks(self, orphans: List[str]) -> None:
+        """Adopt orphaned tasks to the default group."""
+        queue = self.queues[self.Q_DEFAULT]
+        queue.adopt(orphans)
+        for orphan in orphans:
+            if orphan not in self.member_queues:
+                self.member_queues[orphan] = queue
+                queue.n_active += self.active[orphan]
@@ -38,6 +38,7 @@ from typing import (
     Dict,
     List,
     NamedTuple,
+    Optional,
     Set,
     TYPE_CHECKING,
     Tuple,
@@ -82,6 +83,7 @@ from cylc.flow.workflow_files import (
 
 if TYPE_CHECKING:
     from cylc.flow.network.server import WorkflowRuntimeServer
+    from cylc.flow.ssh_pool import SSHConnectionPool
 
 # Remote installation literals
 REMOTE_INIT_DONE = 'REMOTE INIT DONE'
@@ -103,7 +105,9 @@ class RemoteTidyQueueTuple(NamedTuple):
 class TaskRemoteMgr:
     """Manage task remote initialisation, tidy, selection."""
 
-    def __init__(self, workflow, proc_pool, bad_hosts, db_mgr, server):
+    def __init__(
+        self, workflow, proc_pool, bad_hosts, db_mgr, server, ssh_pool=None
+    ):
         self.workflow = workflow
         self.proc_pool = proc_pool
         # self.remote_command_map = {command: host|PlatformError|None}
@@ -118,6 +122,7 @@ class TaskRemoteMgr:
         self.is_restart = False
         self.db_mgr = db_mgr
         self.server: WorkflowRuntimeServer = server
+        self.ssh_pool: Optional['SSHConnectionPool'] = ssh_pool
 
     def _subshell_eval(
         self, eval_str: str | None, command_pattern: re.Pattern
@@ -271,7 +276,9 @@ class TaskRemoteMgr:
             self.ready = True
         else:
             log_platform_event('remote init', platform, host)
-            cmd = construct_ssh_cmd(cmd, platform, host)
+            cmd = construct_ssh_cmd(
+                cmd, platform, host, ssh_pool=self.ssh_pool
+            )
             self.proc_pool.put_command(
                 SubProcContext(
                     'remote-init', cmd, stdin_files=[tmphandle], host=host
@@ -298,7 +305,9 @@ class TaskRemoteMgr:
         host = get_host_from_platform(
             platform, bad_hosts=self.bad_hosts
         )
-        cmd = construct_ssh_cmd(cmd, platform, host, timeout='10s')
+        cmd = construct_ssh_cmd(
+            cmd, platform, host, timeout='10s', ssh_pool=self.ssh_pool
+        )
         return cmd, host
 
     @staticmethod
@@ -552,7 +561,8 @@ class TaskRemoteMgr:
                 dst_path,
                 platform,
                 self.rsync_includes,
-                bad_hosts=self.bad_hosts
+                bad_hosts=self.bad_hosts,
+                ssh_pool=self.ssh_pool,
             )
             ctx = SubProcContext(
                 'file-install',
@@ -375,7 +375,7 @@ class TaskState:
         return sorted(
             task_output.get_id()
             for prereq in self.prerequisites
-            for task_output, satisfied in prereq._satisfied.items()
+            for task_output, satisfied in prereq.items()
             if satisfied
         )
 
@@ -517,5 +517,5 @@ class TaskState:
         return any(
             satisfied
             for prereq in self.prerequisites
-            for satisfied in prereq._satisfied.values()
+            for satisfied in prereq.values()
         )
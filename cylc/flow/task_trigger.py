@@ -217,7 +217,7 @@ class Dependency:
 
     """
 
-    __slots__ = ['_exp', 'task_triggers', 'suicide']
+    __slots__ = ['_exp', 'task_triggers', 'suicide', '_template']
 
     def __init__(self, exp, task_triggers, suicide):
         self._exp = exp
@@ -225,6 +225,13 @@ class Dependency:
             TaskTrigger
         ] = tuple(task_triggers)  # More memory efficient.
         self.suicide = suicide
+        # Cycle point independent form of the expression for use in
+        # conditional prerequisites (None if the OR operator is not used).
+        template = ''.join(self._template_list(
+            exp,
+            {trigger: ind for ind, trigger in enumerate(self.task_triggers)},
+        ))
+        self._template: Optional[str] = template if '|' in template else None
 
     def get_prerequisite(
         self, point: 'PointBase', tdef: 'TaskDef'
@@ -237,6 +244,7 @@ class Dependency:
 
         """
         cpre = Prerequisite(point)
+        keys = []
 
         # Loop over TaskTrigger instances.
         for task_trigger in self.task_triggers:
@@ -245,6 +253,7 @@ class Dependency:
                 task_trigger.task_name,
                 task_trigger.output,
             )
+            keys.append(key)
             if task_trigger.cycle_point_offset is not None:
                 # Compute trigger cycle point from offset.
                 if task_trigger.offset_is_from_icp:
@@ -273,7 +282,8 @@ class Dependency:
                 # Trigger is within the same cycle point.
                 # Register task message with Prerequisite object.
                 cpre[key] = False
-        cpre.set_conditional_expr(self.get_expression(point))
+        if self._template:
+            cpre.set_conditional(self._template, keys)
         return cpre
 
     def get_expression(self, point):
@@ -327,3 +337,20 @@ class Dependency:
             else:
                 ret.append(item)
         return ret
+
+    @classmethod
+    def _template_list(cls, nested_expr, slots):
+        """Template a nested list of TaskTrigger objects.
+
+        Each TaskTrigger is replaced with its slot in the template, see
+        cylc.flow.prerequisite.compile_conditional_expr.
+        """
+        ret = []
+        for item in nested_expr:
+            if isinstance(item, TaskTrigger):
+                ret.append('{%d}' % slots[item])
+            elif isinstance(item, list):
+                ret.extend(['('] + cls._template_list(item, slots) + [')'])
+            else:
+                ret.append(str(item))
+        return ret
@@ -0,0 +1,131 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Wake up the scheduler main loop when there is work to do."""
+
+import asyncio
+from contextlib import suppress
+from time import time
+from typing import Optional
+
+
+class WakeUp:
+    """Event which wakes the scheduler main loop.
+
+    Producers of work for the main loop (the task message and command queues,
+    subprocess pool exits, xtrigger callbacks, etc) call ``set`` when they
+    have something for the main loop to act on. Components with time based
+    work call ``set_deadline`` with the time at which they next need
+    attention. Deadlines are hints for the next sleep only, they are
+    cleared each time the main loop wakes up.
+
+    The main loop calls ``wait`` at the end of each iteration, this returns
+    as soon as the event is set, a deadline is reached or the timeout elapses.
+
+    Calling ``set`` is thread safe (e.g. it may be called from the server
+    thread) and cheap if the main loop is not currently asleep.
+
+    Args:
+        enabled:
+            If False, the main loop does not wait on this event, calls to
+            ``set`` and ``set_deadline`` have no effect.
+
+    Examples:
+        >>> wakeup = WakeUp()
+        >>> wakeup.set_deadline(2.)
+        >>> wakeup.set_deadline(1.)
+        >>> wakeup.set_deadline(None)
+        >>> wakeup.deadline
+        1.0
+
+        >>> asyncio.run(wakeup.wait(0))
+        False
+        >>> wakeup.set()
+        >>> asyncio.run(wakeup.wait(10))
+        True
+        >>> wakeup.deadline is None
+        True
+
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.deadline: Optional[float] = None
+        # work is pending (set before any wait so that it is not missed)
+        self._pending = False
+        # the main loop is currently asleep
+        self._waiting = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+
+    def set(self) -> None:  # noqa: A003 (method name not local)
+        """Wake the main loop now (or immediately after it next sleeps)."""
+        if not self.enabled:
+            return
+        # NOTE: the pending flag must be set before the waiting flag is
+        # inspected (and vice versa in "wait") so that a wake up cannot slip
+        # between the two.
+        self._pending = True
+        if self._waiting and self._loop and self._event:
+            with suppress(RuntimeError):
+                # RuntimeError: event loop closed
+                self._loop.call_soon_threadsafe(self._event.set)
+
+    def set_deadline(self, deadline: Optional[float]) -> None:
+        """Wake the main loop at (or shortly after) this unix time.
+
+        Args:
+            deadline:
+                Unix time. Earlier deadlines take precedence. None is
+                ignored for convenience.
+
+        """
+        if deadline is None or not self.enabled:
+            return
+        if self.deadline is None or deadline < self.deadline:
+            self.deadline = deadline
+
+    async def wait(self, timeout: float) -> bool:
+        """Sleep until woken up, the deadline or timeout, whichever is first.
+
+        Args:
+            timeout:
+                The maximum time to sleep for in seconds.
+
+        Returns:
+            True if woken up by "set", else False.
+
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._event is None:
+            self._loop = loop
+            self._event = asyncio.Event()
+        if self.deadline is not None:
+            timeout = min(timeout, self.deadline - time())
+        self._waiting = True
+        try:
+            if self._pending or timeout <= 0:
+                # yield control to other coroutines but don't hang around
+                await asyncio.sleep(0)
+            else:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._event.wait(), timeout)
+        finally:
+            self._waiting = False
+            self._event.clear()
+            woken, self._pending = self._pending, False
+            self.deadline = None
+        return woken
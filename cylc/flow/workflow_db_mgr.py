@@ -550,19 +550,20 @@ class WorkflowDatabaseManager:
                     "delay": itask.poll_timer.delay,
                     "timeout": itask.poll_timer.timeout
                 })
-            for ctx_key_1, timer in itask.try_timers.items():
-                if timer is None:
-                    continue
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps(("try_timers", ctx_key_1)),
-                    "ctx": self._namedtuple2json(timer.ctx),
-                    "delays": json.dumps(timer.delays),
-                    "num": timer.num,
-                    "delay": timer.delay,
-                    "timeout": timer.timeout
-                })
+            if itask.is_allocated('try_timers'):
+                for ctx_key_1, timer in itask.try_timers.items():
+                    if timer is None:
+                        continue
+                    self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
+                        "name": itask.tdef.name,
+                        "cycle": str(itask.point),
+                        "ctx_key": json.dumps(("try_timers", ctx_key_1)),
+                        "ctx": self._namedtuple2json(timer.ctx),
+                        "delays": json.dumps(timer.delays),
+                        "num": timer.num,
+                        "delay": timer.delay,
+                        "timeout": timer.timeout
+                    })
             if itask.state.time_updated:
                 set_args = {
                     "time_updated": itask.state.time_updated,
@@ -15,16 +15,22 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+from collections import Counter, deque
 from contextlib import suppress
 from enum import Enum
-from inspect import signature
+from heapq import heappop, heappush
+from inspect import iscoroutinefunction, signature
 import json
 import re
 from copy import deepcopy
 from time import time
+import traceback
 from typing import (
     Any,
+    Deque,
     Dict,
+    Iterator,
     Optional,
     Set,
     Tuple,
@@ -33,14 +39,18 @@ from typing import (
 )
 
 from cylc.flow import LOG
+from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.exceptions import WorkflowConfigError, XtriggerConfigError
 import cylc.flow.flags
 from cylc.flow.hostuserutil import get_user
-from cylc.flow.subprocctx import add_kwarg_to_sig
+from cylc.flow.id import Tokens
+from cylc.flow.subprocctx import SubFuncContext, add_kwarg_to_sig
 from cylc.flow.subprocpool import get_xtrig_func
+from cylc.flow.wakeup import WakeUp
 from cylc.flow.xtriggers.wall_clock import _wall_clock
 from cylc.flow.xtriggers.workflow_state import (
     workflow_state,
+    workflow_state_batch,
     _workflow_state_backcompat,
     _upgrade_workflow_state_sig,
 )
@@ -48,7 +58,6 @@ from cylc.flow.xtriggers.workflow_state import (
 if TYPE_CHECKING:
     from inspect import BoundArguments, Signature
     from cylc.flow.scheduler import Scheduler
-    from cylc.flow.subprocctx import SubFuncContext
     from cylc.flow.task_proxy import TaskProxy
 
 
@@ -179,12 +188,18 @@ class XtriggerCollator:
         self.sequential_xtriggers_default = False
         # Labels whose xtriggers are sequentially checked.
         self.sequential_xtrigger_labels: Set[str] = set()
+        # Labels whose functions are coroutines (async def).
+        self.coroutine_labels: Set[str] = set()
+        # Labels of workflow_state xtriggers, which are checked in batches.
+        self.workflow_state_labels: Set[str] = set()
 
     def update(self, xtriggers: 'XtriggerCollator'):
         self.functx_map.update(xtriggers.functx_map)
         self.wall_clock_labels.update(xtriggers.wall_clock_labels)
         self.sequential_xtrigger_labels.update(
             xtriggers.sequential_xtrigger_labels)
+        self.coroutine_labels.update(xtriggers.coroutine_labels)
+        self.workflow_state_labels.update(xtriggers.workflow_state_labels)
 
     def purge_user_xtriggers(self):
         """Purge user-defined triggers before a reload.
@@ -208,6 +223,10 @@ class XtriggerCollator:
                 self.wall_clock_labels.remove(label)
             with suppress(KeyError):
                 self.sequential_xtrigger_labels.remove(label)
+            with suppress(KeyError):
+                self.coroutine_labels.remove(label)
+            with suppress(KeyError):
+                self.workflow_state_labels.remove(label)
 
     def add_trig(self, label: str, fctx: 'SubFuncContext', fdir: str) -> None:
         """Add a new xtrigger function.
@@ -224,6 +243,11 @@ class XtriggerCollator:
         ):
             # (the "_wall_clock" function fails "wall_clock" validation)
             self._validate(label, fctx, fdir)
+            func = get_xtrig_func(fctx.mod_name, fctx.func_name, fdir)
+            if iscoroutinefunction(func):
+                self.coroutine_labels.add(label)
+            elif func is workflow_state:
+                self.workflow_state_labels.add(label)
 
         self.functx_map[label] = fctx
 
@@ -460,7 +484,18 @@ class XtriggerManager:
     call will not be made before the previous one has returned.
 
     Xtrigger functions are called asynchronously in the subprocess pool,
-    except for clock triggers, called synchronously because they're quick.
+    except for clock triggers, and coroutine functions ("async def"), which
+    are run on the scheduler's event loop. Coroutines avoid the cost of a
+    subprocess for cheap I/O bound checks, but must not block (they run in the
+    scheduler process).
+
+    Clock triggers are scheduled by trigger time when tasks enter the pool,
+    and satisfied when the time arrives (see check_clock_xtriggers), so tasks
+    waiting on them cost nothing in the meantime.
+
+    Workflow state xtriggers that are due at the same time are batched by
+    target workflow, and each batch is checked in a single subprocess with a
+    single connection to the target workflow DB (see call_xtrigger_batches).
 
     If parentless tasks have xtriggers that are fundamentally sequential in
     nature, spawning them out to the runahead limit can result in unnecessary
@@ -486,16 +521,24 @@ class XtriggerManager:
         schd: Scheduler
         workflow_run_dir: workflow run directory
         workflow_share_dir: workflow share directory
+        wakeup: wakes the main loop when xtriggers are due or have returned
 
     """
 
+    # Max length of the (JSON) arguments of a batch of workflow_state calls.
+    # (They are passed as a single command line argument, which Linux limits
+    # to 128KiB. Larger batches are split.)
+    MAX_BATCH_ARG_LEN = 64 * 1024
+
     def __init__(
         self,
         schd: 'Scheduler',
         workflow_run_dir: Optional[str] = None,
         workflow_share_dir: Optional[str] = None,
+        wakeup: Optional[WakeUp] = None,
     ):
         self.schd = schd
+        self.wakeup = wakeup or WakeUp(enabled=False)
         workflow = schd.workflow
         user = schd.owner
         # When next to call a function, by signature.
@@ -504,6 +547,31 @@ class XtriggerManager:
         self.sat_xtrig: dict = {}
         # Signatures of active functions (waiting on callback).
         self.active: list = []
+        # Number of tasks waiting on each signature.
+        self.sig_refs: Counter[str] = Counter()
+        # Signatures each task is waiting on, by task ID.
+        self.task_sigs: Dict[str, Set[str]] = {}
+        # Succeeded signatures which may no longer be needed.
+        self.housekeep_sigs: Set[str] = set()
+        # Running coroutine xtriggers.
+        self.coroutines: Set[asyncio.Task] = set()
+        # Finished coroutine xtriggers, waiting for their callbacks.
+        self.coroutines_done: Deque[SubFuncContext] = deque()
+        self.coroutine_timeout: float = glbl_cfg().get(
+            ['scheduler', 'process pool timeout']
+        )
+        # Scheduled clock triggers: heap of (trigger time, signature).
+        self.clock_schedule: List[Tuple[float, str]] = []
+        # Trigger times of scheduled (unsatisfied) clock triggers, by sig.
+        self.clock_times: Dict[str, float] = {}
+        # Tasks (and their labels) waiting on each clock trigger, by sig.
+        self.clock_tasks: Dict[str, Dict[str, Tuple['TaskProxy', str]]] = {}
+        # Due workflow_state xtriggers and their keyword arguments, by target
+        # (workflow ID, alternate run dir).
+        self.workflow_state_batches: Dict[
+            Tuple[str, Optional[str]],
+            List[Tuple['SubFuncContext', Dict[str, Any]]]
+        ] = {}
 
         self.workflow_run_dir = workflow_run_dir
 
@@ -534,6 +602,8 @@ class XtriggerManager:
         """Add validated xtriggers, parsed from the workflow config."""
         if reload:
             self.xtriggers.purge_user_xtriggers()
+            # pick up any changes to xtrigger modules
+            self.proc_pool.recycle_xtrigger_workers()
         self.xtriggers.update(xtriggers)
         self.xtriggers.sequential_xtriggers_default = (
             xtriggers.sequential_xtriggers_default
@@ -558,12 +628,13 @@ class XtriggerManager:
             LOG.info("LOADING succeeded xtriggers")
         sig, results = row
         self.sat_xtrig[sig] = json.loads(results)
+        self.housekeep_sigs.add(sig)
         # Tell the datastore this xtrigger succeeded.
         self.data_store_mgr.delta_xtrigger(sig, True)
 
     def _get_xtrigs(
         self, itask: 'TaskProxy', unsat_only: bool = False,
-        sigs_only: bool = False
+        sigs_only: bool = False, known_only: bool = False
     ) -> 'List[Any]':
         """(Internal helper method.)
 
@@ -571,6 +642,8 @@ class XtriggerManager:
             itask: the task instance
             unsat_only: retrieve only unsatisfied xtrigger prerequisites
             sigs_only: append only the xtrigger function signature
+            known_only: skip xtriggers which are no longer defined
+                (e.g. removed by reload)
 
         Returns:
             List[Union[str, Tuple[str, str, SubFuncContext, bool]]]: a list
@@ -581,6 +654,8 @@ class XtriggerManager:
         for label, satisfied in itask.state.xtriggers.items():
             if unsat_only and satisfied:
                 continue
+            if known_only and label not in self.xtriggers.functx_map:
+                continue
             ctx = self.get_xtrig_ctx(itask, label)
             sig = ctx.get_signature()
             if sigs_only:
@@ -650,20 +725,29 @@ class XtriggerManager:
         Args:
             itask: task proxy to check.
         """
-        for label, sig, ctx, _ in self._get_xtrigs(itask, unsat_only=True):
+        sigs = self.task_sigs.get(itask.identity)
+        if sigs and all(sig in self.clock_times for sig in sigs):
+            # Only waiting on scheduled clock triggers: satisfy any which
+            # are already due (check_clock_xtriggers may not have run since
+            # they were scheduled), the rest are left to
+            # check_clock_xtriggers.
+            for sig in list(sigs):
+                trigger_time = self.clock_times.get(sig)
+                if trigger_time is not None and _wall_clock(trigger_time):
+                    self._clock_succeeded(sig)
+            return
+
+        xtrigs = self._get_xtrigs(itask, unsat_only=True)
+        for label, sig, ctx, _ in xtrigs:
             if label in self.xtriggers.wall_clock_labels:
-                # Special case: quick synchronous clock check.
-                if sig in self.sat_xtrig:
-                    # Already satisfied, just update the task
-                    itask.state.xtriggers[label] = True
-                elif _wall_clock(*ctx.func_args, **ctx.func_kwargs):
+                # Special case: clock triggers are scheduled.
+                if sig not in self.sat_xtrig:
+                    self._schedule_clock(itask, label, sig, ctx)
+                    if not _wall_clock(*ctx.func_args, **ctx.func_kwargs):
+                        continue
                     # Newly satisfied
-                    itask.state.xtriggers[label] = True
-                    self.sat_xtrig[sig] = {}
-                    self.data_store_mgr.delta_xtrigger(sig, True)
-                    self.workflow_db_mgr.put_xtriggers({sig: {}})
-                    LOG.info('xtrigger succeeded: %s = %s', label, sig)
-                    self.do_housekeeping = True
+                    self._clock_succeeded(sig)
+                itask.state.xtriggers[label] = True
                 continue
             # General case: potentially slow asynchronous function call.
             if sig in self.sat_xtrig:
@@ -696,30 +780,283 @@ class XtriggerManager:
             now = time()
             if sig in self.t_next_call and now < self.t_next_call[sig]:
                 # Too soon to call this one again.
+                self.wakeup.set_deadline(self.t_next_call[sig])
                 continue
             self.t_next_call[sig] = now + ctx.intvl
-            # Queue to the process pool, and record as active.
+            # Queue to the process pool (or run on the event loop), and record
+            # as active.
             self.active.append(sig)
+            if label in self.xtriggers.coroutine_labels:
+                task = asyncio.ensure_future(self._run_coroutine(ctx))
+                self.coroutines.add(task)
+                task.add_done_callback(self.coroutines.discard)
+            elif label in self.xtriggers.workflow_state_labels:
+                self._add_to_batch(ctx)
+            else:
+                self.proc_pool.put_command(ctx, callback=self.callback)
+
+        # Record the xtriggers the task is still waiting on.
+        self._update_task_sigs(
+            itask,
+            {
+                sig
+                for label, sig, *_ in xtrigs
+                if not itask.state.xtriggers[label]
+            }
+        )
+
+    async def _run_coroutine(self, ctx: 'SubFuncContext') -> None:
+        """Run a coroutine xtrigger function, then queue it for its callback.
+
+        Results and errors are recorded in the function context the same way
+        as for functions run in the process pool, so any exception or timeout
+        is handled by the callback, like any other xtrigger failure.
+
+        The callback is called by the main loop (see "process_coroutines"),
+        not here, as it changes scheduler state.
+        """
+        LOG.debug(ctx.cmd)
+        try:
+            func = get_xtrig_func(
+                ctx.mod_name, ctx.func_name, self.workflow_run_dir
+            )
+            res = await asyncio.wait_for(
+                func(*ctx.func_args, **ctx.func_kwargs),
+                self.coroutine_timeout,
+            )
+            ctx.out = json.dumps(res)
+        except asyncio.TimeoutError:
+            ctx.ret_code = 1
+            ctx.err = f"cancelled on timeout ({self.coroutine_timeout})"
+        except Exception:
+            ctx.ret_code = 1
+            ctx.err = traceback.format_exc()
+        else:
+            ctx.ret_code = 0
+        LOG.debug(ctx.dump())
+        self.coroutines_done.append(ctx)
+        self.wakeup.set()
+
+    def process_coroutines(self) -> None:
+        """Call the callbacks of finished coroutine xtriggers.
+
+        Call once per main loop iteration, as for the process pool.
+        """
+        while self.coroutines_done:
+            self.callback(self.coroutines_done.popleft())
+
+    def cancel_coroutines(self) -> None:
+        """Cancel any running coroutine xtriggers (on shutdown)."""
+        for task in self.coroutines:
+            task.cancel()
+
+    def _add_to_batch(self, ctx: 'SubFuncContext') -> None:
+        """Batch a workflow_state xtrigger call by target workflow."""
+        try:
+            kwargs = signature(workflow_state).bind(
+                *ctx.func_args, **ctx.func_kwargs
+            ).arguments
+            workflow_id = Tokens(kwargs['workflow_task_id']).workflow_id
+        except (TypeError, ValueError):
+            # Bad args (after templating), let the function report the error.
             self.proc_pool.put_command(ctx, callback=self.callback)
+            return
+        self.workflow_state_batches.setdefault(
+            (workflow_id, kwargs.get('alt_cylc_run_dir')), []
+        ).append((ctx, dict(kwargs)))
+
+    def call_xtrigger_batches(self) -> None:
+        """Call batched xtriggers via the process pool.
+
+        Call after checking all waiting tasks, so each batch includes all of
+        the workflow_state xtriggers due against the same target workflow.
+        """
+        for (workflow_id, _), calls in self.workflow_state_batches.items():
+            for batch in self._split_batch(calls):
+                ctxs = [ctx for ctx, _ in batch]
+                batch_ctx = SubFuncContext(
+                    f'workflow_state batch ({workflow_id})',
+                    workflow_state_batch.__name__,
+                    [[kwargs for _, kwargs in batch]],
+                    {},
+                    mod_name=ctxs[0].mod_name,
+                )
+                batch_ctx.update_command(self.workflow_run_dir)
+                self.proc_pool.put_command(
+                    batch_ctx,
+                    callback=self.batch_callback,
+                    callback_args=[ctxs],
+                )
+        self.workflow_state_batches.clear()
 
-    def housekeep(self, itasks):
+    def _split_batch(
+        self, batch: List[Tuple['SubFuncContext', Dict[str, Any]]]
+    ) -> Iterator[List[Tuple['SubFuncContext', Dict[str, Any]]]]:
+        """Split a batch so that its arguments fit on the command line.
+
+        Yields batches whose JSON arguments are no longer than
+        MAX_BATCH_ARG_LEN (or single calls, if longer).
+        """
+        chunk: List[Tuple['SubFuncContext', Dict[str, Any]]] = []
+        chunk_len = 0
+        for item in batch:
+            # (+2 for the list separator)
+            item_len = len(json.dumps(item[1])) + 2
+            if chunk and chunk_len + item_len > self.MAX_BATCH_ARG_LEN:
+                yield chunk
+                chunk = []
+                chunk_len = 0
+            chunk.append(item)
+            chunk_len += item_len
+        if chunk:
+            yield chunk
+
+    def batch_callback(
+        self, batch_ctx: 'SubFuncContext', ctxs: 'List[SubFuncContext]'
+    ) -> None:
+        """Callback for batched xtrigger functions.
+
+        Unpack the result of each xtrigger call in the batch and pass it on
+        to the (non-batch) callback.
+        """
+        try:
+            returns = json.loads(batch_ctx.out)
+        except (ValueError, TypeError):
+            returns = None
+        if (
+            batch_ctx.ret_code != 0
+            or not isinstance(returns, list)
+            or len(returns) != len(ctxs)
+        ):
+            msg = f"ERROR in xtrigger batch {batch_ctx.label}"
+            if batch_ctx.err:
+                msg += f"\n{batch_ctx.err}"
+            LOG.warning(msg)
+            returns = [{'error': None}] * len(ctxs)
+        for ctx, ret in zip(ctxs, returns):
+            if 'error' in ret:
+                ctx.ret_code = 1
+                ctx.err = ret['error']
+            else:
+                ctx.ret_code = 0
+                ctx.out = json.dumps(ret['result'])
+            self.callback(ctx)
+
+    def _schedule_clock(
+        self,
+        itask: 'TaskProxy',
+        label: str,
+        sig: str,
+        ctx: 'SubFuncContext',
+    ) -> None:
+        """Schedule a clock trigger that a task is waiting on."""
+        if sig not in self.clock_times:
+            trigger_time = ctx.func_kwargs['trigger_time']
+            self.clock_times[sig] = trigger_time
+            heappush(self.clock_schedule, (trigger_time, sig))
+            self.wakeup.set_deadline(trigger_time)
+        self.clock_tasks.setdefault(sig, {})[itask.identity] = (itask, label)
+
+    def _clock_succeeded(self, sig: str) -> None:
+        """Record a clock trigger as succeeded and satisfy waiting tasks."""
+        self.clock_times.pop(sig, None)
+        tasks = self.clock_tasks.pop(sig, {})
+        if sig not in self.sat_xtrig:
+            self.sat_xtrig[sig] = {}
+            self.data_store_mgr.delta_xtrigger(sig, True)
+            self.workflow_db_mgr.put_xtriggers({sig: {}})
+            LOG.info(
+                'xtrigger succeeded: %s = %s',
+                ', '.join(sorted({label for _, label in tasks.values()})),
+                sig,
+            )
+            self.housekeep_sigs.add(sig)
+            self.do_housekeeping = True
+        for itask, label in tasks.values():
+            itask.state.xtriggers[label] = True
+            self._update_task_sigs(
+                itask, self.task_sigs.get(itask.identity, set()) - {sig}
+            )
+
+    def check_clock_xtriggers(self) -> None:
+        """Satisfy the clock triggers whose trigger time has arrived.
+
+        Call once per main loop iteration, before checking waiting tasks.
+        Sets the main loop wake up deadline for the next clock trigger.
+        """
+        now = time()
+        while self.clock_schedule and self.clock_schedule[0][0] <= now:
+            trigger_time, sig = heappop(self.clock_schedule)
+            if self.clock_times.get(sig) == trigger_time:
+                self._clock_succeeded(sig)
+            # else no longer needed
+        if self.clock_schedule:
+            self.wakeup.set_deadline(self.clock_schedule[0][0])
+
+    def update_task(self, itask: 'TaskProxy') -> None:
+        """Update the record of xtriggers a task is waiting on.
+
+        Call when a task enters the pool, or when its xtrigger prerequisites
+        are changed outside of this class. This also schedules the task's
+        clock triggers.
+        """
+        sigs = set()
+        for label, sig, ctx, _ in self._get_xtrigs(
+            itask, unsat_only=True, known_only=True
+        ):
+            sigs.add(sig)
+            if (
+                label in self.xtriggers.wall_clock_labels
+                and sig not in self.sat_xtrig
+            ):
+                self._schedule_clock(itask, label, sig, ctx)
+        self._update_task_sigs(itask, sigs)
+
+    def remove_task(self, itask: 'TaskProxy') -> None:
+        """Forget the xtriggers a task is waiting on.
+
+        Call when a task leaves the pool.
+        """
+        self._update_task_sigs(itask, set())
+
+    def _update_task_sigs(self, itask: 'TaskProxy', sigs: Set[str]) -> None:
+        """Set the xtrigger signatures a task is waiting on.
+
+        Maintains the count of tasks waiting on each signature, unschedules
+        clock triggers that no task is waiting on, and marks succeeded
+        signatures that no task is waiting on for housekeeping.
+        """
+        old_sigs = self.task_sigs.pop(itask.identity, set())
+        if sigs:
+            self.task_sigs[itask.identity] = sigs
+        for sig in sigs - old_sigs:
+            self.sig_refs[sig] += 1
+        for sig in old_sigs - sigs:
+            self.sig_refs[sig] -= 1
+            with suppress(KeyError):
+                del self.clock_tasks[sig][itask.identity]
+            if not self.sig_refs[sig]:
+                del self.sig_refs[sig]
+                # (unschedule, the heap entry is skipped when it comes up)
+                self.clock_times.pop(sig, None)
+                self.clock_tasks.pop(sig, None)
+                if sig in self.sat_xtrig:
+                    self.housekeep_sigs.add(sig)
+                    self.do_housekeeping = True
+
+    def housekeep(self):
         """Forget succeeded xtriggers no longer needed by any task.
 
         Check self.do_housekeeping before calling this method.
 
-        Args:
-            itasks: list of all task proxies.
         """
-        all_xtrig = []
-        for itask in itasks:
-            all_xtrig += self._get_xtrigs(
-                itask, sigs_only=True, unsat_only=True)
-        for sig in list(self.sat_xtrig):
-            if sig not in all_xtrig:
+        for sig in self.housekeep_sigs:
+            if sig not in self.sig_refs and sig in self.sat_xtrig:
                 LOG.debug(f"Housekeeping xtrigger result: {sig}")
                 del self.sat_xtrig[sig]
                 with suppress(KeyError):
                     del self.t_next_call[sig]
+        self.housekeep_sigs.clear()
         self.do_housekeeping = False
 
     def all_task_seq_xtriggers_satisfied(self, itask: 'TaskProxy') -> bool:
@@ -743,6 +1080,8 @@ class XtriggerManager:
         """
         sig = ctx.get_signature()
         self.active.remove(sig)
+        # the main loop needs to call this xtrigger again or satisfy tasks
+        self.wakeup.set()
 
         if ctx.ret_code != 0:
             msg = f"ERROR in xtrigger {sig}"
@@ -764,6 +1103,7 @@ class XtriggerManager:
         LOG.info(f"xtrigger succeeded: {ctx.get_description()}")
         self.sat_xtrig[sig] = results
 
+        self.housekeep_sigs.add(sig)
         self.do_housekeeping = True
 
     def force_satisfy(
@@ -821,6 +1161,8 @@ class XtriggerManager:
             if log:
                 LOG.info(f"{prefix} force-{state}: {suffix}")
 
+        self.update_task(itask)
+
     def force_satisfy_all(self, itask: 'TaskProxy', log: bool = True):
         """Force satisfy all xtriggers for the provided task."""
         self.force_satisfy(
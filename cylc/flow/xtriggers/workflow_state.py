@@ -15,9 +15,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Dict, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 import asyncio
 from inspect import signature
+import traceback
 
 from cylc.flow.scripts.workflow_state import WorkflowPoller
 from cylc.flow.id import tokenise
@@ -84,7 +85,89 @@ def workflow_state(
        The ``flow_num`` argument was added. The ``cylc_run_dir`` argument
        was renamed to ``alt_cylc_run_dir``.
     """
-    poller = WorkflowPoller(
+    poller = _get_poller(
+        workflow_task_id, offset, flow_num, is_trigger, is_message,
+        alt_cylc_run_dir
+    )
+    if asyncio.run(poller.poll()):
+        return (True, _get_results(poller))
+    else:
+        return (False, {})
+
+
+def workflow_state_batch(
+    calls: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Check several workflow_state xtriggers in one go.
+
+    The scheduler uses this to check all of the workflow_state xtriggers that
+    target the same workflow (and are due) in a single process. Calls that
+    target the same workflow share one connection to its DB and are answered
+    within a single read transaction, rather than each call opening the DB.
+
+    Args:
+        calls:
+            Keyword arguments for each :py:func:`workflow_state` call.
+
+    Returns:
+        For each call, in order, either ``{"result": (satisfied, result)}``
+        (see :py:func:`workflow_state`) or ``{"error": traceback}`` if the
+        call raised an exception.
+
+    """
+    returns: List[Dict[str, Any]] = [{} for _ in calls]
+
+    # Group the calls by target workflow.
+    targets: Dict[
+        Tuple[Optional[str], Optional[str]], List[Tuple[int, WorkflowPoller]]
+    ] = {}
+    for ind, kwargs in enumerate(calls):
+        try:
+            poller = _get_poller(**kwargs)
+        except Exception:
+            returns[ind] = {'error': traceback.format_exc()}
+            continue
+        targets.setdefault(
+            (poller.workflow_id_raw, poller.alt_cylc_run_dir), []
+        ).append((ind, poller))
+
+    for pollers in targets.values():
+        first = pollers[0][1]
+        db_checker = first.db_checker if first._find_workflow() else None
+        if db_checker is None:
+            # Workflow or DB not found (yet).
+            for ind, _ in pollers:
+                returns[ind] = {'result': (False, {})}
+            continue
+        with db_checker:
+            # Hold one read lock for all the queries.
+            db_checker.conn.execute('BEGIN')
+            for ind, poller in pollers:
+                poller.workflow_id = first.workflow_id
+                poller._db_checker = db_checker
+                try:
+                    satisfied = asyncio.run(poller.check())
+                except Exception:
+                    returns[ind] = {'error': traceback.format_exc()}
+                    continue
+                if satisfied:
+                    returns[ind] = {'result': (True, _get_results(poller))}
+                else:
+                    returns[ind] = {'result': (False, {})}
+
+    return returns
+
+
+def _get_poller(
+    workflow_task_id: str,
+    offset: Optional[str] = None,
+    flow_num: Optional[int] = None,
+    is_trigger: bool = False,
+    is_message: bool = False,
+    alt_cylc_run_dir: Optional[str] = None,
+) -> WorkflowPoller:
+    """Return a single-shot workflow poller for the xtrigger args."""
+    return WorkflowPoller(
         workflow_task_id,
         offset,
         flow_num,
@@ -98,33 +181,32 @@ def workflow_state(
         args=[]
     )
 
+
+def _get_results(poller: WorkflowPoller) -> Dict[str, Any]:
+    """Return the xtrigger results for a satisfied poller."""
     # NOTE the results dict item names remain compatible with older usage.
+    results = {
+        'workflow': poller.workflow_id,
+        'task': poller.task,
+        'point': poller.cycle,
+    }
+    if poller.alt_cylc_run_dir is not None:
+        results['cylc_run_dir'] = poller.alt_cylc_run_dir
 
-    if asyncio.run(poller.poll()):
-        results = {
-            'workflow': poller.workflow_id,
-            'task': poller.task,
-            'point': poller.cycle,
-        }
-        if poller.alt_cylc_run_dir is not None:
-            results['cylc_run_dir'] = poller.alt_cylc_run_dir
-
-        if offset is not None:
-            results['offset'] = poller.offset
-
-        if flow_num is not None:
-            results["flow_num"] = poller.flow_num
-
-        if poller.is_message:
-            results['message'] = poller.selector
-        elif poller.is_trigger:
-            results['trigger'] = poller.selector
-        else:
-            results['status'] = poller.selector
-
-        return (True, results)
+    if poller.offset is not None:
+        results['offset'] = poller.offset
+
+    if poller.flow_num is not None:
+        results["flow_num"] = poller.flow_num
+
+    if poller.is_message:
+        results['message'] = poller.selector
+    elif poller.is_trigger:
+        results['trigger'] = poller.selector
     else:
-        return (False, {})
+        results['status'] = poller.selector
+
+    return results
 
 
 def validate(args: Dict[str, Any]):
@@ -0,0 +1,76 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the "cylc main-loop-timings" command."""
+
+import json
+
+from cylc.flow.option_parsers import Options
+from cylc.flow.scripts.main_loop_timings import (
+    get_option_parser,
+    main_loop_timings,
+)
+
+TimingsOptions = Options(get_option_parser())
+
+
+async def test_main_loop_timings(one_conf, flow, scheduler, start, capsys):
+    """It should report the duration of each main loop phase."""
+    id_ = flow(one_conf)
+    schd = scheduler(id_, paused_start=True)
+    async with start(schd):
+        # no main loop iterations yet
+        await main_loop_timings(id_, TimingsOptions())
+        out, _ = capsys.readouterr()
+        assert out == 'No main loop timings available yet.\n'
+
+        # the timings of the first iteration are published on the second
+        # (an iteration's timings are recorded at its end)
+        await schd._main_loop()
+        await schd._main_loop()
+        await main_loop_timings(id_, TimingsOptions(json=True))
+        out, _ = capsys.readouterr()
+        timings = json.loads(out)
+        assert timings['buckets'] == [0.001, 0.01, 0.1, 1.0, 10.0]
+        assert {
+            'process_queued_task_messages',
+            'release_tasks_to_run',
+            'update_data_structure',
+            'process_workflow_db_queue',
+            'main_loop_plugins',
+            'sleep',
+            'total',
+        }.issubset(timings['phases'])
+        total = timings['phases']['total']
+        assert total['count'] == 1
+        assert sum(total['histogram']) == 1
+        assert total['max'] >= total['p50'] > 0
+
+        # the published timings are rate limited
+        await schd._main_loop()
+        await main_loop_timings(id_, TimingsOptions(json=True))
+        out, _ = capsys.readouterr()
+        assert json.loads(out)['phases']['total']['count'] == 1
+
+        # tabular output
+        await main_loop_timings(id_, TimingsOptions())
+        out, _ = capsys.readouterr()
+        lines = out.splitlines()
+        assert lines[0].split() == [
+            'phase', 'count', 'mean', 'p50', 'p90', 'p99', 'max'
+        ]
+        assert lines[-1].split()[:2] == ['total', '1']
@@ -21,12 +21,14 @@ from pathlib import Path
 import pytest
 import re
 from signal import SIGHUP, SIGINT, SIGTERM
+from time import time
 from typing import Any, Callable
 
 from cylc.flow import commands
 from cylc.flow.exceptions import CylcError
 from cylc.flow.parsec.exceptions import ParsecError
 from cylc.flow.scheduler import Scheduler, SchedulerStop
+from cylc.flow.subprocctx import SubProcContext
 from cylc.flow.task_state import (
     TASK_STATUS_SUCCEEDED,
     TASK_STATUS_WAITING,
@@ -455,3 +457,67 @@ async def test_set_stall_interaction(flow, scheduler, start):
             schd.data_store_mgr.data[schd.tokens.id]['workflow'].status_msg
             != 'stalled'
         )
+
+
+async def test_event_driven_main_loop(
+    one_conf, flow, scheduler, run, mock_glbl_cfg
+):
+    """An idle event driven main loop should wake up as soon as work arrives.
+    """
+    mock_glbl_cfg(
+        'cylc.flow.scheduler.glbl_cfg',
+        '''
+            [scheduler]
+                [[main loop]]
+                    event driven = True
+                    maximum sleep interval = PT1M
+        '''
+    )
+    schd: 'Scheduler' = scheduler(flow(one_conf), paused_start=True)
+    async with run(schd):
+        assert schd.wakeup.enabled
+
+        # wait for the main loop to go to sleep
+        start = time()
+        while not schd.wakeup._waiting:
+            assert time() - start < 10, 'main loop did not go idle'
+            await asyncio.sleep(0.01)
+
+        # queue a command, it should be actioned without waiting for the
+        # "maximum sleep interval" to elapse
+        await schd.server.resolvers._mutation_mapper('resume', {}, {})
+        start = time()
+        while schd.is_paused:
+            assert time() - start < 10, 'main loop did not wake up'
+            await asyncio.sleep(0.01)
+
+
+async def test_shutdown_waits_for_async_commands(
+    one_conf, flow, scheduler, start, mock_glbl_cfg
+):
+    """Shutdown should wait for commands run by the asyncio backend.
+
+    The commands run on the event loop, so the scheduler must yield to it
+    while waiting for the process pool to empty.
+    """
+    mock_glbl_cfg(
+        'cylc.flow.scheduler.glbl_cfg',
+        '''
+            [scheduler]
+                process pool backend = asyncio
+        '''
+    )
+    schd: 'Scheduler' = scheduler(flow(one_conf), paused_start=True)
+    async with start(schd):
+        done = []
+        schd.proc_pool.put_command(
+            SubProcContext('test', ['sleep', '0.2']),
+            callback=lambda ctx: done.append(ctx.ret_code),
+        )
+        schd.proc_pool.process()
+        schd._set_stop(StopMode.REQUEST_CLEAN)
+        async with asyncio.timeout(10):
+            with pytest.raises(SchedulerStop):
+                await schd.workflow_shutdown()
+        assert done == [0]
+        assert not schd.proc_pool.is_not_done()
@@ -15,17 +15,22 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 import json
 import logging
+import os
 from typing import Any as Fixture
 from unittest.mock import Mock
 
+import pytest
+
 from cylc.flow import CYLC_LOG
 from cylc.flow.job_runner_mgr import JOB_FILES_REMOVED_MESSAGE
 from cylc.flow.scheduler import Scheduler
 from cylc.flow.task_state import (
     TASK_STATUS_FAILED,
+    TASK_STATUS_PREPARING,
     TASK_STATUS_RUNNING,
 )
 
@@ -294,3 +299,67 @@ async def test__prep_submit_task_job_impl_handles_all_old_platform_settings(
             schd.task_job_mgr._prep_submit_task_job(task_a)
 
         assert task_a.platform['name'] == 'bakery'
+
+
+async def test_job_cmd_coalescing(
+    one_conf: Fixture, flow: Fixture, scheduler: Fixture, start: Fixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Poll requests within the coalescing window are run as one command."""
+    schd: Scheduler = scheduler(flow(one_conf))
+    async with start(schd):
+        put_job_cmds = Mock()
+        monkeypatch.setattr(
+            schd.task_job_mgr, '_put_job_cmds', put_job_cmds
+        )
+        schd.task_job_mgr.job_cmd_window = 60
+        itask = schd.pool.get_tasks()[0]
+        itask.state_reset(TASK_STATUS_RUNNING)
+
+        schd.task_job_mgr.poll_task_jobs([itask])
+        schd.task_job_mgr.poll_task_jobs([itask])
+        assert len(schd.task_job_mgr.pending_job_cmds) == 1
+
+        # the window has not closed yet
+        schd.task_job_mgr.flush_job_cmds()
+        assert put_job_cmds.call_count == 0
+
+        # the task is only polled once
+        schd.task_job_mgr.flush_job_cmds(force=True)
+        assert put_job_cmds.call_count == 1
+        cmd_key, itasks, *_ = put_job_cmds.call_args.args
+        assert cmd_key == schd.task_job_mgr.JOBS_POLL
+        assert itasks == [itask]
+        assert not schd.task_job_mgr.pending_job_cmds
+
+        # commands for a job are dropped if the task has a new job by the
+        # time the window closes (e.g. it was re-triggered)
+        schd.task_job_mgr.kill_task_jobs([itask])
+        schd.task_job_mgr.poll_task_jobs([itask])
+        itask.submit_num += 1
+        schd.task_job_mgr.flush_job_cmds(force=True)
+        assert put_job_cmds.call_count == 1
+        assert not schd.task_job_mgr.pending_job_cmds
+
+
+async def test_job_file_writer_threads(
+    one_conf: Fixture, flow: Fixture, scheduler: Fixture, start: Fixture,
+):
+    """Job files can be written in the background."""
+    schd: Scheduler = scheduler(flow(one_conf), run_mode='live')
+    async with start(schd):
+        schd.task_job_mgr.job_file_executor = ThreadPoolExecutor(1)
+        itask = schd.pool.get_tasks()[0]
+        itask.submit_num = 1
+        itask.state_reset(TASK_STATUS_PREPARING)
+
+        # the job file is written in the background
+        assert schd.task_job_mgr._prep_submit_task_job(itask) is None
+        _, future = schd.task_job_mgr.job_file_writes[itask]
+        future.result()
+
+        # the task is prepared once the job file has been written
+        assert schd.task_job_mgr._prep_submit_task_job(itask) is itask
+        assert os.path.exists(os.path.expandvars(itask.local_job_file_path))
+        assert not schd.task_job_mgr.job_file_writes
+        schd.task_job_mgr.close()
@@ -43,6 +43,7 @@ from cylc.flow.data_store_mgr import TASK_PROXIES
 from cylc.flow.exceptions import WorkflowConfigError
 from cylc.flow.flow_mgr import FLOW_NONE
 from cylc.flow.id import TaskTokens, Tokens
+from cylc.flow.prerequisite import PrereqTuple
 from cylc.flow.run_modes import RunMode
 from cylc.flow.task_events_mgr import TaskEventsManager
 from cylc.flow.task_outputs import (
@@ -2715,3 +2716,210 @@ async def test_parentless_spawning(flow, scheduler, run, complete):
         await complete(schd, "2/b")
         # The task pool should not be empty now.
         assert len(schd.pool.get_tasks())
+
+
+async def test_waiting_unqueued_tasks(flow, scheduler, start):
+    """It should index waiting tasks which are not queued or runahead.
+
+    These are the tasks the main loop checks for xtriggers, ext-triggers
+    and readiness to run.
+    """
+    id_ = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'runahead limit': 'P1',
+            'xtriggers': {
+                # an xtrigger which is never satisfied
+                'x': 'xrandom(0)',
+            },
+            'graph': {
+                'P1': '@x => a',
+            },
+        },
+    })
+    schd = scheduler(id_)
+    async with start(schd):
+        def waiting_unqueued():
+            return {
+                itask.identity
+                for itask in schd.pool.get_waiting_unqueued_tasks()
+            }
+
+        # the tasks are waiting on the xtrigger, 3/a is runahead limited
+        assert {itask.identity for itask in schd.pool.get_tasks()} == {
+            '1/a', '2/a', '3/a'
+        }
+        assert waiting_unqueued() == {'1/a', '2/a'}
+        assert waiting_unqueued() == {
+            itask.identity
+            for itask in schd.pool.get_tasks()
+            if itask.state(TASK_STATUS_WAITING)
+            and not itask.state.is_queued
+            and not itask.state.is_runahead
+        }
+
+        # state changes should update the index
+        a_2 = schd.pool.get_task(IntegerPoint('2'), 'a')
+        schd.pool.queue_task(a_2)
+        assert waiting_unqueued() == {'1/a'}
+        schd.pool.unqueue_task(a_2)
+        assert waiting_unqueued() == {'1/a', '2/a'}
+        a_2.state_reset(TASK_STATUS_RUNNING)
+        assert waiting_unqueued() == {'1/a'}
+        a_2.state_reset(TASK_STATUS_WAITING)
+        assert waiting_unqueued() == {'1/a', '2/a'}
+
+        # removed tasks should be dropped from the index
+        schd.pool.remove(a_2)
+        assert waiting_unqueued() == {'1/a'}
+        a_2.state_reset(TASK_STATUS_SUCCEEDED)
+        a_2.state_reset(TASK_STATUS_WAITING)
+        assert waiting_unqueued() == {'1/a'}
+
+        # reloaded tasks should replace their predecessors in the index
+        a_1 = schd.pool.get_task(IntegerPoint('1'), 'a')
+        await commands.run_cmd(commands.reload_workflow(schd))
+        [a_1_reloaded] = schd.pool.get_waiting_unqueued_tasks()
+        assert a_1_reloaded is not a_1
+        assert a_1_reloaded is schd.pool.get_task(IntegerPoint('1'), 'a')
+
+
+async def test_pop_updated_tasks(flow, scheduler, start):
+    """It should track pool tasks whose state has changed."""
+    id_ = flow('a & b')
+    schd = scheduler(id_)
+    async with start(schd):
+        a = schd.pool.get_task(IntegerPoint('1'), 'a')
+        b = schd.pool.get_task(IntegerPoint('1'), 'b')
+        for itask in schd.pool.pop_updated_tasks():
+            itask.state.is_updated = False
+        assert schd.pool.pop_updated_tasks() == []
+
+        b.state_reset(TASK_STATUS_RUNNING)
+        a.state_reset(TASK_STATUS_RUNNING)
+        b.state_reset(TASK_STATUS_SUCCEEDED)
+        # no change
+        a.state_reset(TASK_STATUS_RUNNING)
+        assert schd.pool.pop_updated_tasks() == [b, a]
+        assert schd.pool.pop_updated_tasks() == []
+
+        # removed tasks should not be returned
+        a.state_reset(TASK_STATUS_SUCCEEDED)
+        schd.pool.remove(a)
+        assert schd.pool.pop_updated_tasks() == []
+
+
+async def test_active_tasks_by_id(flow, scheduler, start):
+    """It should index pool tasks by relative ID."""
+    id_ = flow('a => b')
+    schd = scheduler(id_)
+    async with start(schd):
+        a = schd.pool.get_task(IntegerPoint('1'), 'a')
+        assert schd.pool._get_task_by_id('1/a') is a
+        assert schd.pool._get_task_by_id('1/b') is None
+        assert schd.pool.get_itasks([
+            TaskTokens('1', 'a'),
+            TaskTokens('1', 'b'),
+        ]) == [a]
+
+        schd.pool.remove(a)
+        assert schd.pool._get_task_by_id('1/a') is None
+        assert schd.pool.get_task_ids() == set()
+
+
+async def test_active_task_counter(flow, scheduler, start):
+    """It should count active tasks by name as their state changes."""
+    id_ = flow('a & b')
+    schd = scheduler(id_)
+    async with start(schd):
+        a = schd.pool.get_task(IntegerPoint('1'), 'a')
+        b = schd.pool.get_task(IntegerPoint('1'), 'b')
+        assert schd.pool.active_task_counter == {}
+
+        a.waiting_on_job_prep = True
+        assert schd.pool.active_task_counter == {'a': 1}
+        assert list(schd.pool.pre_prep_tasks) == [a]
+
+        a.state_reset(TASK_STATUS_RUNNING)
+        a.waiting_on_job_prep = False
+        b.state_reset(TASK_STATUS_RUNNING)
+        assert schd.pool.active_task_counter == {'a': 1, 'b': 1}
+        assert list(schd.pool.pre_prep_tasks) == []
+
+        a.state_reset(TASK_STATUS_SUCCEEDED)
+        assert schd.pool.active_task_counter == {'b': 1}
+
+        # removed tasks should not be counted
+        schd.pool.remove(b)
+        assert schd.pool.active_task_counter == {}
+        assert schd.pool.task_queue_mgr.active == {}
+
+
+async def test_get_min_point(flow, scheduler, start):
+    """It should return the earliest cycle point in the pool."""
+    id_ = flow({
+        'scheduling': {
+            'cycling mode': 'integer',
+            'runahead limit': 'P2',
+            'graph': {'P1': 'a'},
+        },
+    })
+    schd = scheduler(id_)
+    async with start(schd):
+        assert schd.pool.get_min_point() == IntegerPoint('1')
+        schd.pool.remove(schd.pool.get_task(IntegerPoint('1'), 'a'))
+        assert schd.pool.get_min_point() == IntegerPoint('2')
+
+
+async def test_prereqs_by_output(flow, scheduler, start):
+    """It should index pool task prerequisites by output."""
+    id_ = flow('a & x => b')
+    schd = scheduler(id_)
+    async with start(schd):
+        a = schd.pool.get_task(IntegerPoint('1'), 'a')
+        x = schd.pool.get_task(IntegerPoint('1'), 'x')
+        x_output = PrereqTuple('1', 'x', 'succeeded')
+        assert x_output not in schd.pool.prereqs_by_output
+
+        # 1/b spawns, waiting on 1/x
+        schd.pool.spawn_on_output(a, TASK_OUTPUT_SUCCEEDED)
+        b = schd.pool.get_task(IntegerPoint('1'), 'b')
+        assert list(schd.pool.prereqs_by_output[x_output]) == [b]
+        assert not b.prereqs_are_satisfied()
+
+        # the indexed prerequisite is satisfied
+        schd.pool.spawn_on_output(x, TASK_OUTPUT_SUCCEEDED)
+        assert b.prereqs_are_satisfied()
+
+        schd.pool.remove(b)
+        assert x_output not in schd.pool.prereqs_by_output
+
+
+async def test_clock_expire_deadlines(flow, scheduler, start):
+    """It should track the clock-expiry times of waiting tasks."""
+    id_ = flow({
+        'scheduling': {
+            'initial cycle point': '2000',
+            'runahead limit': 'P0',
+            'special tasks': {'clock-expire': 'x'},
+            'graph': {'P1Y': 'x & y'},
+        },
+    })
+    schd = scheduler(id_)
+    async with start(schd):
+        x = schd.pool.get_task(ISO8601Point('20000101T0000Z'), 'x')
+        y = schd.pool.get_task(ISO8601Point('20000101T0000Z'), 'y')
+        assert x in schd.pool.clock_expire_deadlines
+        assert y not in schd.pool.clock_expire_deadlines
+
+        # active tasks can not clock-expire
+        x.state_reset(TASK_STATUS_RUNNING)
+        schd.pool.clock_expire_tasks()
+        assert x.state(TASK_STATUS_RUNNING)
+        assert x not in schd.pool.clock_expire_deadlines
+
+        # but they are checked again if they return to waiting
+        x.state_reset(TASK_STATUS_WAITING)
+        assert x in schd.pool.clock_expire_deadlines
+        schd.pool.clock_expire_tasks()
+        assert x.state(TASK_STATUS_EXPIRED)
@@ -250,7 +250,7 @@ async def test_1_xtrigger_2_tasks_later(
         assert foo.state.xtriggers == {'echo': True}
 
         # this will delete the xtrigger - nothing else depends on it
-        schd.xtrigger_mgr.housekeep([foo])
+        schd.xtrigger_mgr.housekeep()
 
         # Spawn bar and remove foo
         schd.pool.spawn_on_output(foo, TASK_OUTPUT_SUCCEEDED)
@@ -800,3 +800,51 @@ async def test_orphaned_task_with_xtrigger_on_reload(
 
         # the reload should have completed successfully
         assert log_filter(contains='Reload completed')
+
+
+async def test_coroutine_xtrigger(flow, start, scheduler, log_filter):
+    """Coroutine xtriggers run on the event loop, not in the process pool."""
+    id_ = flow({
+        'scheduling': {
+            'xtriggers': {
+                'good': 'atrig(succeed=True)',
+                'bad': 'atrig(succeed=None)',
+            },
+            'graph': {
+                'R1': '''
+                    @good => foo
+                    @bad => bar
+                '''
+            },
+        }
+    })
+
+    # add a custom coroutine xtrigger to the workflow
+    run_dir = Path(get_workflow_run_dir(id_))
+    xtrig_dir = run_dir / 'lib/python'
+    xtrig_dir.mkdir(parents=True)
+    (xtrig_dir / 'atrig.py').write_text(dedent('''
+        import asyncio
+
+        async def atrig(succeed):
+            await asyncio.sleep(0)
+            if succeed is None:
+                raise Exception('This Xtrigger is broken')
+            return succeed, {}
+    '''))
+
+    schd = scheduler(id_)
+    async with start(schd):
+        assert schd.xtrigger_mgr.xtriggers.coroutine_labels == {'good', 'bad'}
+        for itask in schd.pool.get_tasks():
+            schd.xtrigger_mgr.call_xtriggers_async(itask)
+        assert not schd.proc_pool.is_not_done()
+        assert len(schd.xtrigger_mgr.coroutines) == 2
+
+        await asyncio.gather(*schd.xtrigger_mgr.coroutines)
+        # the callbacks are called by the main loop
+        assert len(schd.xtrigger_mgr.active) == 2
+        schd.xtrigger_mgr.process_coroutines()
+        assert not schd.xtrigger_mgr.active
+        assert list(schd.xtrigger_mgr.sat_xtrig) == ['atrig(succeed=True)']
+        assert log_filter(contains='This Xtrigger is broken')
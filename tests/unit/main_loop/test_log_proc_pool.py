@@ -0,0 +1,47 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pathlib import Path
+
+from cylc.flow.main_loop.log_proc_pool import _dump, _format
+from cylc.flow.subprocctx import SubProcContext
+from cylc.flow.subprocpool import SubProcQueue
+
+
+def get_stats():
+    """Return the metrics of a queue with one started command."""
+    queue = SubProcQueue()
+    queue.append([SubProcContext('jobs-poll', ['true']), *[None] * 5])
+    queue.start_next()
+    return queue.get_stats()
+
+
+def test_format():
+    """It should format the metrics of each lane."""
+    stats = get_stats()
+    assert _format('jobs-poll:localhost', stats['jobs-poll:localhost']) == (
+        'Process pool lane jobs-poll:localhost: 0 queued, 1 running,'
+        ' 1 started, wait mean 0.0s, max 0.0s, oldest 0.0s'
+    )
+
+
+def test_dump(tmp_path):
+    """Ensure the data is serialiseable."""
+    assert _dump([(1, get_stats())], tmp_path)
+    assert list(tmp_path.iterdir()) == [
+        Path(tmp_path, 'cylc.flow.main_loop.log_proc_pool.json')
+    ]
@@ -0,0 +1,60 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pathlib import Path
+
+from cylc.flow.cycling.integer import IntegerPoint
+from cylc.flow.id import Tokens
+from cylc.flow.main_loop.log_task_memory import (
+    CATEGORIES,
+    _dump,
+    _measure,
+)
+from cylc.flow.task_proxy import TaskProxy
+from cylc.flow.taskdef import TaskDef
+
+
+def test_measure():
+    """It should measure the memory attributable to tasks by type."""
+    tdef = TaskDef('foo', {}, None, None)
+    itasks = [
+        TaskProxy(Tokens('wflow'), tdef, IntegerPoint(str(point)))
+        for point in range(1, 4)
+    ]
+    sizes = _measure(itasks)
+    assert sizes['tasks'] == 3
+    for category in CATEGORIES:
+        if category == 'Prerequisite':
+            # (this task has no prerequisites)
+            assert sizes[category] == 0
+        else:
+            assert sizes[category] > 0
+
+    # measuring should not allocate lazily allocated attributes
+    assert not itasks[0].is_allocated('summary')
+
+    # allocated attributes count towards the TaskProxy
+    itasks[0].jobs.extend({'submit_num': num} for num in range(100))
+    assert _measure(itasks)['TaskProxy'] > sizes['TaskProxy']
+
+
+def test_dump(tmp_path):
+    """Ensure the data is serialiseable."""
+    assert _dump([(1, _measure([]))], tmp_path)
+    assert list(tmp_path.iterdir()) == [
+        Path(tmp_path, 'cylc.flow.main_loop.log_task_memory.json')
+    ]
@@ -88,7 +88,9 @@ def test_queue_and_release(
         queue_mgr.push_task(itask)
 
     # release tasks, given current active task counter
-    released = queue_mgr.release_tasks(active)
+    for name, count in active.items():
+        queue_mgr.update_active(name, count)
+    released = queue_mgr.release_tasks()
     assert sorted(r.tdef.name for r in released) == sorted(expected_released)
 
     # check that adopted orphans end up in the default queue
@@ -100,3 +102,23 @@ def test_queue_and_release(
     # check second assignment overrides first
     for group in expected_foo_groups:
         assert "foo" in queue_mgr.queues[group].members
+
+
+def test_push_task_if_limited():
+    """Test tasks are only queued if their queue limit is reached."""
+    queue_mgr = IndepQueueManager(QCONFIG, ALL_TASK_NAMES, DESCENDANTS)
+    itask = Mock(spec=TaskProxy)
+    itask.tdef.name = "b3"
+    itask.state.is_held = False
+
+    # "big" queue limit is 2
+    queue_mgr.update_active("b1", 1)
+    assert not queue_mgr.push_task_if_limited(itask)
+    queue_mgr.update_active("b2", 1)
+    assert queue_mgr.push_task_if_limited(itask)
+    assert queue_mgr.release_tasks() == []
+
+    # tasks in other queues do not count towards the limit
+    queue_mgr.update_active("b2", -1)
+    queue_mgr.update_active("s1", 1)
+    assert queue_mgr.release_tasks() == [itask]
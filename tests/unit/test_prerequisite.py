@@ -123,6 +123,13 @@ def test_items(prereq: Prerequisite):
         (('2000', 'c', 'succeeded'), False),
         (('2001', 'd', 'custom'), False),
     ]
+    assert list(prereq.keys()) == list(prereq)
+
+    # dependencies can be updated while iterating
+    for key, satisfied in prereq.items():
+        if not satisfied:
+            prereq[key] = 'force satisfied'
+    assert prereq.values() == ['satisfied naturally'] + 3 * ['force satisfied']
 
 
 def test_set_conditional_expr(prereq: Prerequisite):
@@ -264,16 +271,56 @@ def test_satisfy_me__override_truthy(
 
 
 @pytest.mark.parametrize(
-    'expr, err', (
-        ('int("df")', 'invalid literal'),
-        ('7 +', 'invalid syntax'),
+    'template, err', (
+        ('{0}|', 'unexpected end of expression'),
+        ('({0}|{1}', 'unexpected end of expression'),
+        ('{0}{1}', 'unexpected "1"'),
+        ('{0}|int("df")', 'unexpected character'),
     ))
-def test__eval_satisfied_raises(expr, err, monkeypatch):
-    monkeypatch.setattr(
-        'cylc.flow.prerequisite.Prerequisite.get_raw_conditional_expression',
-        lambda _: expr
-    )
+def test__eval_satisfied_raises(template, err):
     prereq = Prerequisite(IntegerPoint('1'))
-    prereq.conditional_expression = expr
+    prereq[('1', 'a', 'x')] = False
+    prereq[('1', 'b', 'x')] = False
+    prereq.set_conditional(template, [('1', 'a', 'x'), ('1', 'b', 'x')])
     with pytest.raises(TriggerExpressionError, match=err):
         prereq._eval_satisfied()
+
+
+@pytest.mark.parametrize(
+    'template, satisfied, expected', (
+        ('{0}|{1}&{2}', [False, True, False], False),
+        ('{0}|{1}&{2}', [True, False, False], True),
+        ('({0}|{1})&{2}', [True, False, False], False),
+        ('({0}|{1})&{2}', [False, True, True], True),
+        ('{0}&({1}|({2}&{0}))', [True, False, True], True),
+    ))
+def test_set_conditional(template, satisfied, expected):
+    """Test conditional expressions are evaluated from the template."""
+    keys = [('1', name, 'x') for name in 'abc']
+    prereq = Prerequisite(IntegerPoint('1'))
+    for key, value in zip(keys, satisfied):
+        prereq[key] = value
+    prereq.set_conditional(template, keys)
+    assert prereq.is_satisfied() is expected
+
+
+def test_template_shared():
+    """Prerequisites with the same structure should share a template."""
+    prereqs = []
+    for point in ('1', '2'):
+        prereq = Prerequisite(IntegerPoint(point))
+        prereq[(point, 'a', 'x')] = False
+        prereq[(point, 'b', 'x')] = True
+        prereq.set_conditional_expr(f'{point}/a x | {point}/b x')
+        prereqs.append(prereq)
+    one, two = prereqs
+    assert one._template is two._template
+    assert one._template.conditional == '{0} | {1}'
+    assert one.get_raw_conditional_expression() == '1/a x | 1/b x'
+    assert two.get_raw_conditional_expression() == '2/a x | 2/b x'
+    assert two.is_satisfied()
+
+    # the satisfaction state is held by the prerequisite, not the template
+    two[('2', 'b', 'x')] = False
+    assert not two.is_satisfied()
+    assert one[('1', 'b', 'x')] == 'satisfied naturally'
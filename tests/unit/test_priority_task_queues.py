@@ -0,0 +1,167 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Tests for the priority task queue manager module
+
+from copy import deepcopy
+from unittest.mock import Mock
+
+import pytest
+
+from cylc.flow.task_proxy import TaskProxy
+from cylc.flow.task_queues.priority import PriorityQueueManager
+
+
+ALL_TASK_NAMES = ["a1", "a2", "a3", "a4", "b1", "b2", "b3", "b4", "foo"]
+
+DESCENDANTS = {
+    "root": ALL_TASK_NAMES + ["A", "B"],
+    "A": ["a1", "a2", "a3", "a4"],
+    "B": ["b1", "b2", "b3", "b4"],
+}
+
+QCONFIG = {
+    "default": {
+        "limit": 0,
+        "members": [],  # (auto: all task names)
+        "weight": 1.0,
+    },
+    "qa": {
+        "members": ["A"],
+        "limit": 0,
+        "weight": 1.0,
+    },
+    "qb": {
+        "members": ["B"],
+        "limit": 0,
+        "weight": 1.0,
+    },
+}
+
+
+def make_task(name, priority=0, is_held=False):
+    itask = Mock(spec=TaskProxy)
+    itask.tdef.name = name
+    itask.tdef.rtconfig = {'queue priority': priority}
+    itask.state.is_held = is_held
+    return itask
+
+
+def make_queue_mgr(total_limit=0, **queues):
+    """Return a queue manager, queues are configured as {name: (limit, wt)}.
+    """
+    qconfig = deepcopy(QCONFIG)
+    for name, (limit, weight) in queues.items():
+        qconfig[name]["limit"] = limit
+        qconfig[name]["weight"] = weight
+    return PriorityQueueManager(
+        qconfig, ALL_TASK_NAMES, DESCENDANTS, total_limit
+    )
+
+
+def names(itasks):
+    return [itask.tdef.name for itask in itasks]
+
+
+def test_release_by_priority():
+    """Test tasks are released highest priority first, then in order."""
+    queue_mgr = make_queue_mgr(qa=(2, 1))
+    for name, priority in [("a1", 0), ("a2", 5), ("a3", 0), ("a4", 5)]:
+        queue_mgr.push_task(make_task(name, priority))
+    assert names(queue_mgr.release_tasks()) == ["a2", "a4"]
+    queue_mgr.update_active("a2", 1)
+    queue_mgr.update_active("a4", 1)
+    assert queue_mgr.release_tasks() == []
+    queue_mgr.update_active("a2", -1)
+    assert names(queue_mgr.release_tasks()) == ["a1"]
+
+
+@pytest.mark.parametrize(
+    "weights, total_limit, expected",
+    [
+        pytest.param((1, 1), 4, {"qa": 2, "qb": 2}, id="equal"),
+        pytest.param((3, 1), 4, {"qa": 3, "qb": 1}, id="weighted"),
+        pytest.param((1, 0), 4, {"qa": 4, "qb": 0}, id="zero-weight"),
+        pytest.param((1, 0), 6, {"qa": 4, "qb": 2}, id="zero-weight-spare"),
+    ]
+)
+def test_fair_share(weights, total_limit, expected):
+    """Test the total limit is shared between queues by weight."""
+    queue_mgr = make_queue_mgr(
+        total_limit,
+        qa=(0, weights[0]),
+        qb=(0, weights[1]),
+    )
+    # queue "qb" is higher priority and was queued first
+    for name in DESCENDANTS["B"]:
+        queue_mgr.push_task(make_task(name, priority=10))
+    for name in DESCENDANTS["A"]:
+        queue_mgr.push_task(make_task(name))
+    released = names(queue_mgr.release_tasks())
+    assert len(released) == total_limit
+    assert {
+        "qa": sum(name.startswith("a") for name in released),
+        "qb": sum(name.startswith("b") for name in released),
+    } == expected
+
+
+def test_fair_share_active():
+    """Test active tasks count towards the fair share."""
+    queue_mgr = make_queue_mgr(4)
+    queue_mgr.update_active("a1", 1)
+    queue_mgr.update_active("a2", 1)
+    queue_mgr.update_active("a3", 1)
+    queue_mgr.push_task(make_task("a4"))
+    queue_mgr.push_task(make_task("b1"))
+    assert names(queue_mgr.release_tasks()) == ["b1"]
+    queue_mgr.update_active("b1", 1)
+    assert queue_mgr.push_task_if_limited(make_task("b2"))
+
+
+def test_held_tasks():
+    """Test held tasks are not released but keep their place."""
+    queue_mgr = make_queue_mgr(qa=(1, 1))
+    held = make_task("a1", priority=1, is_held=True)
+    queue_mgr.push_task(held)
+    queue_mgr.push_task(make_task("a2"))
+    assert names(queue_mgr.release_tasks()) == ["a2"]
+    queue_mgr.update_active("a2", 1)
+    held.state.is_held = False
+    assert queue_mgr.release_tasks() == []
+    queue_mgr.update_active("a2", -1)
+    assert queue_mgr.release_tasks() == [held]
+
+
+def test_remove_task():
+    """Test removed tasks are not released."""
+    queue_mgr = make_queue_mgr()
+    itask = make_task("a1")
+    queue_mgr.push_task(itask)
+    queue_mgr.push_task(make_task("foo"))
+    assert queue_mgr.remove_task(itask)
+    assert not queue_mgr.remove_task(itask)
+    assert names(queue_mgr.release_tasks()) == ["foo"]
+
+
+def test_adopt_tasks():
+    """Test orphaned tasks are adopted by the default queue."""
+    queue_mgr = make_queue_mgr(default=(1, 1))
+    queue_mgr.update_active("orphan1", 1)
+    queue_mgr.adopt_tasks(["orphan1", "orphan2"])
+    assert {"orphan1", "orphan2"} <= queue_mgr.queues["default"].members
+    queue_mgr.push_task(make_task("orphan2"))
+    assert queue_mgr.release_tasks() == []
@@ -155,6 +155,22 @@ def test_table_creation(tmp_path: Path):
     assert CylcWorkflowDAO.TABLE_WORKFLOW_PARAMS in tables
 
 
+def test_index_creation(tmp_path: Path):
+    """Test indexes are created, including for existing databases."""
+    db_file = tmp_path / 'db'
+    with CylcWorkflowDAO(db_file, create_tables=True) as dao:
+        dao.connect().execute('DROP INDEX task_states_cycle')
+    with CylcWorkflowDAO(db_file, create_tables=True) as dao:
+        plan = ' '.join(
+            row[-1] for row in dao.connect().execute(
+                'EXPLAIN QUERY PLAN'
+                ' SELECT * FROM task_states WHERE cycle==?',
+                ('1',),
+            )
+        )
+    assert 'USING INDEX task_states_cycle' in plan
+
+
 def test_context_manager_exit(
     monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ):
@@ -238,3 +254,45 @@ def test_select_latest_flow_nums(
         conn.commit()
 
         assert dao.select_latest_flow_nums() == expected
+
+
+def test_select_prev_instances_cache(tmp_path: Path):
+    """Task history should be cached by point until written to."""
+    db_file = tmp_path / 'db'
+    with CylcWorkflowDAO(db_file, create_tables=True) as dao:
+        for name in ('a', 'b'):
+            dao.add_insert_item(CylcWorkflowDAO.TABLE_TASK_STATES, {
+                'name': name,
+                'cycle': '1',
+                'flow_nums': serialise_set({1}),
+                'submit_num': 1,
+                'status': 'waiting',
+                'flow_wait': 0,
+            })
+        dao.execute_queued_items()
+
+        with mock.patch.object(
+            dao, 'connect', wraps=dao.connect
+        ) as mock_connect:
+            assert dao.select_prev_instances('a', '1') == [
+                (1, False, {1}, 'waiting')
+            ]
+            assert dao.select_prev_instances('b', '1') == [
+                (1, False, {1}, 'waiting')
+            ]
+            assert dao.select_prev_instances('c', '1') == []
+            # one query for all tasks at the point
+            assert mock_connect.call_count == 1
+
+        # writes to the point invalidate the cache
+        dao.add_update_item(
+            CylcWorkflowDAO.TABLE_TASK_STATES,
+            ({'status': 'succeeded'}, {'name': 'a', 'cycle': '1'}),
+        )
+        assert dao.select_prev_instances('a', '1') == [
+            (1, False, {1}, 'waiting')
+        ]
+        dao.execute_queued_items()
+        assert dao.select_prev_instances('a', '1') == [
+            (1, False, {1}, 'succeeded')
+        ]
@@ -0,0 +1,306 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Tests for the SSH connection pool, using a fake ssh command."""
+
+import os
+from pathlib import Path
+import signal
+import subprocess
+import sys
+from textwrap import dedent
+from time import sleep, time
+from types import SimpleNamespace
+
+import pytest
+
+from cylc.flow.remote import (
+    construct_rsync_over_ssh_cmd,
+    construct_ssh_cmd,
+)
+from cylc.flow.ssh_pool import SSHConnectionPool
+
+
+# A fake ssh command which runs commands locally. It implements the
+# connection multiplexing options used by the pool. A master connection
+# listens on its control socket until it is killed. Sessions log whether
+# they ran over a master connection. The host "unreachable" can't be
+# connected to.
+FAKE_SSH = dedent('''
+    #!{python}
+    import os, signal, socket, sys
+    args = sys.argv[1:]
+    opts, ctl = {{}}, None
+    while args[0].startswith('-'):
+        arg = args.pop(0)
+        if arg == '-o':
+            key, value = args.pop(0).split('=', 1)
+            opts[key] = value
+        elif arg == '-O':
+            ctl = args.pop(0)
+    host = args.pop(0)
+    path = opts.get('ControlPath')
+    if ctl == 'check':
+        sys.exit(0 if os.path.exists(path) else 255)
+    if host == 'unreachable':
+        sys.exit(255)
+    if opts.get('ControlMaster') == 'yes':
+        sock = socket.socket(socket.AF_UNIX)
+        sock.bind(path)
+        sock.listen()
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        signal.pause()
+    with open(os.environ['FAKE_SSH_LOG'], 'a') as log:
+        mux = bool(path and os.path.exists(path))
+        log.write(f'{{host}} {{mux}}\\n')
+    os.execvp(args[0], args)
+''').strip()
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    """Return a platform which uses the fake ssh command."""
+    ssh = tmp_path / 'ssh'
+    ssh.write_text(FAKE_SSH.format(python=sys.executable))
+    ssh.chmod(0o755)
+    log = tmp_path / 'log'
+    monkeypatch.setenv('FAKE_SSH_LOG', str(log))
+    return {
+        'name': 'fake',
+        'ssh command': str(ssh),
+        'ssh connection pool': True,
+    }
+
+
+@pytest.fixture
+def ssh_pool():
+    pool = SSHConnectionPool(set())
+    yield pool
+    pool.close()
+
+
+def wait_for(condition, timeout=10):
+    start = time()
+    while not condition():
+        assert time() - start < timeout
+        sleep(0.05)
+
+
+def wait_for_stopped(ssh_pool):
+    """Housekeep until stopped master connections have exited."""
+    def stopped():
+        ssh_pool.housekeep()
+        return not ssh_pool.stopping
+
+    wait_for(stopped)
+
+
+def test_master_connection(fake_ssh, ssh_pool, tmp_path):
+    """Commands run over the master connection once it is up."""
+    # the first command connects directly, and starts a master
+    assert ssh_pool.get_ssh_opts(fake_ssh, 'h1') == []
+    master = ssh_pool.masters[(fake_ssh['ssh command'], 'h1')]
+    wait_for(master.is_ready)
+
+    opts = ssh_pool.get_ssh_opts(fake_ssh, 'h1')
+    assert opts == [
+        '-o', 'ControlMaster=no', '-o', f'ControlPath={master.path}'
+    ]
+    subprocess.run([fake_ssh['ssh command'], 'h1', 'true'], check=True)
+    subprocess.run(
+        [fake_ssh['ssh command'], *opts, 'h1', 'true'], check=True
+    )
+    assert (tmp_path / 'log').read_text() == 'h1 False\nh1 True\n'
+
+    # each host has its own master connection
+    assert ssh_pool.get_ssh_opts(fake_ssh, 'h2') == []
+    assert len(ssh_pool.masters) == 2
+
+    # platforms which don't use the pool connect directly
+    assert ssh_pool.get_ssh_opts(
+        {**fake_ssh, 'ssh connection pool': False}, 'h3'
+    ) == []
+    assert len(ssh_pool.masters) == 2
+
+    socket_dir = ssh_pool.socket_dir
+    ssh_pool.close()
+    assert not ssh_pool.masters
+    assert not os.path.exists(socket_dir)
+    assert master.poll() is not None
+
+
+def test_construct_ssh_cmd(fake_ssh, ssh_pool):
+    """SSH commands include the master connection options."""
+    ssh_pool.get_ssh_opts(fake_ssh, 'h1')
+    master = ssh_pool.masters[(fake_ssh['ssh command'], 'h1')]
+    wait_for(master.is_ready)
+    cmd = construct_ssh_cmd(
+        ['version'],
+        {
+            **fake_ssh,
+            'use login shell': False,
+            'cylc path': None,
+            'ssh forward environment variables': [],
+        },
+        'h1',
+        ssh_pool=ssh_pool,
+    )
+    assert cmd[:6] == [
+        fake_ssh['ssh command'],
+        '-o', 'ControlMaster=no', '-o', f'ControlPath={master.path}',
+        'h1',
+    ]
+
+
+def test_bad_hosts(fake_ssh, ssh_pool):
+    """Master connections which can't connect mark their hosts as bad."""
+    ssh_pool.get_ssh_opts(fake_ssh, 'unreachable')
+    master = ssh_pool.masters[(fake_ssh['ssh command'], 'unreachable')]
+    wait_for(lambda: master.poll() is not None)
+    ssh_pool.housekeep()
+    assert ssh_pool.bad_hosts == {'unreachable'}
+    assert not ssh_pool.masters
+
+    # no master connections are started to bad hosts
+    assert ssh_pool.get_ssh_opts(fake_ssh, 'unreachable') == []
+    assert not ssh_pool.masters
+
+    # master connections to hosts which become bad are closed
+    ssh_pool.get_ssh_opts(fake_ssh, 'h1')
+    master = ssh_pool.masters[(fake_ssh['ssh command'], 'h1')]
+    wait_for(master.is_ready)
+    ssh_pool.bad_hosts.add('h1')
+    ssh_pool.housekeep()
+    assert not ssh_pool.masters
+    wait_for_stopped(ssh_pool)
+    assert master.poll() is not None
+
+
+def test_health_check(fake_ssh, ssh_pool):
+    """Failed and idle master connections are closed."""
+    ssh_pool.check_interval = 0
+    ssh_pool.get_ssh_opts(fake_ssh, 'h1')
+    master = ssh_pool.masters[(fake_ssh['ssh command'], 'h1')]
+    wait_for(master.is_ready)
+    ssh_pool.housekeep()
+    assert ssh_pool.masters
+
+    # health checks run in the background
+    ssh_pool.housekeep()
+    check_proc = master.check_proc
+    assert check_proc is not None
+    wait_for(lambda: check_proc.poll() is not None)
+    ssh_pool.housekeep()
+    assert ssh_pool.masters
+    assert not master.closing
+
+    # the master stops responding
+    Path(master.path).unlink()
+
+    def closed():
+        ssh_pool.housekeep()
+        return not ssh_pool.masters
+
+    wait_for(closed)
+    wait_for_stopped(ssh_pool)
+    assert master.poll() is not None
+    assert not ssh_pool.bad_hosts
+
+    # idle master connections are closed
+    ssh_pool.get_ssh_opts(fake_ssh, 'h1')
+    master = ssh_pool.masters[(fake_ssh['ssh command'], 'h1')]
+    ssh_pool.idle_timeout = 0
+    master.last_used = 0
+    ssh_pool.housekeep()
+    assert not ssh_pool.masters
+
+
+def test_stop(fake_ssh, ssh_pool):
+    """Stopped master connections are reaped without blocking."""
+    ssh_pool.get_ssh_opts(fake_ssh, 'h1')
+    key = (fake_ssh['ssh command'], 'h1')
+    master = ssh_pool.masters[key]
+    wait_for(master.is_ready)
+
+    # the master ignores SIGTERM
+    os.kill(master.proc.pid, signal.SIGSTOP)
+    ssh_pool.bad_hosts.add('h1')
+    start = time()
+    ssh_pool.housekeep()
+    assert time() - start < 1
+    assert ssh_pool.stopping == {key: master}
+    assert master.poll() is None
+
+    # no new master is started until it has exited
+    ssh_pool.bad_hosts.clear()
+    assert ssh_pool.get_ssh_opts(fake_ssh, 'h1') == []
+    assert not ssh_pool.masters
+
+    # it is killed after the control timeout
+    master.stop_time = 0
+    ssh_pool.housekeep()
+    assert not ssh_pool.stopping
+    assert master.poll() == -signal.SIGKILL
+    assert not os.path.exists(master.path)
+
+
+@pytest.mark.parametrize('cmd_type', ['ssh', 'rsync'])
+def test_in_use(fake_ssh, ssh_pool, cmd_type):
+    """Master connections aren't closed under running commands."""
+    running = []
+    ssh_pool.proc_pool = SimpleNamespace(get_running_ctxs=lambda: running)
+    ssh_pool.get_ssh_opts(fake_ssh, 'h1')
+    master = ssh_pool.masters[(fake_ssh['ssh command'], 'h1')]
+    wait_for(master.is_ready)
+    if cmd_type == 'ssh':
+        opts = ssh_pool.get_ssh_opts(fake_ssh, 'h1')
+        cmd = [fake_ssh['ssh command'], *opts, 'h1', 'true']
+    else:
+        # (the options are embedded in the "--rsh" argument)
+        cmd, _ = construct_rsync_over_ssh_cmd(
+            'src',
+            'dst',
+            {
+                **fake_ssh,
+                'hosts': ['h1'],
+                'rsync command': 'rsync',
+                'selection': {'method': 'definition order'},
+            },
+            ssh_pool=ssh_pool,
+        )
+        assert f'ControlPath={master.path}' not in cmd
+    running.append(SimpleNamespace(cmd=cmd))
+
+    # masters in use are not idle
+    ssh_pool.idle_timeout = 0
+    master.last_used = 0
+    ssh_pool.housekeep()
+    assert master.last_used > 0
+    assert not master.closing
+
+    # masters to be closed take no new commands, and are closed once the
+    # commands running over them finish
+    ssh_pool.bad_hosts.add('h1')
+    ssh_pool.housekeep()
+    assert master.closing
+    assert master.poll() is None
+    ssh_pool.bad_hosts.clear()
+    assert ssh_pool.get_ssh_opts(fake_ssh, 'h1') == []
+    running.clear()
+    ssh_pool.housekeep()
+    assert not ssh_pool.masters
+    wait_for_stopped(ssh_pool)
+    assert master.poll() is not None
@@ -15,7 +15,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+import json
 from pathlib import Path
+import sys
+from time import sleep, time
 from types import SimpleNamespace
 from tempfile import (
     NamedTemporaryFile,
@@ -30,9 +34,12 @@ from cylc.flow import LOG
 from cylc.flow.id import Tokens
 from cylc.flow.cycling.iso8601 import ISO8601Point
 from cylc.flow.task_events_mgr import TaskJobLogsRetrieveContext
-from cylc.flow.subprocctx import SubProcContext
+from cylc.flow.subprocctx import SubFuncContext, SubProcContext
 from cylc.flow.subprocpool import (
+    AsyncSubProcPool,
     SubProcPool,
+    SubProcQueue,
+    XtriggerWorkerPool,
     _XTRIG_FUNC_CACHE,
     get_xtrig_func,
 )
@@ -44,6 +51,7 @@ from cylc.flow.task_outputs import (
     TASK_OUTPUT_EXPIRED,
 )
 from cylc.flow.task_proxy import TaskProxy
+from cylc.flow.wakeup import WakeUp
 
 
 def test_get_temporary_file():
@@ -423,3 +431,344 @@ def test_rsync_255_fail(mock_ctx, expect, ctx_kwargs):
         {'ssh command': 'ssh', 'rsync command': 'rsync command'},
     )
     assert output == expect
+
+
+@pytest.fixture
+def xtrigger_workers(monkeypatch, tmp_path):
+    """Return a function to create an xtrigger worker pool.
+
+    Workers run the xtrigger module "xtrig" in tmp_path/lib/python:
+    * echo(value) -> (True, {"value": value})
+    * chatty() prints to stdout
+    * broken() raises an exception
+    * slow() takes a while
+    """
+    python_dir = tmp_path / 'lib' / 'python'
+    python_dir.mkdir(parents=True)
+    (python_dir / 'xtrig.py').write_text(
+        'import time\n'
+        'def echo(value):\n'
+        '    return True, {"value": value}\n'
+        'def chatty():\n'
+        '    print("hello")\n'
+        '    return False, {}\n'
+        'def broken():\n'
+        '    raise ValueError("broken")\n'
+        'def slow():\n'
+        '    time.sleep(60)\n'
+    )
+    # (the "cylc" command may not be installed)
+    monkeypatch.setattr(
+        XtriggerWorkerPool,
+        'CMD',
+        [
+            sys.executable,
+            '-c',
+            'from cylc.flow.subprocpool import run_function_worker;'
+            ' run_function_worker()',
+        ],
+    )
+    pools = []
+
+    def _pool(size=1, max_calls=0, max_memory=0, timeout=60):
+        pool = XtriggerWorkerPool(size, max_calls, max_memory, timeout)
+        pools.append(pool)
+        return pool
+
+    def _call(pool, func_name, *args):
+        ctx = SubFuncContext(
+            'label', func_name, list(args), {}, mod_name='xtrig'
+        )
+        ctx.update_command(str(tmp_path))
+        pool.put([ctx, None, None, None, None, None])
+        return ctx
+
+    def _wait(pool):
+        done = []
+        start = time()
+        while pool.is_not_done() or pool.queuings:
+            done.extend(item[0] for item in pool.process())
+            sleep(0.01)
+            assert time() - start < 30, 'timed out'
+        return done
+
+    yield _pool, _call, _wait
+    for pool in pools:
+        pool.terminate()
+
+
+def test_xtrigger_workers(xtrigger_workers):
+    """Workers run xtrigger functions, one call at a time."""
+    make_pool, call, wait = xtrigger_workers
+    pool = make_pool()
+    ctxs = [call(pool, 'echo', value) for value in range(3)]
+    ctxs.append(call(pool, 'chatty'))
+    assert wait(pool) == ctxs
+    for value, ctx in enumerate(ctxs[:3]):
+        assert ctx.ret_code == 0
+        assert json.loads(ctx.out) == [True, {'value': value}]
+        assert not ctx.err
+    # function stdout goes to stderr (as for "cylc function-run")
+    assert json.loads(ctxs[3].out) == [False, {}]
+    assert ctxs[3].err == 'hello\n'
+    # one worker (pool size) ran all calls
+    assert len(pool.workers) == 1
+    assert pool.workers[0].n_calls == 4
+    assert pool.workers[0].maxrss > 0
+
+
+def test_xtrigger_workers_retire(xtrigger_workers):
+    """Workers are retired after the configured number of calls."""
+    make_pool, call, wait = xtrigger_workers
+    pool = make_pool(max_calls=2)
+    ctxs = [call(pool, 'echo', value) for value in range(4)]
+    assert wait(pool) == ctxs
+    assert all(ctx.ret_code == 0 for ctx in ctxs)
+    assert not pool.workers
+    while pool.retiring:
+        pool.process()
+        sleep(0.01)
+
+    # retire on memory use
+    pool = make_pool(max_memory=1)
+    call(pool, 'echo', 1)
+    wait(pool)
+    assert not pool.workers
+
+
+def test_xtrigger_workers_error(xtrigger_workers):
+    """Function errors are reported and workers survive them."""
+    make_pool, call, wait = xtrigger_workers
+    pool = make_pool()
+    broken = call(pool, 'broken')
+    missing = call(pool, 'missing')
+    echo = call(pool, 'echo', 1)
+    wait(pool)
+    assert broken.ret_code == 1
+    assert 'ValueError: broken' in broken.err
+    assert missing.ret_code == 1
+    assert 'AttributeError' in missing.err
+    assert echo.ret_code == 0
+    assert pool.workers[0].n_calls == 3
+
+
+def test_xtrigger_workers_timeout(xtrigger_workers, monkeypatch):
+    """Calls (and their workers) are killed on timeout.
+
+    (Start-up does not count against the call timeout.)
+    """
+    make_pool, call, wait = xtrigger_workers
+    # workers which take longer to start up than the call timeout
+    monkeypatch.setattr(
+        XtriggerWorkerPool,
+        'CMD',
+        [
+            sys.executable,
+            '-c',
+            'import time; time.sleep(1);'
+            ' from cylc.flow.subprocpool import run_function_worker;'
+            ' run_function_worker()',
+        ],
+    )
+    pool = make_pool(timeout=0.5)
+    slow = call(pool, 'slow')
+    echo = call(pool, 'echo', 1)
+    wait(pool)
+    assert slow.ret_code != 0
+    assert 'killed on timeout (0.5)' in slow.err
+    assert echo.ret_code == 0
+
+
+def test_xtrigger_workers_startup_timeout(xtrigger_workers, monkeypatch):
+    """Workers which do not start up in time are killed."""
+    make_pool, call, wait = xtrigger_workers
+    monkeypatch.setattr(
+        XtriggerWorkerPool,
+        'CMD',
+        [sys.executable, '-c', 'import time; time.sleep(60)'],
+    )
+    monkeypatch.setattr(XtriggerWorkerPool, 'STARTUP_TIMEOUT', 0.5)
+    pool = make_pool(timeout=0.1)
+    ctx = call(pool, 'echo', 1)
+    wait(pool)
+    assert ctx.ret_code != 0
+    assert 'xtrigger worker failed to start within 0.5s' in ctx.err
+
+
+async def test_async_subprocpool():
+    """Commands start when there is space and callbacks run in "process"."""
+    proc_pool = AsyncSubProcPool(WakeUp())
+    proc_pool.size = 1
+    ctxs = []
+    proc_pool.put_command(
+        SubProcContext('echo', ['echo', 'hello'], stdin_str='x'),
+        callback=ctxs.append,
+    )
+    proc_pool.put_command(
+        SubProcContext('err', 'echo bye >&2; exit 2', shell=True),
+        callback=ctxs.append,
+    )
+    # the first command starts straight away, the second waits for space
+    assert len(proc_pool.tasks) == 1
+    assert len(proc_pool.queuings) == 1
+
+    # both commands run without the pool being processed
+    start = time()
+    while len(proc_pool.exited) < 2:
+        assert time() - start < 10
+        await proc_pool.wakeup.wait(1)
+    assert not ctxs
+
+    proc_pool.process()
+    assert not proc_pool.is_not_done()
+    assert [(ctx.cmd_key, ctx.ret_code, ctx.out, ctx.err) for ctx in ctxs] == [
+        ('echo', 0, 'hello\n', None),
+        ('err', 2, None, 'bye\n'),
+    ]
+
+
+async def test_async_subprocpool_timeout():
+    """Commands are killed on timeout."""
+    proc_pool = AsyncSubProcPool()
+    proc_pool.proc_pool_timeout = 0.2
+    ctxs = []
+    proc_pool.put_command(
+        SubProcContext('sleep', ['sleep', '10']),
+        callback=ctxs.append,
+    )
+    start = time()
+    while not proc_pool.exited:
+        assert time() - start < 5
+        await asyncio.sleep(0.1)
+    proc_pool.process()
+    assert ctxs[0].ret_code != 0
+    assert 'killed on timeout (0.2)' in ctxs[0].err
+
+
+async def test_async_subprocpool_terminate():
+    """Callbacks are called for commands killed on shutdown."""
+    proc_pool = AsyncSubProcPool()
+    ctxs = []
+    proc_pool.put_command(
+        SubProcContext('sleep', ['sleep', '10']),
+        callback=ctxs.append,
+    )
+    start = time()
+    while not any(proc for _, proc in proc_pool.tasks.values()):
+        assert time() - start < 5
+        await asyncio.sleep(0.1)
+    proc_pool.terminate()
+    assert [ctx.ret_code for ctx in ctxs] == [-9]
+    assert not proc_pool.is_not_done()
+
+    # the killed command does not report its exit again
+    await asyncio.sleep(0.5)
+    proc_pool.process()
+    assert len(ctxs) == 1
+
+
+def lane_item(cmd_key, host='localhost'):
+    """Return a process pool queue item for a command."""
+    return [SubProcContext(cmd_key, ['true'], host=host), *[None] * 5]
+
+
+def test_queue_lanes():
+    """Lanes share the pool by weight, up to their limits."""
+    queue = SubProcQueue({
+        'default': {'limit': 0, 'weight': 1},
+        'jobs-submit': {'limit': 2, 'weight': None},
+        'jobs-poll': {'limit': None, 'weight': 2},
+    })
+    for _ in range(5):
+        queue.append(lane_item('jobs-submit', 'slow'))
+    for _ in range(5):
+        queue.append(lane_item('jobs-poll', 'slow'))
+    queue.append(lane_item('jobs-submit', 'fast'))
+    assert len(queue) == 11
+
+    started = []
+    while (item := queue.start_next()) is not None:
+        started.append(item[0])
+    # polls get twice the share of the submits, and the submit lanes are
+    # limited to 2 running commands each
+    assert [(ctx.cmd_key, ctx.host) for ctx in started] == [
+        ('jobs-poll', 'slow'),
+        ('jobs-submit', 'slow'),
+        ('jobs-submit', 'fast'),
+        ('jobs-poll', 'slow'),
+        ('jobs-poll', 'slow'),
+        ('jobs-submit', 'slow'),
+        ('jobs-poll', 'slow'),
+        ('jobs-poll', 'slow'),
+    ]
+    assert len(queue) == 3
+
+    # finished commands free up their lane
+    queue.done(started[1])
+    assert queue.start_next()[0].host == 'slow'
+    assert queue.start_next() is None
+
+    stats = queue.get_stats()
+    assert {
+        name: (lane['queued'], lane['running'], lane['started'])
+        for name, lane in stats.items()
+    } == {
+        'jobs-submit:slow': (2, 2, 3),
+        'jobs-poll:slow': (0, 5, 5),
+        'jobs-submit:fast': (0, 1, 1),
+    }
+    assert stats['jobs-submit:slow']['wait max'] >= 0
+
+
+def test_queue_order():
+    """The queue acts like a deque of items in the order they were queued."""
+    queue = SubProcQueue()
+    items = [
+        lane_item('jobs-submit', 'a'),
+        lane_item('jobs-poll', 'a'),
+        lane_item('jobs-submit', 'b'),
+        lane_item('jobs-submit', 'a'),
+    ]
+    queue.extend(items)
+    assert list(queue) == items
+    assert queue[0] is items[0]
+    assert queue[-1] is items[-1]
+    queue.remove(items[1])
+    assert queue.popleft() is items[0]
+    assert list(queue) == [items[2], items[3]]
+    queue.clear()
+    assert not queue
+    with pytest.raises(IndexError):
+        queue.popleft()
+
+
+def test_proc_pool_lanes(mock_glbl_cfg):
+    """The pool runs commands from lanes up to the lane limits."""
+    mock_glbl_cfg(
+        'cylc.flow.subprocpool.glbl_cfg',
+        '''
+        [scheduler]
+            process pool size = 3
+            [[process pool lanes]]
+                [[[sleep]]]
+                    limit = 1
+        ''',
+    )
+    proc_pool = SubProcPool()
+    ctxs = []
+    for cmd_key in ('sleep', 'sleep', 'true', 'true'):
+        proc_pool.put_command(
+            SubProcContext(cmd_key, [cmd_key, '0.1']),
+            callback=ctxs.append,
+        )
+    proc_pool.process()
+    assert [running[1].cmd_key for running in proc_pool.runnings] == [
+        'sleep', 'true', 'true'
+    ]
+    start = time()
+    while proc_pool.is_not_done():
+        assert time() - start < 10
+        sleep(0.05)
+        proc_pool.process()
+    assert [ctx.ret_code for ctx in ctxs] == [0] * 4
+    assert proc_pool.get_lane_stats()['sleep:localhost']['started'] == 2
@@ -31,6 +31,7 @@ from cylc.flow.task_outputs import (
     TASK_OUTPUT_SUCCEEDED,
     TASK_OUTPUTS,
     TaskOutputs,
+    compile_completion_expression,
     get_completion_expression,
     get_trigger_completion_variable_maps,
 )
@@ -415,3 +416,31 @@ def test_get_trigger_completion_variable_maps():
     t2c, c2t = get_trigger_completion_variable_maps(('a', 'b-b', 'c-c-c'))
     assert t2c == {'a': 'a', 'b-b': 'b_b', 'c-c-c': 'c_c_c'}
     assert c2t == {'a': 'a', 'b_b': 'b-b', 'c_c_c': 'c-c-c'}
+
+
+def test_completion_expression_compiled_once(monkeypatch):
+    """Completion expressions should be compiled once, not on each check."""
+    compiled = []
+
+    def _compiler(expr, args):
+        compiled.append(expr)
+        return _compile(expr, args)
+
+    from cylc.flow import task_outputs
+    _compile = task_outputs.CompletionCompiler
+    monkeypatch.setattr(task_outputs, 'CompletionCompiler', _compiler)
+    compile_completion_expression.cache_clear()
+
+    outputs = [
+        TaskOutputs(tdef([TASK_OUTPUT_SUCCEEDED, 'x'], []))
+        for _ in range(3)
+    ]
+    for task_outputs_ in outputs:
+        assert not task_outputs_.is_complete()
+        task_outputs_.set_message_complete(TASK_OUTPUT_SUCCEEDED)
+        assert not task_outputs_.is_complete()
+        task_outputs_.set_message_complete('x')
+        assert task_outputs_.is_complete()
+
+    # the expression is shared by all three tasks
+    assert compiled == ['(succeeded and x)']
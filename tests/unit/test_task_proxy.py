@@ -225,3 +225,33 @@ def test_job_tokens():
         submit_num=3,
     )
     assert str(itask.job_tokens) == 'wflow//10/foo/03'
+
+
+def test_lazy_attributes():
+    """Infrequently used attributes should be allocated on first use."""
+    itask = TaskProxy(
+        Tokens('wflow'),
+        TaskDef('foo', {}, None, None),
+        IntegerPoint('10'),
+    )
+    for attr in (
+        'summary',
+        'jobs',
+        'try_timers',
+        'non_unique_events',
+        'clock_trigger_times',
+    ):
+        assert not itask.is_allocated(attr)
+
+    # reading attributes which need not allocate
+    assert itask.get_try_num() == 0
+    itask.reset_try_timers()
+    assert not itask.is_allocated('try_timers')
+
+    # first use allocates
+    assert itask.summary['submitted_time'] is None
+    assert itask.is_allocated('summary')
+    itask.jobs.append({'submit_num': 1})
+    assert itask.jobs == [{'submit_num': 1}]
+    assert itask.non_unique_events['warning'] == 0
+    assert itask.is_allocated('non_unique_events')
@@ -0,0 +1,107 @@
+# THIS FILE IS PART OF THE CYLC WORKFLOW ENGINE.
+# Copyright (C) Earth Sciences New Zealand & British Crown (Met Office)
+# & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from threading import Timer
+from time import time
+
+from cylc.flow.subprocctx import SubProcContext
+from cylc.flow.subprocpool import SubProcPool
+from cylc.flow.wakeup import WakeUp
+
+
+async def test_wait_timeout():
+    """It should sleep for the timeout if nothing happens."""
+    wakeup = WakeUp()
+    start = time()
+    assert await wakeup.wait(0.1) is False
+    assert time() - start >= 0.1
+
+
+async def test_set_before_wait():
+    """It should not sleep if set before the wait."""
+    wakeup = WakeUp()
+    wakeup.set()
+    start = time()
+    assert await wakeup.wait(10) is True
+    assert time() - start < 1
+    # the event is cleared after waking up
+    assert await wakeup.wait(0) is False
+
+
+async def test_set_during_wait():
+    """It should wake up when set from within the event loop."""
+    wakeup = WakeUp()
+    asyncio.get_running_loop().call_later(0.1, wakeup.set)
+    start = time()
+    assert await wakeup.wait(10) is True
+    assert time() - start < 1
+
+
+async def test_set_from_thread():
+    """It should wake up when set from another thread."""
+    wakeup = WakeUp()
+    timer = Timer(0.1, wakeup.set)
+    timer.start()
+    start = time()
+    assert await wakeup.wait(10) is True
+    assert time() - start < 1
+    timer.join()
+
+
+async def test_deadline():
+    """It should wake up at the earliest deadline."""
+    wakeup = WakeUp()
+    wakeup.set_deadline(time() + 5)
+    wakeup.set_deadline(time() + 0.1)
+    start = time()
+    assert await wakeup.wait(10) is False
+    assert 0.05 < time() - start < 1
+    # deadlines are cleared after waking up
+    assert wakeup.deadline is None
+
+
+async def test_disabled():
+    """It should ignore set and set_deadline if disabled."""
+    wakeup = WakeUp(enabled=False)
+    wakeup.set()
+    wakeup.set_deadline(time())
+    assert wakeup.deadline is None
+    assert await wakeup.wait(0.01) is False
+
+
+async def test_subprocpool_wakeup():
+    """It should wake up when a command in the process pool exits."""
+    wakeup = WakeUp()
+    proc_pool = SubProcPool(wakeup)
+    ctxs = []
+    proc_pool.put_command(
+        SubProcContext('sleep', ['sleep', '0.2']),
+        callback=ctxs.append,
+    )
+    # the new command wakes up the main loop straight away
+    assert await wakeup.wait(10) is True
+    proc_pool.process()
+    assert len(proc_pool.runnings) == 1
+
+    # the main loop is woken when the command exits
+    start = time()
+    assert await wakeup.wait(10) is True
+    assert time() - start < 5
+    proc_pool.process()
+    assert not proc_pool.is_not_done()
+    assert [ctx.ret_code for ctx in ctxs] == [0]
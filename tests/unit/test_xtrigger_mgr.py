@@ -15,7 +15,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
 import logging
+from unittest.mock import Mock
+
 import pytest
 
 from cylc.flow import CYLC_LOG
@@ -25,6 +28,7 @@ from cylc.flow.id import Tokens
 from cylc.flow.subprocctx import SubFuncContext
 from cylc.flow.task_proxy import TaskProxy
 from cylc.flow.taskdef import TaskDef
+from cylc.flow.wakeup import WakeUp
 from cylc.flow.xtrigger_mgr import (
     RE_STR_TMPL,
     XtriggerCollator
@@ -159,7 +163,7 @@ def test_housekeeping_nothing_satisfied(xtrigger_mgr):
     xtrigger_mgr.add_xtriggers(XtriggerCollator())
     xtrigger_mgr.load_xtrigger_for_restart(row_idx=0, row=row)
     assert xtrigger_mgr.sat_xtrig
-    xtrigger_mgr.housekeep([])
+    xtrigger_mgr.housekeep()
     assert not xtrigger_mgr.sat_xtrig
 
 
@@ -191,6 +195,7 @@ def test_housekeeping_with_xtrigger_satisfied(xtrigger_mgr):
     tdef.xtrig_labels[sequence] = ["get_name"]
     start_point = ISO8601Point('2019')
     itask = TaskProxy(Tokens('~user/workflow'), tdef, start_point)
+    xtrigger_mgr.update_task(itask)
     # pretend the function has been activated
 
     xtrigger_mgr.active.append(xtrig.get_signature())
@@ -198,10 +203,18 @@ def test_housekeeping_with_xtrigger_satisfied(xtrigger_mgr):
     xtrigger_mgr.callback(xtrig)
     assert xtrigger_mgr.sat_xtrig
 
-    xtrigger_mgr.housekeep([itask])
+    xtrigger_mgr.housekeep()
     # here we still have the same number as before
     assert xtrigger_mgr.sat_xtrig
 
+    # the task no longer needs it
+    xtrigger_mgr.call_xtriggers_async(itask)
+    assert itask.state.xtriggers == {'get_name': True}
+    assert not xtrigger_mgr.sig_refs
+    assert xtrigger_mgr.do_housekeeping
+    xtrigger_mgr.housekeep()
+    assert not xtrigger_mgr.sat_xtrig
+
 
 def test__call_xtriggers_async(xtrigger_mgr):
     """Test _call_xtriggers_async"""
@@ -320,3 +333,241 @@ def test_callback(xtrigger_mgr):
     xtrigger_mgr.callback(get_name)
     # this means that the xtrigger was satisfied
     assert xtrigger_mgr.sat_xtrig
+
+
+def test_add_coroutine_xtrigger(tmp_path):
+    """Test coroutine (async def) xtrigger functions are identified."""
+    python_dir = tmp_path / 'lib' / 'python'
+    python_dir.mkdir(parents=True)
+    (python_dir / 'afunc.py').write_text(
+        'async def afunc(succeed=True):\n'
+        '    return succeed, {}\n'
+    )
+    xtriggers = XtriggerCollator()
+    xtriggers.add_trig(
+        'coro', SubFuncContext('coro', 'afunc', [], {}), str(tmp_path)
+    )
+    xtriggers.add_trig(
+        'func',
+        SubFuncContext('func', 'echo', [], {'succeed': True}),
+        str(tmp_path),
+    )
+    assert xtriggers.coroutine_labels == {'coro'}
+
+    xtriggers.purge_user_xtriggers()
+    assert not xtriggers.coroutine_labels
+
+
+async def test_run_coroutine(xtrigger_mgr, tmp_path):
+    """Test coroutine xtriggers results and errors are handled."""
+    python_dir = tmp_path / 'lib' / 'python'
+    python_dir.mkdir(parents=True)
+    (python_dir / 'acoro.py').write_text(
+        'import asyncio\n'
+        'async def acoro(mode):\n'
+        '    if mode == "raise":\n'
+        '        raise ValueError("bad coroutine")\n'
+        '    if mode == "hang":\n'
+        '        await asyncio.sleep(60)\n'
+        '    return True, {"mode": mode}\n'
+    )
+    xtrigger_mgr.workflow_run_dir = str(tmp_path)
+    xtrigger_mgr.coroutine_timeout = 0.1
+    for mode in ('ok', 'raise', 'hang'):
+        ctx = SubFuncContext(mode, 'acoro', [mode], {})
+        xtrigger_mgr.active.append(ctx.get_signature())
+        await xtrigger_mgr._run_coroutine(ctx)
+        # the callback is left to the main loop
+        assert ctx.get_signature() in xtrigger_mgr.active
+        xtrigger_mgr.process_coroutines()
+        assert ctx.get_signature() not in xtrigger_mgr.active
+        if mode == 'ok':
+            assert ctx.ret_code == 0
+            assert xtrigger_mgr.sat_xtrig == {
+                ctx.get_signature(): {'mode': 'ok'}
+            }
+        elif mode == 'raise':
+            assert ctx.ret_code == 1
+            assert 'ValueError: bad coroutine' in ctx.err
+        else:
+            assert ctx.ret_code == 1
+            assert ctx.err == 'cancelled on timeout (0.1)'
+
+
+def test_workflow_state_batches(xtrigger_mgr):
+    """Test workflow_state xtriggers are batched by target workflow."""
+    xtrigger_mgr.proc_pool = Mock()
+    xtriggers = XtriggerCollator()
+    for label, workflow in [('up1', 'up'), ('up2', 'up'), ('x', 'other')]:
+        xtriggers.add_trig(
+            label,
+            SubFuncContext(
+                label=label,
+                func_name="workflow_state",
+                func_args=[f"{workflow}//%(point)s/{label}"],
+                func_kwargs={},
+            ),
+            "fdir",
+        )
+    xtrigger_mgr.add_xtriggers(xtriggers)
+    assert xtriggers.workflow_state_labels == {'up1', 'up2', 'x'}
+
+    tdef = TaskDef(
+        name="foo",
+        rtcfg={'completion': None},
+        start_point=1,
+        initial_point=1,
+    )
+    init()
+    sequence = ISO8601Sequence('P1D', '2000')
+    tdef.xtrig_labels[sequence] = ['up1', 'up2', 'x']
+    itask = TaskProxy(Tokens('~user/workflow'), tdef, ISO8601Point('2000'))
+
+    # calls are held until the batches are called
+    xtrigger_mgr.call_xtriggers_async(itask)
+    assert len(xtrigger_mgr.active) == 3
+    assert not xtrigger_mgr.proc_pool.put_command.called
+    xtrigger_mgr.call_xtrigger_batches()
+    assert not xtrigger_mgr.workflow_state_batches
+
+    # one batch per target workflow
+    batches = {
+        batch_ctx.label: (batch_ctx, kwargs['callback_args'][0])
+        for (batch_ctx,), kwargs
+        in xtrigger_mgr.proc_pool.put_command.call_args_list
+    }
+    assert set(batches) == {
+        'workflow_state batch (up)', 'workflow_state batch (other)'
+    }
+    batch_ctx, ctxs = batches['workflow_state batch (up)']
+    assert batch_ctx.func_name == 'workflow_state_batch'
+    assert batch_ctx.func_args == [[
+        {'workflow_task_id': f'up//{itask.point}/up1'},
+        {'workflow_task_id': f'up//{itask.point}/up2'},
+    ]]
+    assert [ctx.label for ctx in ctxs] == ['up1', 'up2']
+
+    # results are passed on to each xtrigger
+    batch_ctx.ret_code = 0
+    batch_ctx.out = json.dumps([
+        {'result': [True, {'task': 'up1'}]},
+        {'error': 'Traceback'},
+    ])
+    xtrigger_mgr.batch_callback(batch_ctx, ctxs)
+    assert list(xtrigger_mgr.sat_xtrig.values()) == [{'task': 'up1'}]
+
+    # a failed batch fails each xtrigger
+    batch_ctx, ctxs = batches['workflow_state batch (other)']
+    batch_ctx.ret_code = 1
+    xtrigger_mgr.batch_callback(batch_ctx, ctxs)
+    assert len(xtrigger_mgr.sat_xtrig) == 1
+    assert not xtrigger_mgr.active
+
+
+def test_workflow_state_batches_split(xtrigger_mgr):
+    """Test large batches are split to fit on the command line."""
+    xtrigger_mgr.proc_pool = Mock()
+    for num in range(2000):
+        xtrigger_mgr._add_to_batch(
+            SubFuncContext(
+                label=f'x{num}',
+                func_name='workflow_state',
+                func_args=[f'up//20000101T0000Z/task_{num:04d}'],
+                func_kwargs={'offset': 'PT1H', 'flow_num': 1},
+            )
+        )
+    xtrigger_mgr.call_xtrigger_batches()
+
+    batches = [
+        (batch_ctx, kwargs['callback_args'][0])
+        for (batch_ctx,), kwargs
+        in xtrigger_mgr.proc_pool.put_command.call_args_list
+    ]
+    assert len(batches) > 1
+    for batch_ctx, ctxs in batches:
+        # (Linux limits command line arguments to 128KiB)
+        func_args_arg = json.dumps(batch_ctx.func_args)
+        assert func_args_arg in batch_ctx.cmd
+        assert len(func_args_arg) < 128 * 1024
+        assert len(batch_ctx.func_args[0]) == len(ctxs)
+    # each call is made once, in order
+    assert [ctx.label for _, ctxs in batches for ctx in ctxs] == [
+        f'x{num}' for num in range(2000)
+    ]
+
+
+def clock_tasks(xtrigger_mgr):
+    """Return tasks waiting on past and future clock xtriggers."""
+    init()
+    xtrigger_mgr.wakeup = WakeUp()
+    xtriggers = XtriggerCollator()
+    xtriggers.add_trig(
+        "clock",
+        SubFuncContext(
+            label="clock",
+            func_name="wall_clock",
+            func_args=[],
+            func_kwargs={"offset": "PT1H"},
+        ),
+        "fdir",
+    )
+    xtrigger_mgr.add_xtriggers(xtriggers)
+
+    tdef = TaskDef(
+        name="foo",
+        rtcfg={'completion': None},
+        start_point=1,
+        initial_point=1,
+    )
+    sequence = ISO8601Sequence('P1Y', '2000')
+    tdef.xtrig_labels[sequence] = ["clock"]
+    return (
+        TaskProxy(Tokens('~user/workflow'), tdef, ISO8601Point(point))
+        for point in ('2000', '3000')
+    )
+
+
+def test_clock_xtrigger_schedule(xtrigger_mgr):
+    """Test clock xtriggers are satisfied on schedule."""
+    past, future = clock_tasks(xtrigger_mgr)
+
+    # trigger times are scheduled when tasks enter the pool
+    for itask in (past, future):
+        xtrigger_mgr.update_task(itask)
+    assert sorted(xtrigger_mgr.clock_times.values()) == [
+        past.get_clock_trigger_time(past.point, 'PT1H'),
+        future.get_clock_trigger_time(future.point, 'PT1H'),
+    ]
+
+    # the past one is satisfied, the next deadline is the future one
+    xtrigger_mgr.wakeup.deadline = None  # (cleared when the main loop wakes)
+    xtrigger_mgr.check_clock_xtriggers()
+    assert past.state.xtriggers == {'clock': True}
+    assert future.state.xtriggers == {'clock': False}
+    assert list(xtrigger_mgr.clock_times.values()) == [
+        xtrigger_mgr.wakeup.deadline
+    ]
+
+    # nothing to do for tasks waiting on scheduled clock triggers
+    xtrigger_mgr.get_xtrig_ctx = Mock()
+    xtrigger_mgr.call_xtriggers_async(future)
+    assert not xtrigger_mgr.get_xtrig_ctx.called
+
+    # the schedule is cleared when no task is waiting
+    xtrigger_mgr.remove_task(future)
+    assert not xtrigger_mgr.clock_times
+    assert not xtrigger_mgr.clock_tasks
+
+
+def test_clock_xtrigger_due(xtrigger_mgr):
+    """Test due clock xtriggers are satisfied when a task is checked.
+
+    (Before check_clock_xtriggers has run.)
+    """
+    past, future = clock_tasks(xtrigger_mgr)
+    for itask in (past, future):
+        xtrigger_mgr.update_task(itask)
+        xtrigger_mgr.call_xtriggers_async(itask)
+    assert past.state.xtriggers == {'clock': True}
+    assert future.state.xtriggers == {'clock': False}
+    assert len(xtrigger_mgr.sat_xtrig) == 1
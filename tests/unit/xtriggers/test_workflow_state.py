@@ -29,6 +29,7 @@ from cylc.flow.workflow_files import WorkflowFiles
 from cylc.flow.xtriggers.workflow_state import (
     _workflow_state_backcompat,
     workflow_state,
+    workflow_state_batch,
     validate,
 )
 from cylc.flow.xtriggers.suite_state import suite_state
@@ -267,6 +268,55 @@ def test__workflow_state_backcompat(tmp_run_dir: 'Callable'):
         assert satisfied
 
 
+def test_workflow_state_batch(tmp_run_dir: 'Callable'):
+    """Test batched workflow_state calls share the target workflow DB."""
+    id_ = 'fellowship'
+    run_dir: Path = tmp_run_dir(id_)
+    db_file = run_dir / 'log' / 'db'
+    db_file.parent.mkdir(exist_ok=True)
+    with CylcWorkflowDAO(db_file, create_tables=True) as dao:
+        conn = dao.connect()
+        conn.executemany(
+            r'INSERT INTO "workflow_params" VALUES(?,?);',
+            [('cylc_version', '8.3.0'),
+             ('cycle_point_format', '%Y'),
+             ('cycle_point_tz', 'Z')]
+        )
+        conn.execute(r"""
+            INSERT INTO "task_states" VALUES(
+                'frodo','2012','[1]','2023-01-30T18:19:15Z',
+                '2023-01-30T18:19:15Z',1,'succeeded',0,0
+            );
+        """)
+        conn.commit()
+
+    returns = workflow_state_batch([
+        {'workflow_task_id': f'{id_}//2012/frodo'},
+        {'workflow_task_id': f'{id_}//2013/frodo'},
+        {'workflow_task_id': f'{id_}//2012/frodo', 'offset': 'P1Y'},
+        {'workflow_task_id': f'{id_}//2011/frodo', 'offset': 'P1Y'},
+        {'workflow_task_id': f'{id_}//*/frodo', 'offset': 'P1Y'},
+        {'workflow_task_id': 'mordor//2012/frodo'},
+    ])
+    assert returns[0] == {
+        'result': (True, {
+            'workflow': id_,
+            'task': 'frodo',
+            'point': '2012',
+            'status': 'succeeded',
+        })
+    }
+    assert returns[0]['result'] == workflow_state(f'{id_}//2012/frodo')
+    assert returns[1] == {'result': (False, {})}
+    assert returns[2] == {'result': (False, {})}
+    assert returns[3]['result'][0] is True
+    assert returns[3]['result'][1]['offset'] == 'P1Y'
+    # errors are reported per call
+    assert 'not compatible with an offset' in returns[4]['error']
+    # workflow not found
+    assert returns[5] == {'result': (False, {})}
+
+
 def test_validate_ok():
     """Validate returns ok with valid args."""
     validate({